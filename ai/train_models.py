@@ -6,6 +6,12 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 import os
+import sys
+import argparse
+
+# Flat forest exports use the layout the backend's FlatForest engine reads
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+from api.v1.services.flat_forest import export_flat_forest
 
 def load_and_preprocess_data(file_path):
     """Load and preprocess training data"""
@@ -82,16 +88,31 @@ def train_water_model(X, y):
     
     return model, scaler
 
-def save_models(models, scalers, output_dir):
-    """Save trained models and scalers"""
+def save_models(models, scalers, output_dir, export_flat=False):
+    """Save trained models and scalers, optionally with flat forest exports
+
+    Flat exports record the digest of the model file they were made from.
+    Without ``export_flat``, exports left by an earlier run are removed so
+    they are not served in place of the new models.
+    """
     os.makedirs(output_dir, exist_ok=True)
     
-    joblib.dump(models['growth'], os.path.join(output_dir, 'growth_model.joblib'))
-    joblib.dump(models['water'], os.path.join(output_dir, 'water_model.joblib'))
-    joblib.dump(scalers['growth'], os.path.join(output_dir, 'growth_scaler.joblib'))
-    joblib.dump(scalers['water'], os.path.join(output_dir, 'water_scaler.joblib'))
+    for kind in ('growth', 'water'):
+        model_path = os.path.join(output_dir, f'{kind}_model.joblib')
+        flat_path = os.path.join(output_dir, f'{kind}_model_flat.joblib')
+        joblib.dump(models[kind], model_path)
+        joblib.dump(scalers[kind], os.path.join(output_dir, f'{kind}_scaler.joblib'))
+        if export_flat:
+            joblib.dump(export_flat_forest(models[kind], model_path), flat_path)
+        elif os.path.exists(flat_path):
+            os.remove(flat_path)
 
 def main():
+    parser = argparse.ArgumentParser(description="Train the growth and water models")
+    parser.add_argument('--output-dir', default='ai/models')
+    parser.add_argument('--export-flat', action='store_true', help='also export the forests as flat node arrays')
+    args = parser.parse_args()
+
     # Load data
     growth_data_path = 'ai/data/growth_data.csv'
     water_data_path = 'ai/data/water_data.csv'
@@ -114,7 +135,7 @@ def main():
         'water': water_scaler
     }
     
-    save_models(models, scalers, 'ai/models')
+    save_models(models, scalers, args.output_dir, export_flat=args.export_flat)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
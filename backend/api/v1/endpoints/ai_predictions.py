@@ -0,0 +1,76 @@
+import json
+from typing import Dict, Iterator
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from ..services.ai_service import PREDICTION_CHUNK_ROWS, AIService
+from ..schemas.ai import BatchPredictionRequest
+
+router = APIRouter()
+ai_service = AIService()
+
+def _batch_input(batch: BatchPredictionRequest):
+    """The one payload form a batch request was sent in"""
+    given = [data for data in (batch.rows, batch.columns, batch.values) if data is not None]
+    if len(given) != 1:
+        raise ValueError("Provide exactly one of rows, columns or values")
+    return given[0]
+
+def _ndjson(rows: Iterator[dict]) -> Iterator[bytes]:
+    for row in rows:
+        yield (json.dumps(row, separators=(',', ':')) + '\n').encode('utf-8')
+
+def _stream_predictions(kind: str, batch: BatchPredictionRequest, chunk_rows: int) -> StreamingResponse:
+    try:
+        rows = ai_service.stream_batch_predictions(kind, _batch_input(batch), chunk_rows)
+        return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ai/growth/batch")
+async def predict_growth_batch(batch: BatchPredictionRequest, chunk_rows: int = PREDICTION_CHUNK_ROWS):
+    """Predict vegetation growth for many soil/climate rows, streamed as NDJSON"""
+    return _stream_predictions("growth", batch, chunk_rows)
+
+@router.post("/ai/water/batch")
+async def optimize_water_batch(batch: BatchPredictionRequest, chunk_rows: int = PREDICTION_CHUNK_ROWS):
+    """Recommend daily water usage for many rows, streamed as NDJSON"""
+    return _stream_predictions("water", batch, chunk_rows)
+
+@router.get("/ai/models", response_model=Dict)
+async def get_model_registry():
+    """Model versions on disk and load time and size of each loaded model"""
+    try:
+        return ai_service.registry.metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/ai/models/activate", response_model=Dict)
+async def activate_model_version(version: str):
+    """Switch every worker to another model version without restarting"""
+    try:
+        ai_service.registry.activate(version)
+        return ai_service.registry.metrics()
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/ai/predictions/cache", response_model=Dict)
+async def get_prediction_cache_metrics():
+    """Hit and miss counts of the memoized single predictions"""
+    try:
+        return ai_service.prediction_cache_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/ai/predictions/cache", response_model=Dict)
+async def clear_prediction_cache():
+    """Drop all memoized predictions"""
+    try:
+        ai_service.clear_prediction_cache()
+        return ai_service.prediction_cache_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,24 +1,224 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict, Optional
 from ..services.path_planning import PathPlanningService
-from ..schemas.robotics import RobotPosition
-import json
+from ..services.map_repository import etag_matches
+from ..schemas.robotics import (
+    BatchPathRequest,
+    CoordinatedPathRequest,
+    RobotPosition,
+    RouteRequest,
+    RouteUpdate,
+    VisitOrderRequest
+)
 
 router = APIRouter()
 path_planning_service = PathPlanningService()
 
+def _map_section(name: str, if_none_match: Optional[str]) -> Response:
+    """Serve a map section from the shared repository, honouring If-None-Match"""
+    body, etag = path_planning_service.map_repository.section(name)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _parse_bbox(bbox: Optional[str]) -> Optional[tuple]:
+    """Parse an 'x1,y1,x2,y2' query parameter"""
+    if bbox is None:
+        return None
+    try:
+        x1, y1, x2, y2 = (float(v) for v in bbox.split(','))
+    except ValueError:
+        raise ValueError("bbox must be four comma-separated numbers: x1,y1,x2,y2")
+    return x1, y1, x2, y2
+
+def _parse_center(x: Optional[float], y: Optional[float]) -> Optional[Dict]:
+    if x is None and y is None:
+        return None
+    if x is None or y is None:
+        raise ValueError("Both x and y are required")
+    return {'x': x, 'y': y}
+
+def _parse_circle(x: Optional[float], y: Optional[float], radius: Optional[float]) -> tuple:
+    """Parse the x, y and radius query parameters, which go together"""
+    center = _parse_center(x, y)
+    if (center is None) != (radius is None):
+        raise ValueError("x, y and radius must be given together")
+    return center, radius
+
 @router.post("/robots/{robot_id}/path", response_model=List[Dict])
-async def plan_path(robot_id: str, start: RobotPosition, goal: RobotPosition):
+async def plan_path(
+    robot_id: str,
+    start: RobotPosition,
+    goal: RobotPosition,
+    algorithm: str = "astar",
+    any_angle: bool = False,
+    start_heading: Optional[float] = None,
+    goal_heading: Optional[float] = None
+):
     """Plan a path for a robot from start to goal"""
     try:
         path = path_planning_service.plan_path(
-            start.dict(),
-            goal.dict(),
-            robot_id
+            dict(start.dict(), heading=start_heading),
+            dict(goal.dict(), heading=goal_heading),
+            robot_id,
+            algorithm=algorithm,
+            any_angle=any_angle
         )
         if not path:
             raise HTTPException(status_code=404, detail="No valid path found")
         return path
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/paths/cache", response_model=Dict)
+async def get_path_cache_metrics():
+    """Hit and miss counts of the path query cache"""
+    try:
+        return path_planning_service.path_cache_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/paths/cache", response_model=Dict)
+async def clear_path_cache():
+    """Drop all cached paths"""
+    try:
+        path_planning_service.clear_path_cache()
+        return path_planning_service.path_cache_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/robots/{robot_id}/path/charger", response_model=Dict)
+async def route_to_charger(robot_id: str, position: RobotPosition):
+    """Route a robot to its nearest charging station"""
+    try:
+        route = path_planning_service.route_to_nearest_charger(position.dict(), robot_id)
+        if not route['path']:
+            raise HTTPException(status_code=404, detail="No reachable charging station")
+        return route
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/robots/{robot_id}/path/coverage", response_model=Dict)
+async def plan_zone_coverage(robot_id: str, zone_id: str, tool_width: Optional[float] = None):
+    """Plan a sweep covering a map zone with the robot's tool"""
+    try:
+        return path_planning_service.plan_zone_coverage(zone_id, robot_id, tool_width)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/paths/batch", response_model=List[Dict])
+async def plan_paths(batch: BatchPathRequest):
+    """Plan paths for many robots in one call"""
+    try:
+        return path_planning_service.plan_paths(
+            [request.dict() for request in batch.requests],
+            algorithm=batch.algorithm,
+            any_angle=batch.any_angle
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/paths/coordinated", response_model=List[Dict])
+async def plan_coordinated(batch: CoordinatedPathRequest):
+    """Plan timed, mutually conflict-free routes for many robots"""
+    try:
+        return path_planning_service.plan_coordinated(
+            [request.dict() for request in batch.requests],
+            algorithm=batch.algorithm,
+            start_time=batch.start_time,
+            time_budget=batch.time_budget
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/robots/{robot_id}/reservations", response_model=Dict)
+async def release_reservations(robot_id: str):
+    """Free the cells reserved for a robot's coordinated route"""
+    try:
+        path_planning_service.release_reservations(robot_id)
+        return {"robot_id": robot_id}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/paths/visit_order", response_model=Dict)
+async def optimize_visit_order(request: VisitOrderRequest):
+    """Order target positions into short routes for one or more robots"""
+    try:
+        return path_planning_service.optimize_visit_order(
+            [target.dict() for target in request.targets],
+            [robot.dict() for robot in request.robots],
+            algorithm=request.algorithm,
+            return_to_start=request.return_to_start,
+            time_budget=request.time_budget,
+            capacity_field=request.capacity_field
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/robots/{robot_id}/routes", response_model=Dict)
+async def start_route(robot_id: str, request: RouteRequest):
+    """Plan a route that can later be repaired incrementally"""
+    try:
+        session = path_planning_service.new_route(request.start.dict(), request.goal.dict(), robot_id)
+        # The first plan is a full search; keep the event loop free meanwhile
+        await run_in_threadpool(session.plan)
+        route = path_planning_service.keep_route(session)
+        if not route['path']:
+            raise HTTPException(status_code=404, detail="No valid path found")
+        return route
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/routes/{route_id}/updates", response_model=Dict)
+async def update_route(route_id: str, update: RouteUpdate):
+    """Report changed cells on a route and get the repaired path"""
+    try:
+        return path_planning_service.update_route(
+            route_id,
+            [change.dict() for change in update.changes],
+            update.position.dict() if update.position else None
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/routes/{route_id}", response_model=Dict)
+async def end_route(route_id: str):
+    """Discard the search state of a finished route"""
+    try:
+        path_planning_service.end_route(route_id)
+        return {"route_id": route_id}
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -41,42 +241,104 @@ async def check_collision(robot_id: str, position: RobotPosition):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/robots/{robot_id}/collisions", response_model=List[bool])
+async def check_collisions(robot_id: str, positions: List[RobotPosition]):
+    """Check many positions for collisions in one call"""
+    try:
+        return path_planning_service.check_collisions(
+            [position.dict() for position in positions],
+            robot_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/robots/{robot_id}/collision/obstacles", response_model=List[Dict])
+async def get_colliding_obstacles(robot_id: str, position: RobotPosition):
+    """List the obstacles overlapping a robot at a position"""
+    try:
+        return path_planning_service.colliding_obstacles(position.dict(), robot_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/map/zones/at", response_model=List[Dict])
+async def get_zones_at(x: float, y: float):
+    """Get the zones containing a position"""
+    try:
+        return path_planning_service.zones_at({'x': x, 'y': y})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/map/zones", response_model=List[Dict])
-async def get_zones():
-    """Get all zones in the map"""
+async def get_zones(
+    bbox: Optional[str] = None,
+    x: Optional[float] = None,
+    y: Optional[float] = None,
+    radius: Optional[float] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get zones in the map, optionally filtered by bounding box or radius"""
     try:
-        with open('robotics/config/map_data.json') as f:
-            map_data = json.load(f)
-        return map_data['zones']
+        center, radius = _parse_circle(x, y, radius)
+        if bbox is not None or radius is not None:
+            return path_planning_service.find_zones(_parse_bbox(bbox), center, radius)
+        return _map_section('zones', if_none_match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/map/obstacles", response_model=List[Dict])
-async def get_obstacles():
-    """Get all obstacles in the map"""
+async def get_obstacles(
+    bbox: Optional[str] = None,
+    x: Optional[float] = None,
+    y: Optional[float] = None,
+    radius: Optional[float] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get obstacles in the map, optionally filtered by bounding box or radius"""
+    try:
+        center, radius = _parse_circle(x, y, radius)
+        if bbox is not None or radius is not None:
+            return path_planning_service.find_obstacles(_parse_bbox(bbox), center, radius)
+        return _map_section('obstacles', if_none_match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/map/obstacles", response_model=Dict)
+async def add_obstacle(obstacle: Dict):
+    """Add an obstacle to the live map used for planning"""
+    try:
+        version = path_planning_service.add_obstacle(obstacle)
+        return {"map_version": version}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/map/charging_stations/nearest", response_model=List[Dict])
+async def get_nearest_charging_stations(x: float, y: float, k: int = 1):
+    """Get the k charging stations closest to a position"""
     try:
-        with open('robotics/config/map_data.json') as f:
-            map_data = json.load(f)
-        return map_data['obstacles']
+        return path_planning_service.nearest_charging_stations({'x': x, 'y': y}, k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/map/charging_stations", response_model=List[Dict])
-async def get_charging_stations():
+async def get_charging_stations(if_none_match: Optional[str] = Header(None)):
     """Get all charging stations in the map"""
     try:
-        with open('robotics/config/map_data.json') as f:
-            map_data = json.load(f)
-        return map_data['charging_stations']
+        return _map_section('charging_stations', if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/map/paths", response_model=List[Dict])
-async def get_paths():
+async def get_paths(if_none_match: Optional[str] = Header(None)):
     """Get all predefined paths in the map"""
     try:
-        with open('robotics/config/map_data.json') as f:
-            map_data = json.load(f)
-        return map_data['paths']
+        return _map_section('paths', if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -70,4 +70,9 @@ class AIConfig(BaseModel):
     training_data_size: int
     last_training_date: datetime
     accuracy_metrics: Dict[str, float]
-    feature_importance: Dict[str, float] 
\ No newline at end of file
+    feature_importance: Dict[str, float]
+
+class BatchPredictionRequest(BaseModel):
+    rows: Optional[List[Dict[str, float]]] = None
+    columns: Optional[Dict[str, List[float]]] = None
+    values: Optional[List[List[float]]] = None
@@ -7,6 +7,54 @@ class RobotPosition(BaseModel):
     y: float
     z: float
 
+class PathRequest(BaseModel):
+    robot_id: str
+    start: RobotPosition
+    goal: RobotPosition
+
+class BatchPathRequest(BaseModel):
+    requests: List[PathRequest]
+    algorithm: str = "astar"
+    any_angle: bool = False
+
+class CoordinatedPathRequest(BaseModel):
+    requests: List[PathRequest]
+    algorithm: str = "jps"
+    start_time: Optional[float] = None
+    time_budget: Optional[float] = None
+
+class VisitTarget(BaseModel):
+    x: float
+    y: float
+    z: float = 0.0
+    demand: float = 1.0
+
+class RobotStart(BaseModel):
+    robot_id: str
+    start: RobotPosition
+    capacity: Optional[float] = None
+
+class VisitOrderRequest(BaseModel):
+    targets: List[VisitTarget]
+    robots: List[RobotStart]
+    algorithm: str = "jps"
+    return_to_start: bool = False
+    time_budget: Optional[float] = None
+    capacity_field: Optional[str] = None
+
+class RouteRequest(BaseModel):
+    start: RobotPosition
+    goal: RobotPosition
+
+class CellChange(BaseModel):
+    x: float
+    y: float
+    occupied: bool = True
+
+class RouteUpdate(BaseModel):
+    changes: List[CellChange]
+    position: Optional[RobotPosition] = None
+
 class RobotOrientation(BaseModel):
     x: float
     y: float
@@ -1,25 +1,191 @@
-from typing import Dict, List, Optional
+import os
+from typing import Callable, Dict, Hashable, Iterator, List, Optional
 import numpy as np
 from datetime import datetime, timedelta
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-import joblib
+from .feature_pipeline import Feature, FeatureInput, FeaturePipeline, FeatureSchema
+from .flat_forest import FlatForest, flat_forest_or_none
+from .model_registry import DEFAULT_MODEL_DIR, ModelRegistry, shared_registry
+from .cache import VersionedLRUCache
 
-class AIService:
-    def __init__(self):
-        # Initialize models and scalers
-        self.growth_model = RandomForestRegressor(n_estimators=100)
-        self.water_model = RandomForestRegressor(n_estimators=100)
-        self.scaler = StandardScaler()
-        
-        # Load pre-trained models if available
+# Inputs of the growth and water models in training order, with the request
+# argument each one is read from and the default memoization quantum
+GROWTH_SCHEMA = FeatureSchema([
+    Feature("ph", "soil_conditions", quantum=0.01),
+    Feature("moisture_content", "soil_conditions", quantum=0.001),
+    Feature("organic_matter", "soil_conditions", quantum=0.001),
+    Feature("average_temperature", "climate_data", quantum=0.1),
+    Feature("average_rainfall", "climate_data", quantum=0.1),
+    Feature("duration_days", "duration_days", scalar=True, quantum=1)
+])
+WATER_SCHEMA = FeatureSchema([
+    Feature("daily_usage", "current_usage", quantum=0.1),
+    Feature("temperature", "weather_forecast", quantum=0.1),
+    Feature("humidity", "weather_forecast", quantum=0.01),
+    Feature("precipitation_probability", "weather_forecast", quantum=0.01),
+    Feature("soil_moisture", "current_usage", quantum=0.001)
+])
+GROWTH_FEATURES = GROWTH_SCHEMA.names
+WATER_FEATURES = WATER_SCHEMA.names
+# Schema, model artifact and scaler artifact of each prediction kind
+PIPELINES = {
+    "growth": (GROWTH_SCHEMA, "growth_model", "growth_scaler"),
+    "water": (WATER_SCHEMA, "water_model", "water_scaler")
+}
+# Suffix of a model's flat forest export ('growth_model_flat.joblib')
+FLAT_SUFFIX = "_flat"
+# Single scaler shared by both models in model directories from before
+# per-model scalers; used for whichever model it was fitted to
+LEGACY_SCALER = "scaler"
+# Rows scaled and predicted together when streaming batch results
+PREDICTION_CHUNK_ROWS = 4096
+# Memoized single predictions kept per kind, and their lifetime in seconds
+# (0 keeps them until evicted or the model changes)
+PREDICTION_CACHE_SIZE = int(os.getenv('AI_PREDICTION_CACHE_SIZE', '4096'))
+PREDICTION_CACHE_TTL = float(os.getenv('AI_PREDICTION_CACHE_TTL', '0'))
+# Per-feature quantum overrides, e.g. 'ph=0.05,humidity=0.02'
+PREDICTION_QUANTA = os.getenv('AI_PREDICTION_QUANTA', '')
+
+
+def parse_quanta(spec: str) -> Dict[str, float]:
+    """Per-feature quanta from a 'name=quantum,...' string"""
+    quanta = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
         try:
-            self.growth_model = joblib.load('ai/models/growth_model.joblib')
-            self.water_model = joblib.load('ai/models/water_model.joblib')
-            self.scaler = joblib.load('ai/models/scaler.joblib')
-        except:
-            print("No pre-trained models found. Models will need to be trained.")
+            quanta[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid prediction quantum: {item.strip()}")
+    return quanta
+
+
+class AIService:
+    def __init__(
+        self,
+        model_dir: Optional[str] = DEFAULT_MODEL_DIR,
+        registry: Optional[ModelRegistry] = None,
+        prediction_quanta: Optional[Dict[str, float]] = None
+    ):
+        # Models and scalers load on first use, shared by every service in the process
+        self.registry = registry or shared_registry(model_dir)
+        self._pipelines: Dict[str, FeaturePipeline] = {}
+
+        # Single predictions memoized per kind on quantized inputs
+        quanta = dict(parse_quanta(PREDICTION_QUANTA), **(prediction_quanta or {}))
+        self.prediction_quanta = {
+            kind: tuple(quanta.get(name, default) for name, default in zip(schema.names, schema.quanta))
+            for kind, schema in (("growth", GROWTH_SCHEMA), ("water", WATER_SCHEMA))
+        }
+        self.prediction_caches = {
+            kind: VersionedLRUCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL or None)
+            for kind in self.prediction_quanta
+        }
+
+    @property
+    def growth_model(self):
+        return self.registry.get("growth_model")
+
+    @growth_model.setter
+    def growth_model(self, model):
+        self.registry.put("growth_model", model)
+
+    @property
+    def growth_scaler(self):
+        return self.registry.get("growth_scaler")
+
+    @growth_scaler.setter
+    def growth_scaler(self, scaler):
+        self.registry.put("growth_scaler", scaler)
+
+    @property
+    def water_model(self):
+        return self.registry.get("water_model")
+
+    @water_model.setter
+    def water_model(self, model):
+        self.registry.put("water_model", model)
+
+    @property
+    def water_scaler(self):
+        return self.registry.get("water_scaler")
+
+    @water_scaler.setter
+    def water_scaler(self, scaler):
+        self.registry.put("water_scaler", scaler)
+
+    def pipeline(self, kind: str) -> FeaturePipeline:
+        """Compiled scale + predict pipeline of 'growth' or 'water'
+
+        Small batches are scored by a flat forest engine: the model's
+        exported flat arrays when the model directory has an export made
+        from the current model file (the scikit-learn model is then only
+        loaded for large batches), else the loaded forest flattened here. Recompiled whenever the registry
+        serves a different model, export or scaler, e.g. after a reload or
+        version swap.
+        """
+        if kind not in PIPELINES:
+            raise ValueError(f"Unknown prediction kind: {kind}")
+        schema, model_name, scaler_name = PIPELINES[kind]
+        exported = self._flat_export(model_name)
+        model = self.registry.artifact(model_name) if exported is None else None
+        if scaler_name not in self.registry and LEGACY_SCALER in self.registry:
+            scaler_name = LEGACY_SCALER
+        scaler = self.registry.artifact(scaler_name)
+        source = ((exported or model).tag, scaler.tag)
+        pipeline = self._pipelines.get(kind)
+        if pipeline is None or pipeline.source != source:
+            if exported is not None:
+                load_model = (lambda: self.registry.get(model_name)) if model_name in self.registry else None
+                pipeline = FeaturePipeline(
+                    schema, scaler=scaler.model, source=source, flat=FlatForest(exported.model), load_model=load_model
+                )
+            else:
+                pipeline = FeaturePipeline(
+                    schema, model.model, scaler.model, source, flat=flat_forest_or_none(model.model)
+                )
+            self._pipelines[kind] = pipeline
+        return pipeline
+
+    def _flat_export(self, model_name: str):
+        """Registry artifact of ``model_name``'s flat export, if it is current
+
+        An export is only used when it records the digest of the model file
+        it sits next to, or when there is no model to compare against; one
+        left behind by an earlier model is ignored.
+        """
+        flat_name = model_name + FLAT_SUFFIX
+        if flat_name not in self.registry:
+            return None
+        exported = self.registry.artifact(flat_name)
+        if model_name in self.registry:
+            digest = self.registry.digest(model_name)
+            if digest is None or exported.model.get('model_digest') != digest:
+                return None
+        return exported
+
+    def _memoized(self, kind: str, version: Hashable, key: tuple, compute: Callable[[], object]):
+        """Value cached for ``key`` under ``version``, computed on a miss
+
+        Binding the cache to the version of the artifacts in use drops
+        every entry from an older model, so a reload or version swap never
+        serves stale predictions.
+        """
+        cache = self.prediction_caches[kind]
+        cache.bind(version)
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.put(key, value)
+        return value
+
+    def prediction_cache_metrics(self) -> Dict:
+        """Hit, miss and eviction counts of each prediction cache"""
+        return {kind: cache.metrics() for kind, cache in self.prediction_caches.items()}
+
+    def clear_prediction_cache(self) -> None:
+        for cache in self.prediction_caches.values():
+            cache.invalidate()
 
     def predict_vegetation_growth(
         self,
@@ -28,22 +194,22 @@ class AIService:
         climate_data: Dict,
         duration_days: int
     ) -> Dict:
-        """Predict vegetation growth over time"""
-        # Prepare input features
-        features = np.array([
-            soil_conditions["ph"],
-            soil_conditions["moisture_content"],
-            soil_conditions["organic_matter"],
-            climate_data["average_temperature"],
-            climate_data["average_rainfall"],
-            duration_days
-        ]).reshape(1, -1)
-        
-        # Scale features
-        features_scaled = self.scaler.transform(features)
-        
-        # Make prediction
-        growth_rate = self.growth_model.predict(features_scaled)[0]
+        """Predict vegetation growth over time
+
+        Memoized: inputs whose features all fall in the same
+        ``floor(value / quantum)`` buckets get the growth rate predicted for
+        the first of them.
+        """
+        pipeline = self.pipeline("growth")
+        features = GROWTH_SCHEMA.row(
+            soil_conditions=soil_conditions,
+            climate_data=climate_data,
+            duration_days=duration_days
+        )
+        key = GROWTH_SCHEMA.bucket(features[0].tolist(), self.prediction_quanta["growth"])
+        growth_rate = self._memoized(
+            "growth", pipeline.source, key, lambda: float(pipeline.predict_matrix(features)[0])
+        )
         
         return {
             "predicted_growth_rate": growth_rate,
@@ -63,21 +229,17 @@ class AIService:
         current_usage: Dict,
         weather_forecast: Dict
     ) -> Dict:
-        """Optimize water usage based on AI predictions"""
-        # Prepare input features
-        features = np.array([
-            current_usage["daily_usage"],
-            weather_forecast["temperature"],
-            weather_forecast["humidity"],
-            weather_forecast["precipitation_probability"],
-            current_usage["soil_moisture"]
-        ]).reshape(1, -1)
-        
-        # Scale features
-        features_scaled = self.scaler.transform(features)
-        
-        # Make prediction
-        optimal_usage = self.water_model.predict(features_scaled)[0]
+        """Optimize water usage based on AI predictions
+
+        Memoized like ``predict_vegetation_growth``; the savings are
+        always computed from the exact current usage.
+        """
+        pipeline = self.pipeline("water")
+        features = WATER_SCHEMA.row(current_usage=current_usage, weather_forecast=weather_forecast)
+        key = WATER_SCHEMA.bucket(features[0].tolist(), self.prediction_quanta["water"])
+        optimal_usage = self._memoized(
+            "water", pipeline.source, key, lambda: float(pipeline.predict_matrix(features)[0])
+        )
         
         return {
             "recommended_daily_usage": optimal_usage,
@@ -90,6 +252,76 @@ class AIService:
             }
         }
 
+    def predict_vegetation_growth_batch(self, data: FeatureInput) -> Dict[str, np.ndarray]:
+        """Growth rates of many soil/climate rows in one vectorized pass
+
+        ``data`` holds ``GROWTH_FEATURES`` per row (see
+        ``FeatureSchema.matrix``); the rows are scaled and run through the
+        forest together instead of one ``predict`` call per row. Returns
+        arrays aligned with the input.
+        """
+        return self._growth_results(GROWTH_SCHEMA.matrix(data))
+
+    def optimize_water_usage_batch(self, data: FeatureInput) -> Dict[str, np.ndarray]:
+        """Recommended daily usage of many rows in one vectorized pass
+
+        ``data`` holds ``WATER_FEATURES`` per row (see
+        ``FeatureSchema.matrix``). Returns arrays aligned with the input.
+        """
+        return self._water_results(WATER_SCHEMA.matrix(data))
+
+    def _growth_results(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        growth_rate = self.pipeline("growth").predict_matrix(features)
+        return {
+            "predicted_growth_rate": growth_rate,
+            "confidence_low": growth_rate * 0.9,
+            "confidence_high": growth_rate * 1.1
+        }
+
+    def _water_results(self, features: np.ndarray) -> Dict[str, np.ndarray]:
+        # The pipeline scales the matrix in place, so keep the raw usage
+        daily_usage = features[:, 0].copy()
+        optimal_usage = self.pipeline("water").predict_matrix(features)
+        return {
+            "recommended_daily_usage": optimal_usage,
+            "savings_potential": daily_usage - optimal_usage
+        }
+
+    def stream_batch_predictions(
+        self,
+        kind: str,
+        data: FeatureInput,
+        chunk_rows: int = PREDICTION_CHUNK_ROWS
+    ) -> Iterator[Dict]:
+        """Batch predictions as one dict per input row, scored a chunk at a time
+
+        ``kind`` is 'growth' or 'water'. The input is validated and the
+        first chunk scored up front, so a bad payload or an untrained model
+        fails before anything is yielded; each further chunk of
+        ``chunk_rows`` rows is predicted in one pass as results flow out,
+        keeping memory bounded. Rows carry their input ``index``.
+        """
+        if kind == "growth":
+            features, predict = GROWTH_SCHEMA.matrix(data), self._growth_results
+        elif kind == "water":
+            features, predict = WATER_SCHEMA.matrix(data), self._water_results
+        else:
+            raise ValueError(f"Unknown prediction kind: {kind}")
+        chunk_rows = max(int(chunk_rows), 1)
+        first = predict(features[:chunk_rows])
+
+        def rows():
+            for start in range(0, len(features), chunk_rows):
+                result = first if start == 0 else predict(features[start:start + chunk_rows])
+                names = list(result)
+                columns = [result[name].tolist() for name in names]
+                for offset, values in enumerate(zip(*columns)):
+                    row = {"index": start + offset}
+                    row.update(zip(names, values))
+                    yield row
+
+        return rows()
+
     def analyze_ecosystem_health(
         self,
         project_data: Dict,
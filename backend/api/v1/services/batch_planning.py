@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .configuration_space import configuration_space
+from .grid_search import JumpTable, SearchResult, SearchWorkspace, astar, jps, theta_star
+from .occupancy_grid import OccupancyGrid
+
+# Per-process search state, set up once by _init_worker
+_worker_grid = None
+_worker_workspace = None
+
+
+def _init_worker(packed: np.ndarray, shape: tuple, resolution: float, version: str) -> None:
+    global _worker_grid, _worker_workspace
+    _worker_grid = OccupancyGrid(packed, shape, resolution, version)
+    _worker_workspace = SearchWorkspace(_worker_grid.shape)
+
+
+def _search_chunk(
+    algorithm: str,
+    pairs: List[Tuple[tuple, tuple]],
+    max_expansions: Optional[int],
+    radius_cells: int = 0
+) -> List[SearchResult]:
+    # Inflated grids and jump tables are memoized on the worker's map grid,
+    # so each footprint is prepared once per worker
+    grid = configuration_space(_worker_grid, radius_cells)
+    cells = grid.cells
+    results = []
+    for start, goal in pairs:
+        if algorithm == 'jps':
+            result = jps(cells, start, goal, max_expansions, _worker_workspace, grid.derived('jump_table', JumpTable))
+        elif algorithm == 'theta':
+            result = theta_star(cells, start, goal, max_expansions, _worker_workspace)
+        else:
+            result = astar(cells, start, goal, max_expansions, _worker_workspace)
+        results.append(result)
+    return results
+
+
+class PlannerPool:
+    """Process pool of grid searchers bound to one map version
+
+    The packed map grid is shipped to each worker once at start-up; tasks
+    then only carry start/goal cells and the footprint radius to search
+    with. Workers inflate the grid for each radius the first time they see
+    it and keep it, so batches mixing footprints reuse the same processes.
+    Every worker keeps its own reusable search workspace.
+    """
+
+    PARALLEL_ALGORITHMS = ('astar', 'jps', 'theta')
+
+    def __init__(self, grid: OccupancyGrid, workers: Optional[int] = None):
+        self.version = grid.version
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(grid.packed, grid.shape, grid.resolution, grid.version)
+        )
+
+    def search(
+        self,
+        algorithm: str,
+        pairs: List[Tuple[tuple, tuple]],
+        max_expansions: Optional[int] = None,
+        radius_cells: int = 0
+    ) -> List[SearchResult]:
+        """Run independent searches across the pool, preserving order
+
+        Searches run on the map grid inflated by ``radius_cells``, the
+        configuration space ``configuration_space`` gives for it.
+        """
+        if algorithm not in self.PARALLEL_ALGORITHMS:
+            raise ValueError(f"Algorithm {algorithm} cannot run in the planner pool")
+        chunk_size = max(1, -(-len(pairs) // (self.workers * 4)))
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+        futures = [
+            self._executor.submit(_search_chunk, algorithm, chunk, max_expansions, radius_cells)
+            for chunk in chunks
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class VersionedLRUCache:
+    """LRU cache with a time-to-live, bound to the version of its source
+
+    Entries expire ``ttl`` seconds after they were stored (``None`` keeps
+    them until evicted). ``bind`` drops everything when the version of
+    whatever the values were computed from (a map, a model) changes, so a
+    stale value is never returned even if a key did not include the
+    version.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.version: Optional[str] = None
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bind(self, version: str) -> None:
+        """Follow the current source version, clearing entries from older ones"""
+        if version != self.version:
+            if self._entries:
+                self.invalidate()
+            self.version = version
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        stored, value = entry
+        if self.ttl is not None and self.clock() - stored > self.ttl:
+            del self._entries[key]
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (self.clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry"""
+        self._entries.clear()
+        self.stats['invalidations'] += 1
+
+    def metrics(self) -> Dict:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return dict(
+            self.stats,
+            size=len(self._entries),
+            max_entries=self.max_entries,
+            ttl=self.ttl,
+            hit_rate=self.stats['hits'] / lookups if lookups else 0.0
+        )
@@ -0,0 +1,74 @@
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy.ndimage import distance_transform_edt
+
+from .occupancy_grid import OccupancyGrid
+
+CSPACE_KEY_PREFIX = 'cspace_'
+
+
+def footprint_radius(specs: Dict) -> float:
+    """Radius of the circle enclosing a width x length footprint at any heading"""
+    return 0.5 * math.hypot(specs['width'], specs['length'])
+
+
+def inflation_cells(radius: float, resolution: float) -> int:
+    """Footprint radius rounded up to whole grid cells"""
+    return max(int(math.ceil(radius / resolution - 1e-9)), 0)
+
+
+def inflate(cells: np.ndarray, radius_cells: int) -> np.ndarray:
+    """Mark every cell within radius_cells of an occupied cell
+
+    Uses the Euclidean distance transform of the free space, so the cost is
+    linear in the grid size regardless of the footprint.
+    """
+    occupied = cells != 0
+    if radius_cells <= 0 or not occupied.any():
+        return occupied.astype(np.uint8)
+    return (distance_transform_edt(~occupied) <= radius_cells).astype(np.uint8)
+
+
+def inflate_window(
+    inflated: np.ndarray,
+    cells: np.ndarray,
+    window: Tuple[int, int, int, int],
+    radius_cells: int
+) -> Tuple[np.ndarray, Tuple[int, int, int, int]]:
+    """Update an inflated grid after cells inside window became occupied
+
+    Inflation distributes over unions of obstacles, so only the window grown
+    by the footprint radius is recomputed and OR-ed into a copy. Returns the
+    new inflated array and the window that may have changed.
+    """
+    rows, cols = cells.shape
+    r0, r1, c0, c1 = window
+    r0 = max(r0 - radius_cells, 0)
+    r1 = min(r1 + radius_cells, rows)
+    c0 = max(c0 - radius_cells, 0)
+    c1 = min(c1 + radius_cells, cols)
+    out = np.array(inflated, dtype=np.uint8)
+    out[r0:r1, c0:c1] |= inflate(cells[r0:r1, c0:c1], radius_cells)
+    return out, (r0, r1, c0, c1)
+
+
+def configuration_space(grid: OccupancyGrid, radius_cells: int) -> OccupancyGrid:
+    """Occupancy grid inflated by a footprint radius, memoized on the grid
+
+    The result is itself an ``OccupancyGrid`` with its own version, so jump
+    tables, cluster abstractions and distance fields are derived and cached
+    per footprint exactly as for the raw grid. Robot classes with the same
+    radius in cells share one inflated grid.
+    """
+    if radius_cells <= 0:
+        return grid
+    return grid.derived(
+        f"{CSPACE_KEY_PREFIX}{radius_cells}",
+        lambda cells: OccupancyGrid.from_array(
+            inflate(cells, radius_cells),
+            grid.resolution,
+            f"{grid.version}-r{radius_cells}"
+        )
+    )
@@ -0,0 +1,392 @@
+import math
+import time
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .grid_search import flat_cells
+
+# Minimum separation between robot centers, in cells; 1.5 keeps robots out
+# of each other's 8-neighbourhood, which rules out swaps and crossings
+# between two time steps
+MIN_SEPARATION_CELLS = 1.5
+# Path cells looked ahead when a conflict is repaired by space-time search;
+# the window doubles on each failed attempt
+REPAIR_WINDOW = 16
+# Time steps a repair search may look ahead of the window's shortest route
+REPAIR_HORIZON = 64
+DEFAULT_REPAIR_EXPANSIONS = 20000
+
+# 8-connected moves plus waiting in place; every move takes one time step
+TIMED_MOVES = ((0, 0), (0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1))
+
+
+class ReservationTable:
+    """Space-time reservations of robot centers on a grid
+
+    A robot at cell ``idx`` during time step ``t`` is stored under the key
+    ``t * size + idx``. Robots are kept apart by checking every reserved
+    center within the sum of both footprint radii (at least
+    ``MIN_SEPARATION_CELLS``). A robot that finished its route stays parked
+    on its goal cell from its arrival step onwards.
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.size = self.shape[0] * self.shape[1]
+        self._cells: Dict[int, str] = {}
+        self._parked: Dict[int, Tuple[int, str]] = {}
+        # Last step each robot spends at each cell, for parking decisions
+        self._visits: Dict[int, Dict[str, int]] = {}
+        self._keys: Dict[str, List[int]] = {}
+        self._radius: Dict[str, float] = {}
+        self._end: Dict[str, int] = {}
+        self._offsets: Dict[float, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    @property
+    def robots(self) -> List[str]:
+        return list(self._keys)
+
+    def reserve(self, robot_id: str, timed_cells: List[Tuple[int, int]], radius: float, park: bool = True) -> None:
+        """Reserve a robot's (cell index, step) route, parking it at the end"""
+        self.release(robot_id)
+        size = self.size
+        keys = []
+        for idx, step in timed_cells:
+            key = step * size + idx
+            self._cells[key] = robot_id
+            keys.append(key)
+            visits = self._visits.setdefault(idx, {})
+            if visits.get(robot_id, -1) < step:
+                visits[robot_id] = step
+        goal, arrival = timed_cells[-1]
+        if park:
+            self._parked[goal] = (arrival, robot_id)
+        self._keys[robot_id] = keys
+        self._radius[robot_id] = float(radius)
+        self._end[robot_id] = arrival
+
+    def release(self, robot_id: str) -> bool:
+        """Drop all reservations of a robot, including its parked goal"""
+        keys = self._keys.pop(robot_id, None)
+        if keys is None:
+            return False
+        size = self.size
+        for key in keys:
+            if self._cells.get(key) == robot_id:
+                del self._cells[key]
+            visits = self._visits.get(key % size)
+            if visits is not None:
+                visits.pop(robot_id, None)
+                if not visits:
+                    del self._visits[key % size]
+        for idx, (_, owner) in list(self._parked.items()):
+            if owner == robot_id:
+                del self._parked[idx]
+        self._radius.pop(robot_id, None)
+        self._end.pop(robot_id, None)
+        return True
+
+    def expire(self, step: int) -> List[str]:
+        """Release routes that ended before ``step``
+
+        Parked robots keep their goal cell; only the timed part is dropped.
+        """
+        expired = [robot_id for robot_id, end in self._end.items() if end < step]
+        for robot_id in expired:
+            parking = [(idx, arrival) for idx, (arrival, owner) in self._parked.items() if owner == robot_id]
+            radius = self._radius[robot_id]
+            self.release(robot_id)
+            if parking:
+                idx, arrival = parking[0]
+                self.reserve(robot_id, [(idx, arrival)], radius)
+                # Only the parked goal is left, which never expires
+                del self._end[robot_id]
+        return expired
+
+    def separation(self, radius: float) -> float:
+        """Center distance a robot of this radius keeps from reserved robots"""
+        widest = max(self._radius.values(), default=0.0)
+        return max(radius + widest, MIN_SEPARATION_CELLS)
+
+    def offsets(self, separation: float) -> List[Tuple[int, int]]:
+        """(d_row, d_col) offsets within a separation distance"""
+        offsets = self._offsets.get(separation)
+        if offsets is None:
+            reach = int(math.floor(separation))
+            offsets = [
+                (dr, dc)
+                for dr in range(-reach, reach + 1)
+                for dc in range(-reach, reach + 1)
+                if dr * dr + dc * dc <= separation * separation
+            ]
+            self._offsets[separation] = offsets
+        return offsets
+
+    def is_free(self, robot_id: str, idx: int, step: int, offsets: List[Tuple[int, int]]) -> bool:
+        """Whether a robot may occupy cell ``idx`` during ``step``"""
+        rows, cols = self.shape
+        r, c = divmod(idx, cols)
+        base = step * self.size
+        cells = self._cells
+        parked = self._parked
+        for dr, dc in offsets:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            other_idx = nr * cols + nc
+            owner = cells.get(base + other_idx)
+            if owner is not None and owner != robot_id:
+                return False
+            parking = parked.get(other_idx)
+            if parking is not None and parking[1] != robot_id and step >= parking[0]:
+                return False
+        return True
+
+    def conflicts(self, robot_id: str, idx: int, step: int, offsets: List[Tuple[int, int]]) -> Set[str]:
+        """Robots that keep ``robot_id`` from occupying cell ``idx`` during ``step``"""
+        rows, cols = self.shape
+        r, c = divmod(idx, cols)
+        base = step * self.size
+        owners = set()
+        for dr, dc in offsets:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            other_idx = nr * cols + nc
+            owner = self._cells.get(base + other_idx)
+            if owner is not None and owner != robot_id:
+                owners.add(owner)
+            parking = self._parked.get(other_idx)
+            if parking is not None and parking[1] != robot_id and step >= parking[0]:
+                owners.add(parking[1])
+        return owners
+
+    def last_pass(self, robot_id: str, idx: int, offsets: List[Tuple[int, int]]) -> int:
+        """Last step another robot's route comes near cell ``idx`` (-1 if never)"""
+        rows, cols = self.shape
+        r, c = divmod(idx, cols)
+        last = -1
+        for dr, dc in offsets:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                for owner, step in self._visits.get(nr * cols + nc, {}).items():
+                    if owner != robot_id and step > last:
+                        last = step
+        return last
+
+
+def space_time_astar(
+    grid: np.ndarray,
+    table: ReservationTable,
+    robot_id: str,
+    offsets: List[Tuple[int, int]],
+    start: int,
+    start_step: int,
+    goal: int,
+    min_goal_step: int = 0,
+    horizon: int = REPAIR_HORIZON,
+    max_expansions: int = DEFAULT_REPAIR_EXPANSIONS
+) -> Optional[List[Tuple[int, int]]]:
+    """Earliest-arrival route in (cell, step) avoiding reserved robots
+
+    Every move, including waiting in place, takes one step, so the cost is
+    the arrival step and the Chebyshev distance is an admissible heuristic.
+    The goal is accepted from ``min_goal_step`` on. The search gives up
+    after ``horizon`` steps beyond the first possible arrival or after
+    ``max_expansions``. Returns (cell index, step) pairs from start to goal.
+    """
+    rows, cols = grid.shape
+    cells = flat_cells(grid)
+    goal_r, goal_c = divmod(goal, cols)
+
+    def heuristic(idx: int) -> int:
+        r, c = divmod(idx, cols)
+        return max(abs(r - goal_r), abs(c - goal_c))
+
+    deadline = start_step + max(heuristic(start), min_goal_step - start_step) + horizon
+    parent = {(start, start_step): None}
+    oheap = [(start_step + heuristic(start), -start_step, start)]
+    closed = set()
+    expansions = 0
+    while oheap:
+        _, neg_step, idx = heappop(oheap)
+        step = -neg_step
+        state = (idx, step)
+        if state in closed:
+            continue
+        if idx == goal and step >= min_goal_step:
+            route = []
+            while state is not None:
+                route.append(state)
+                state = parent[state]
+            route.reverse()
+            return route
+        if expansions >= max_expansions:
+            return None
+        closed.add(state)
+        expansions += 1
+        if step >= deadline:
+            continue
+        r, c = divmod(idx, cols)
+        for dr, dc in TIMED_MOVES:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            if cells[neighbor] and neighbor != idx:
+                continue
+            next_state = (neighbor, step + 1)
+            if next_state in parent or not table.is_free(robot_id, neighbor, step + 1, offsets):
+                continue
+            parent[next_state] = state
+            heappush(oheap, (step + 1 + heuristic(neighbor), -(step + 1), neighbor))
+    return None
+
+
+def schedule_path(
+    grid: np.ndarray,
+    table: ReservationTable,
+    robot_id: str,
+    radius: float,
+    path: List[Tuple[int, int]],
+    start_step: int,
+    max_expansions: int = DEFAULT_REPAIR_EXPANSIONS
+) -> Optional[List[Tuple[int, int]]]:
+    """Time a spatial path around the robots already in the table
+
+    The robot follows ``path`` one cell per step and waits in place while
+    the next cell is reserved. When it cannot wait, or has waited for
+    ``REPAIR_WINDOW`` steps, a space-time search replans the next stretch
+    of the path (``REPAIR_WINDOW`` cells, doubling on failure). The route
+    only ends once no other route passes the goal again, so the robot can
+    stay parked there. A robot that starts closer to others than their
+    footprints allow is not rejected: it may wait on its start, for up to
+    ``REPAIR_HORIZON`` steps, until those robots have moved away, so
+    crowded robots leave one after another. Returns (cell index, step)
+    pairs, or None when no conflict-free timing was found.
+    """
+    cols = grid.shape[1]
+    indices = [r * cols + c for r, c in path]
+    last = len(indices) - 1
+    offsets = table.offsets(table.separation(radius))
+    arrive_after = table.last_pass(robot_id, indices[-1], offsets)
+    # Robots already too close at the start; only they are tolerated, and
+    # only while this robot is still on its start cell
+    crowding = table.conflicts(robot_id, indices[0], start_step, offsets)
+
+    timed = [(indices[0], start_step)]
+    i = 0
+    step = start_step
+    waited = 0
+    while i < last or step <= arrive_after:
+        current = indices[i]
+        if i < last and table.is_free(robot_id, indices[i + 1], step + 1, offsets):
+            i += 1
+            step += 1
+            waited = 0
+            crowding = set()
+            timed.append((indices[i], step))
+            continue
+        if crowding and step - start_step < REPAIR_HORIZON:
+            blocking = table.conflicts(robot_id, current, step + 1, offsets)
+            crowding &= blocking
+            if blocking and blocking <= crowding:
+                step += 1
+                timed.append((current, step))
+                continue
+        if (waited < REPAIR_WINDOW or i == last) and table.is_free(robot_id, current, step + 1, offsets):
+            step += 1
+            waited += 1
+            timed.append((current, step))
+            continue
+
+        window = REPAIR_WINDOW
+        while True:
+            j = min(i + window, last)
+            route = space_time_astar(
+                grid,
+                table,
+                robot_id,
+                offsets,
+                current,
+                step,
+                indices[j],
+                arrive_after + 1 if j == last else 0,
+                max_expansions=max_expansions
+            )
+            if route is not None:
+                break
+            if j == last:
+                return None
+            window *= 2
+        timed.extend(route[1:])
+        i = j
+        step = route[-1][1]
+        waited = 0
+        crowding = set()
+    return timed
+
+
+def plan_cooperative(
+    grid_of: Dict[str, np.ndarray],
+    table: ReservationTable,
+    robots: List[Dict],
+    start_step: int,
+    time_budget: Optional[float] = None,
+    max_expansions: int = DEFAULT_REPAIR_EXPANSIONS
+) -> List[Dict]:
+    """Prioritized planning: time each robot's path around earlier robots
+
+    ``robots`` are dicts with 'robot_id', 'path' (grid cells from start to
+    goal on the robot's configuration space, ``grid_of[robot_id]``) and
+    'radius' (footprint radius in cells), in priority order. Every start
+    cell is reserved for the first step up front, so no route runs through
+    a robot that has not moved yet. Routes are added to ``table``; a robot
+    left without a route is parked at its start. Returns per robot a dict
+    with 'status' ('found', 'no_path' or 'budget_exhausted') and 'timed'
+    (cell index, step) pairs. Robot ids must be unique.
+    """
+    if len({robot['robot_id'] for robot in robots}) != len(robots):
+        raise ValueError("Robot ids must be unique")
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    cols = table.shape[1]
+    starts = {}
+    for robot in robots:
+        table.release(robot['robot_id'])
+    for robot in robots:
+        if robot['path']:
+            r, c = robot['path'][0]
+            starts[robot['robot_id']] = [(r * cols + c, start_step)]
+            table.reserve(robot['robot_id'], starts[robot['robot_id']], robot['radius'], park=False)
+
+    results = []
+    for robot in robots:
+        robot_id = robot['robot_id']
+        if not robot['path']:
+            results.append({'status': 'no_path', 'timed': []})
+            continue
+        table.release(robot_id)
+        if deadline is not None and time.monotonic() > deadline:
+            status, timed = 'budget_exhausted', None
+        else:
+            timed = schedule_path(
+                grid_of[robot_id], table, robot_id, robot['radius'], robot['path'], start_step, max_expansions
+            )
+            status = 'found' if timed is not None else 'no_path'
+        if timed is None:
+            # The robot stays where it is; later routes must go around it
+            table.reserve(robot_id, starts[robot_id], robot['radius'])
+            results.append({'status': status, 'timed': []})
+            continue
+        table.reserve(robot_id, timed, robot['radius'])
+        results.append({'status': status, 'timed': timed})
+    return results
@@ -0,0 +1,233 @@
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .grid_search import SearchWorkspace, astar, euclidean_cost, flat_cells, line_of_sight, prune_path
+
+# Expansion cap for each connector search between sweep lanes or cells
+DEFAULT_CONNECTOR_EXPANSIONS = 200000
+
+
+@dataclass
+class CoveragePlan:
+    """Boustrophedon sweep of one zone
+
+    ``waypoints`` are (row, col) cells of the full grid joined by straight,
+    collision-free segments. ``coverage`` is the fraction of free zone cells
+    swept by the tool; cells the robot cannot reach (near obstacles, or in
+    parts of the zone not connected to the rest inside it) lower it.
+    """
+    waypoints: List[Tuple[int, int]] = field(default_factory=list)
+    cells: int = 0
+    lanes: int = 0
+    skipped: int = 0
+    coverage: float = 0.0
+
+    @property
+    def length(self) -> float:
+        return euclidean_cost(self.waypoints)
+
+
+def lane_rows(rows: int, lane_cells: int) -> np.ndarray:
+    """Rows of a window on which sweep lanes run, ``lane_cells`` apart
+
+    A lane on row r sweeps rows ``r - lane_cells // 2`` up to
+    ``r - lane_cells // 2 + lane_cells``; the last lane is moved up to the
+    bottom edge if needed so the whole window is spanned.
+    """
+    half = lane_cells // 2
+    lanes = np.arange(half, rows, lane_cells)
+    if lanes.size == 0:
+        return np.array([rows // 2])
+    if lanes[-1] - half + lane_cells < rows:
+        lanes = np.append(lanes, max(rows - lane_cells + half, lanes[-1] + 1))
+    return np.minimum(lanes, rows - 1)
+
+
+def sweep_segments(free: np.ndarray, lanes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Free runs along each lane as (lane index, first col, end col) arrays
+
+    Runs come from the sign changes of the padded lane rows, found for all
+    lanes at once; they are ordered by lane, then column. End columns are
+    exclusive.
+    """
+    padded = np.zeros((len(lanes), free.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = free[lanes]
+    steps = np.diff(padded, axis=1)
+    lane, first = np.nonzero(steps == 1)
+    _, end = np.nonzero(steps == -1)
+    return lane, first, end
+
+
+def decompose(lane: np.ndarray, first: np.ndarray, end: np.ndarray) -> List[List[int]]:
+    """Group lane segments into boustrophedon cells
+
+    Segments on neighbouring lanes join one cell when they overlap each
+    other and nothing else; a split or merge (an obstacle appearing or
+    disappearing) starts new cells. Overlaps between two lanes are counted
+    with ``searchsorted`` over the sorted, disjoint runs of each lane.
+    Returns each cell as segment indices in lane order.
+    """
+    count = len(lane)
+    below = np.full(count, -1, dtype=np.int64)
+    has_above = np.zeros(count, dtype=bool)
+    bounds = np.searchsorted(lane, np.arange(lane.max() + 2)) if count else np.zeros(1, dtype=np.int64)
+    for k in range(len(bounds) - 2):
+        a0, a1 = bounds[k], bounds[k + 1]
+        b0, b1 = bounds[k + 1], bounds[k + 2]
+        if a0 == a1 or b0 == b1:
+            continue
+        # Segments of lane k + 1 overlapping each segment of lane k, and back
+        lo = b0 + np.searchsorted(end[b0:b1], first[a0:a1], side='right')
+        hi = b0 + np.searchsorted(first[b0:b1], end[a0:a1], side='left')
+        up_lo = a0 + np.searchsorted(end[a0:a1], first[b0:b1], side='right')
+        up_hi = a0 + np.searchsorted(first[a0:a1], end[b0:b1], side='left')
+        single = np.nonzero(hi - lo == 1)[0]
+        target = lo[single]
+        linked = (up_hi - up_lo)[target - b0] == 1
+        below[a0 + single[linked]] = target[linked]
+        has_above[target[linked]] = True
+
+    cells = []
+    for head in np.nonzero(~has_above)[0]:
+        cell = [int(head)]
+        while below[cell[-1]] >= 0:
+            cell.append(int(below[cell[-1]]))
+        cells.append(cell)
+    return cells
+
+
+class _Connector:
+    """Straight or searched links between cells of the free window"""
+
+    def __init__(self, free: np.ndarray, max_expansions: int):
+        self.blocked = (~free).astype(np.uint8)
+        self.cells = flat_cells(self.blocked)
+        self.cols = free.shape[1]
+        self.max_expansions = max_expansions
+        self.workspace = SearchWorkspace(free.shape)
+
+    def link(self, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Cells after ``a`` up to ``b`` joined by straight segments, or None"""
+        if a == b:
+            return []
+        if line_of_sight(self.cells, self.cols, a, b):
+            return [b]
+        result = astar(self.blocked, a, b, self.max_expansions, self.workspace)
+        if not result.found:
+            return None
+        return prune_path(self.blocked, result.path)[1:]
+
+
+def _cell_sweep(cell: List[int], lane_row: np.ndarray, first: np.ndarray, end: np.ndarray, reverse: bool, right: bool):
+    """(start, finish) cells of each lane for one way of sweeping a cell"""
+    order = cell[::-1] if reverse else cell
+    lanes = []
+    for i, seg in enumerate(order):
+        row = int(lane_row[seg])
+        ends = (int(first[seg]), int(end[seg]) - 1)
+        if right != (i % 2 == 1):
+            lanes.append(((row, ends[0]), (row, ends[1])))
+        else:
+            lanes.append(((row, ends[1]), (row, ends[0])))
+    return lanes
+
+
+def plan_coverage(
+    free: np.ndarray,
+    lane_cells: int,
+    offset: Tuple[int, int] = (0, 0),
+    obstacles: Optional[np.ndarray] = None,
+    transpose: bool = False,
+    max_expansions: int = DEFAULT_CONNECTOR_EXPANSIONS
+) -> CoveragePlan:
+    """Boustrophedon coverage of a window of free (traversable) cells
+
+    Lanes run along rows, ``lane_cells`` apart; with ``transpose`` they run
+    along columns instead (the window is swept transposed and the result
+    mapped back). The lanes' free runs are grouped into cells
+    (``decompose``), each swept back and forth, and cells are visited
+    greedily by nearest entry corner. Lanes and cells are linked by straight
+    segments where possible, otherwise by A* inside the window; a cell that
+    cannot be reached without leaving the window is skipped. ``offset`` is
+    the window's (row, col) in the full grid. ``obstacles`` (the raw map
+    over the same window, before inflation) sets which cells count towards
+    ``coverage``.
+    """
+    if transpose:
+        free = free.T
+        obstacles = obstacles.T if obstacles is not None else None
+    free = np.ascontiguousarray(free, dtype=bool)
+    rows, cols = free.shape
+    lane_cells = max(int(lane_cells), 1)
+    lanes = lane_rows(rows, lane_cells)
+    lane, first, end = sweep_segments(free, lanes)
+    plan = CoveragePlan(lanes=len(lane))
+    if not len(lane):
+        return plan
+    lane_row = lanes[lane]
+    cells = decompose(lane, first, end)
+    plan.cells = len(cells)
+
+    connector = _Connector(free, max_expansions)
+    remaining = list(range(len(cells)))
+    waypoints: List[Tuple[int, int]] = []
+    swept = []
+    position = None
+    while remaining:
+        # Nearest entry corner among the cells left; ties go to the earliest
+        best = None
+        for c in remaining:
+            for reverse in (False, True):
+                seg = cells[c][-1] if reverse else cells[c][0]
+                for right in (True, False):
+                    entry = (lane_row[seg], first[seg] if right else end[seg] - 1)
+                    distance = 0.0 if position is None else math.hypot(entry[0] - position[0], entry[1] - position[1])
+                    if best is None or distance < best[0]:
+                        best = (distance, c, reverse, right)
+        _, c, reverse, right = best
+        remaining.remove(c)
+        lanes_of = _cell_sweep(cells[c], lane_row, first, end, reverse, right)
+        if position is not None:
+            link = connector.link(position, lanes_of[0][0])
+            if link is None:
+                plan.skipped += 1
+                continue
+            waypoints.extend(link)
+        else:
+            waypoints.append(lanes_of[0][0])
+        for i, (start, finish) in enumerate(lanes_of):
+            if i > 0:
+                link = connector.link(waypoints[-1], start)
+                if link is None:
+                    # Neighbouring lanes of a cell overlap, so this only
+                    # happens when the search budget runs out
+                    break
+                waypoints.extend(link)
+            if finish != start:
+                waypoints.append(finish)
+            swept.append((start, finish))
+        position = waypoints[-1]
+
+    plan.coverage = _swept_fraction(free if obstacles is None else ~obstacles.astype(bool), swept, lane_cells)
+    row0, col0 = offset
+    if transpose:
+        plan.waypoints = [(col + row0, row + col0) for row, col in waypoints]
+    else:
+        plan.waypoints = [(row + row0, col + col0) for row, col in waypoints]
+    return plan
+
+
+def _swept_fraction(free: np.ndarray, swept: List[Tuple[Tuple[int, int], Tuple[int, int]]], lane_cells: int) -> float:
+    """Fraction of free cells inside the band a tool sweeps along lanes"""
+    total = int(np.count_nonzero(free))
+    if not total:
+        return 0.0
+    mask = np.zeros_like(free, dtype=bool)
+    half = lane_cells // 2
+    for (row, c0), (_, c1) in swept:
+        c0, c1 = min(c0, c1), max(c0, c1)
+        mask[max(row - half, 0):row - half + lane_cells, max(c0 - half, 0):c1 - half + lane_cells] = True
+    return float(np.count_nonzero(mask & free)) / total
@@ -0,0 +1,187 @@
+import math
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .flat_forest import FlatForest
+
+# Largest batch scored by the flat forest engine when the scikit-learn model
+# is also available; sklearn's compiled traversal wins on bigger batches
+FLAT_FOREST_MAX_ROWS = int(os.environ.get('AI_FLAT_FOREST_MAX_ROWS', '4096'))
+
+FeatureInput = Union[np.ndarray, Sequence[Sequence[float]], Sequence[Dict], Dict[str, Sequence[float]]]
+
+
+@dataclass(frozen=True)
+class Feature:
+    """One model input column and where a single request carries it
+
+    ``source`` names the request argument holding the value: a dict
+    argument the value is looked up in by ``name``, or, with ``scalar``,
+    the argument itself. When predictions are memoized, values in the same
+    ``floor(value / quantum)`` bucket share a key, so two values closer
+    than ``quantum`` can still fall on either side of a bucket edge (0
+    compares exact values).
+    """
+    name: str
+    source: str
+    scalar: bool = False
+    quantum: float = 0.0
+
+
+class FeatureSchema:
+    """Ordered model inputs, assembled straight into a float matrix
+
+    Every input form (a single request's arguments, row dicts, columnar
+    dicts, or arrays already in column order) is written into one
+    preallocated float64 array in the model's column order.
+    """
+
+    def __init__(self, features: Sequence[Feature]):
+        self.features = tuple(features)
+        self.names = tuple(feature.name for feature in self.features)
+        self.quanta = tuple(feature.quantum for feature in self.features)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def row(self, **sources: Any) -> np.ndarray:
+        """1 x N matrix from the keyword arguments of a single request"""
+        out = np.empty((1, len(self.features)))
+        try:
+            for j, feature in enumerate(self.features):
+                source = sources[feature.source]
+                out[0, j] = source if feature.scalar else source[feature.name]
+        except KeyError as e:
+            raise ValueError(f"Missing feature: {e.args[0]}")
+        return out
+
+    def bucket(self, values: Sequence[float], quanta: Optional[Sequence[float]] = None) -> tuple:
+        """Hashable key of one feature row, each value floored to its quantum
+
+        ``quanta`` overrides the schema's per-feature quanta.
+        """
+        quanta = self.quanta if quanta is None else quanta
+        return tuple(
+            math.floor(value / quantum) if quantum > 0 else value
+            for value, quantum in zip(values, quanta)
+        )
+
+    def matrix(self, data: FeatureInput) -> np.ndarray:
+        """Float matrix with one row per sample and the schema's columns
+
+        ``data`` may be a 2-D array (or nested lists) already in column
+        order, a list of row dicts, or a dict of equally long columns.
+        Missing features, ragged columns and non-numeric values raise
+        ValueError. The result is always a new array.
+        """
+        if isinstance(data, dict):
+            missing = [name for name in self.names if name not in data]
+            if missing:
+                raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+            lengths = {len(data[name]) for name in self.names}
+            if len(lengths) > 1:
+                raise ValueError("Feature columns must all have the same length")
+            out = np.empty((lengths.pop() if lengths else 0, len(self.names)))
+            for j, name in enumerate(self.names):
+                out[:, j] = data[name]
+            return out
+        if len(data) and isinstance(data[0], dict):
+            out = np.empty((len(data), len(self.names)))
+            try:
+                for j, name in enumerate(self.names):
+                    out[:, j] = [row[name] for row in data]
+            except KeyError as e:
+                raise ValueError(f"Missing feature: {e.args[0]}")
+            return out
+        out = np.array(data, dtype=np.float64)
+        if out.size == 0:
+            out = out.reshape(0, len(self.names))
+        if out.ndim != 2 or out.shape[1] != len(self.names):
+            raise ValueError(f"Expected rows of {len(self.names)} features: {', '.join(self.names)}")
+        return out
+
+
+def affine_terms(scaler: Any, n_features: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """(multiplier, offset) equivalent to a fitted StandardScaler's transform
+
+    ``scaler.transform(X)`` equals ``X * multiplier + offset``; either term
+    is None when the scaler skips that step. ``None`` (no scaler) gives the
+    identity.
+    """
+    if scaler is None:
+        return None, None
+    n_in = getattr(scaler, 'n_features_in_', n_features)
+    if n_in != n_features:
+        raise ValueError(f"Scaler expects {n_in} features, the model schema has {n_features}")
+    mean = getattr(scaler, 'mean_', None) if getattr(scaler, 'with_mean', True) else None
+    scale = getattr(scaler, 'scale_', None) if getattr(scaler, 'with_std', True) else None
+    multiplier = 1.0 / np.asarray(scale, dtype=np.float64) if scale is not None else None
+    offset = None
+    if mean is not None:
+        offset = -np.asarray(mean, dtype=np.float64) * (multiplier if multiplier is not None else 1.0)
+    return multiplier, offset
+
+
+class FeaturePipeline:
+    """A model with its own fitted scaler, compiled into one transform
+
+    The scaler is reduced to a multiply-add applied in place on the
+    assembled feature matrix, followed directly by the model's
+    ``predict``; no scikit-learn transform (and its validation and copies)
+    runs per request. With a ``flat`` forest, batches of up to
+    ``flat_max_rows`` rows are scored by its vectorized traversal, which
+    avoids scikit-learn's per-call overhead; larger ones go to the
+    scikit-learn model, taken from ``model`` or fetched with ``load_model``
+    on first need. Without either, the flat forest scores everything.
+    ``source`` identifies the artifacts it was compiled from, so callers
+    can tell when to recompile.
+    """
+
+    def __init__(
+        self,
+        schema: FeatureSchema,
+        model: Any = None,
+        scaler: Any = None,
+        source: Any = None,
+        flat: Optional[FlatForest] = None,
+        load_model: Optional[Callable[[], Any]] = None,
+        flat_max_rows: int = FLAT_FOREST_MAX_ROWS
+    ):
+        if model is None and flat is None:
+            raise ValueError("A pipeline needs a model or a flat forest")
+        self.schema = schema
+        self.model = model
+        self.source = source
+        self.flat = flat
+        self.load_model = load_model
+        self.flat_max_rows = flat_max_rows
+        self.multiplier, self.offset = affine_terms(scaler, len(schema))
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """Scale assembled features; modifies and returns ``features``"""
+        if self.multiplier is not None:
+            features *= self.multiplier
+        if self.offset is not None:
+            features += self.offset
+        return features
+
+    def predict_matrix(self, features: np.ndarray) -> np.ndarray:
+        """Predictions for an assembled matrix, which is scaled in place"""
+        if not len(features):
+            return np.empty(0)
+        features = self.transform(features)
+        if self.flat is not None and len(features) <= self.flat_max_rows:
+            return self.flat.predict(features)
+        model = self.model if self.model is not None else (self.load_model() if self.load_model else None)
+        if model is None:
+            return self.flat.predict(features)
+        return model.predict(features)
+
+    def predict(self, data: FeatureInput) -> np.ndarray:
+        return self.predict_matrix(self.schema.matrix(data))
+
+    def predict_one(self, **sources: Any) -> float:
+        return float(self.predict_matrix(self.schema.row(**sources))[0])
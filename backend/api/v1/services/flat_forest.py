@@ -0,0 +1,127 @@
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .model_registry import file_digest
+
+# Version of the flat array layout; ai/train_models.py exports with export_flat_forest
+FLAT_FOREST_FORMAT = 1
+# Rows traversed together; bounds the (rows x trees) node index arrays
+DEFAULT_CHUNK_ROWS = 8192
+
+
+def flatten_forest(model: Any) -> Dict[str, np.ndarray]:
+    """Flat arrays of a fitted scikit-learn forest regressor
+
+    All trees are concatenated into one node table: ``feature``,
+    ``threshold``, ``left``, ``right`` and ``value`` per node (single
+    output), ``roots`` holds each tree's first node and ``depth`` the
+    deepest tree. Leaves point to themselves with ``feature`` 0, so a
+    traversal can run a fixed ``depth`` steps without checking for them.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    sizes = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    feature, threshold, left, right, value = [], [], [], [], []
+    for root, tree in zip(roots, trees):
+        leaf = tree.children_left < 0
+        own = np.arange(root, root + tree.node_count)
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, 0.0, tree.threshold))
+        left.append(np.where(leaf, own, tree.children_left + root))
+        right.append(np.where(leaf, own, tree.children_right + root))
+        value.append(tree.value[:, 0, 0])
+    return {
+        'format': np.int64(FLAT_FOREST_FORMAT),
+        'n_features': np.int64(model.n_features_in_),
+        'depth': np.int64(max(tree.max_depth for tree in trees)),
+        'roots': roots.astype(np.int32),
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'value': np.concatenate(value).astype(np.float64)
+    }
+
+
+def export_flat_forest(model: Any, model_path: str) -> Dict[str, Any]:
+    """``flatten_forest`` arrays of the model saved at ``model_path``
+
+    Records the digest of that file as ``model_digest``, so a reader can
+    tell whether the export still matches the model file next to it.
+    """
+    return dict(flatten_forest(model), model_digest=file_digest(model_path))
+
+
+def is_flattenable(model: Any) -> bool:
+    """Whether ``model`` is a single-output forest regressor averaging its trees"""
+    estimators = getattr(model, 'estimators_', None)
+    return (
+        type(model).__name__ in ('RandomForestRegressor', 'ExtraTreesRegressor')
+        and bool(estimators)
+        and getattr(model, 'n_outputs_', 1) == 1
+    )
+
+
+class FlatForest:
+    """Forest regressor scored by a vectorized traversal of flat node arrays
+
+    Every row descends every tree at once: each step gathers the split
+    feature and threshold of all (row, tree) nodes and moves to a child,
+    for ``depth`` steps. Values are compared as float32 like scikit-learn
+    does, so predictions match ``model.predict`` up to the order of the
+    final averaging. Built from ``flatten_forest`` output or an exported
+    artifact with the same keys; read-only (memory-mapped) arrays are fine.
+    """
+
+    def __init__(self, arrays: Dict[str, Any]):
+        if int(arrays['format']) != FLAT_FOREST_FORMAT:
+            raise ValueError(f"Unsupported flat forest format: {int(arrays['format'])}")
+        self.n_features = int(arrays['n_features'])
+        self.depth = int(arrays['depth'])
+        self.roots = np.asarray(arrays['roots'], dtype=np.int64)
+        self.feature = np.asarray(arrays['feature'])
+        self.threshold = np.asarray(arrays['threshold'])
+        self.value = np.asarray(arrays['value'])
+        # Children side by side, so a step is a single gather at 2 * node + side
+        self.children = np.stack([arrays['left'], arrays['right']], axis=1).ravel().astype(np.int64)
+
+    @classmethod
+    def from_model(cls, model: Any) -> 'FlatForest':
+        return cls(flatten_forest(model))
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def predict(self, X: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected rows of {self.n_features} features")
+        out = np.empty(len(X))
+        for start in range(0, len(X), chunk_rows):
+            out[start:start + chunk_rows] = self._predict_chunk(X[start:start + chunk_rows])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        # Flattened float32 rows; row r's feature f sits at r * n_features + f
+        values = np.ascontiguousarray(X, dtype=np.float32).ravel()
+        base = (np.arange(len(X)) * self.n_features)[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.depth):
+            right = values[base + self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + right]
+        return self.value[node].mean(axis=1)
+
+
+def flat_forest_or_none(model: Any, exported: Optional[Dict[str, Any]] = None) -> Optional[FlatForest]:
+    """Flat engine for ``model``, from its exported arrays when available"""
+    if exported is not None:
+        return FlatForest(exported)
+    if is_flattenable(model):
+        return FlatForest.from_model(model)
+    return None
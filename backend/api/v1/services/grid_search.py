@@ -0,0 +1,725 @@
+import math
+from dataclasses import dataclass, field
+from heapq import heappush, heappop
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+SQRT2 = math.sqrt(2.0)
+
+# 8-connected move set: (d_row, d_col, step cost)
+MOVES = (
+    (0, 1, 1.0), (1, 0, 1.0), (0, -1, 1.0), (-1, 0, 1.0),
+    (1, 1, SQRT2), (-1, -1, SQRT2), (1, -1, SQRT2), (-1, 1, SQRT2)
+)
+# Line-of-sight checks crossing more cells than this are done with NumPy
+# instead of walking the cells one by one
+LOS_VECTOR_CELLS = 128
+
+
+def octile(dr: int, dc: int) -> float:
+    """Octile distance for an 8-connected grid with unit/sqrt(2) moves"""
+    dr = abs(dr)
+    dc = abs(dc)
+    if dr > dc:
+        return dc * SQRT2 + (dr - dc)
+    return dr * SQRT2 + (dc - dr)
+
+
+@dataclass
+class SearchResult:
+    """Outcome of a grid search"""
+    path: List[Tuple[int, int]] = field(default_factory=list)
+    cost: float = math.inf
+    expansions: int = 0
+    status: str = 'no_path'  # 'found', 'no_path' or 'budget_exhausted'
+
+    @property
+    def found(self) -> bool:
+        return self.status == 'found'
+
+
+class SearchWorkspace:
+    """Reusable per-grid-shape search state
+
+    g-scores, parent indices and closed flags live in flat NumPy arrays
+    indexed by linearized cell id (``row * cols + col``). The arrays are
+    allocated once and only the cells touched by the previous search are
+    reset, so repeated searches neither reallocate nor clear the full grid.
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        self.shape = (int(shape[0]), int(shape[1]))
+        size = self.shape[0] * self.shape[1]
+        self.g = np.full(size, np.inf, dtype=np.float64)
+        self.parent = np.full(size, -1, dtype=np.int64)
+        self.closed = np.zeros(size, dtype=np.uint8)
+        self.touched = []
+
+    def reset(self) -> None:
+        if self.touched:
+            idx = np.fromiter(self.touched, dtype=np.int64, count=len(self.touched))
+            self.g[idx] = np.inf
+            self.parent[idx] = -1
+            self.closed[idx] = 0
+            self.touched = []
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.g.nbytes + self.parent.nbytes + self.closed.nbytes)
+
+
+def flat_cells(grid: np.ndarray) -> memoryview:
+    """Flat uint8 view of an occupancy grid for fast scalar access"""
+    return memoryview(np.ascontiguousarray(grid, dtype=np.uint8).reshape(-1))
+
+
+def reconstruct_path(parent: memoryview, goal: int, cols: int) -> List[Tuple[int, int]]:
+    """Walk parent links back from goal to the start"""
+    path = []
+    current = goal
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parent[current]
+    path.reverse()
+    return path
+
+
+def astar(
+    grid: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    max_expansions: Optional[int] = None,
+    workspace: Optional[SearchWorkspace] = None
+) -> SearchResult:
+    """A* over an 8-connected occupancy grid
+
+    Uses an octile heuristic, a lazy-deletion binary heap (stale entries are
+    skipped when popped instead of being searched for on push) and the flat
+    arrays of a ``SearchWorkspace``. ``max_expansions`` bounds the work done
+    for unreachable or very distant goals. The returned path includes both
+    start and goal cells.
+    """
+    rows, cols = grid.shape
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+        return SearchResult()
+    if not (0 <= goal[0] < rows and 0 <= goal[1] < cols):
+        return SearchResult()
+
+    cells = flat_cells(grid)
+    start_idx = start[0] * cols + start[1]
+    goal_idx = goal[0] * cols + goal[1]
+    if cells[goal_idx]:
+        return SearchResult()
+
+    if workspace is None or workspace.shape != (rows, cols):
+        workspace = SearchWorkspace((rows, cols))
+    workspace.reset()
+    g = memoryview(workspace.g)
+    parent = memoryview(workspace.parent)
+    closed = memoryview(workspace.closed)
+    touched = workspace.touched
+
+    goal_r, goal_c = goal
+    g[start_idx] = 0.0
+    touched.append(start_idx)
+    h = octile(start[0] - goal_r, start[1] - goal_c)
+    # Ties on f are broken towards smaller h, i.e. deeper nodes
+    oheap = [(h, h, start_idx)]
+    expansions = 0
+
+    while oheap:
+        _, _, current = heappop(oheap)
+        if closed[current]:
+            continue
+
+        if current == goal_idx:
+            return SearchResult(
+                reconstruct_path(parent, goal_idx, cols),
+                g[goal_idx],
+                expansions,
+                'found'
+            )
+
+        if max_expansions is not None and expansions >= max_expansions:
+            return SearchResult(expansions=expansions, status='budget_exhausted')
+
+        closed[current] = 1
+        expansions += 1
+        r, c = divmod(current, cols)
+        g_current = g[current]
+
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            if cells[neighbor] or closed[neighbor]:
+                continue
+
+            tentative_g = g_current + step
+            if tentative_g < g[neighbor]:
+                if g[neighbor] == math.inf:
+                    touched.append(neighbor)
+                g[neighbor] = tentative_g
+                parent[neighbor] = current
+                h = octile(nr - goal_r, nc - goal_c)
+                heappush(oheap, (tentative_g + h, h, neighbor))
+
+    return SearchResult(expansions=expansions)
+
+
+def astar_sparse(
+    occupied: Callable[[int, int], bool],
+    shape: Tuple[int, int],
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    max_expansions: Optional[int] = None
+) -> SearchResult:
+    """A* with dict-based search state for grids not held in memory
+
+    Same moves, heuristic and tie-breaking as ``astar``, but cells are read
+    through ``occupied(row, col)`` and g-scores/parents are stored only for
+    cells the search touches, so memory grows with the explored region
+    rather than the map size.
+    """
+    rows, cols = shape
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+        return SearchResult()
+    if not (0 <= goal[0] < rows and 0 <= goal[1] < cols):
+        return SearchResult()
+    if occupied(goal[0], goal[1]):
+        return SearchResult()
+
+    start_idx = start[0] * cols + start[1]
+    goal_idx = goal[0] * cols + goal[1]
+    goal_r, goal_c = goal
+    g = {start_idx: 0.0}
+    parent = {start_idx: -1}
+    closed = set()
+    h = octile(start[0] - goal_r, start[1] - goal_c)
+    oheap = [(h, h, start_idx)]
+    expansions = 0
+
+    while oheap:
+        _, _, current = heappop(oheap)
+        if current in closed:
+            continue
+
+        if current == goal_idx:
+            return SearchResult(reconstruct_path(parent, goal_idx, cols), g[goal_idx], expansions, 'found')
+
+        if max_expansions is not None and expansions >= max_expansions:
+            return SearchResult(expansions=expansions, status='budget_exhausted')
+
+        closed.add(current)
+        expansions += 1
+        r, c = divmod(current, cols)
+        g_current = g[current]
+
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            if neighbor in closed or occupied(nr, nc):
+                continue
+
+            tentative_g = g_current + step
+            if tentative_g < g.get(neighbor, math.inf):
+                g[neighbor] = tentative_g
+                parent[neighbor] = current
+                h = octile(nr - goal_r, nc - goal_c)
+                heappush(oheap, (tentative_g + h, h, neighbor))
+
+    return SearchResult(expansions=expansions)
+
+
+def path_cost(path: List[Tuple[int, int]]) -> float:
+    """Length of a grid path under the 8-connected move costs"""
+    cost = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        cost += octile(r1 - r0, c1 - c0)
+    return cost
+
+
+def euclidean_cost(path: List[Tuple[int, int]]) -> float:
+    """Length of an any-angle path through cell centers"""
+    cost = 0.0
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        cost += math.hypot(r1 - r0, c1 - c0)
+    return cost
+
+
+def line_of_sight(cells: memoryview, cols: int, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    """Whether the segment between the centers of cells a and b is free
+
+    Walks every cell the segment passes through (the cell a itself is not
+    checked), using integer arithmetic only. A segment passing exactly
+    through a grid corner only touches the two cells beside it; like a
+    diagonal grid move it is allowed unless both of them are occupied.
+    """
+    r, c = a
+    r1, c1 = b
+    dr = abs(r1 - r)
+    dc = abs(c1 - c)
+    sr = 1 if r1 > r else -1
+    sc = 1 if c1 > c else -1
+    if dr + dc > LOS_VECTOR_CELLS:
+        return _line_of_sight_vectorized(np.asarray(cells), cols, r, c, dr, dc, sr, sc)
+    # Crossings of column/row boundaries happen at t = (0.5 + i) / dc and
+    # (0.5 + j) / dr; compare them scaled by 2 * dr * dc
+    i = j = 0
+    while i < dc or j < dr:
+        t_col = (1 + 2 * i) * dr
+        t_row = (1 + 2 * j) * dc
+        if j >= dr or (i < dc and t_col < t_row):
+            c += sc
+            i += 1
+        elif i >= dc or t_row < t_col:
+            r += sr
+            j += 1
+        else:
+            if cells[(r + sr) * cols + c] and cells[r * cols + c + sc]:
+                return False
+            r += sr
+            c += sc
+            i += 1
+            j += 1
+        if cells[r * cols + c]:
+            return False
+    return True
+
+
+def _line_of_sight_vectorized(cells: np.ndarray, cols: int, r: int, c: int, dr: int, dc: int, sr: int, sc: int) -> bool:
+    """``line_of_sight`` with every boundary crossing of the segment computed at once"""
+    if dr == 0 or dc == 0:
+        steps = np.arange(1, dr + dc + 1, dtype=np.int64)
+        return not cells[(r + sr * steps * (dr > 0)) * cols + c + sc * steps * (dc > 0)].any()
+    t_col = (1 + 2 * np.arange(dc, dtype=np.int64)) * dr
+    t_row = (1 + 2 * np.arange(dr, dtype=np.int64)) * dc
+    times = np.concatenate((t_col, t_row))
+    times.sort()
+    # A column and a row crossed at once is a crossing through a corner
+    corner = times[1:] == times[:-1]
+    corners = times[1:][corner]
+    times = times[np.concatenate(([True], ~corner))]
+    # Cell entered at each crossing, from the columns and rows crossed so far
+    i = np.searchsorted(t_col, times, 'right')
+    j = np.searchsorted(t_row, times, 'right')
+    if cells[(r + sr * j) * cols + c + sc * i].any():
+        return False
+    # Corners are blocked when both cells beside them are occupied
+    if len(corners):
+        i = np.searchsorted(t_col, corners, 'right')
+        j = np.searchsorted(t_row, corners, 'right')
+        beside_row = cells[(r + sr * j) * cols + c + sc * (i - 1)]
+        beside_col = cells[(r + sr * (j - 1)) * cols + c + sc * i]
+        if (beside_row & beside_col).any():
+            return False
+    return True
+
+
+def prune_path(grid: np.ndarray, path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Drop grid path cells that are in line of sight past them
+
+    From each kept cell the farthest visible cell is found by galloping and
+    then bisecting, so a path of N cells needs O(log N) line-of-sight checks
+    per kept waypoint. Consecutive cells are always accepted.
+    """
+    n = len(path)
+    if n < 3:
+        return list(path)
+    cells = flat_cells(grid)
+    cols = grid.shape[1]
+    keep = [path[0]]
+    i = 0
+    while i < n - 1:
+        best = i + 1
+        failed = None
+        k = 1
+        while best < n - 1:
+            j = min(i + 2 ** k, n - 1)
+            if line_of_sight(cells, cols, path[i], path[j]):
+                best = j
+                k += 1
+            else:
+                failed = j
+                break
+        if failed is not None:
+            lo, hi = best, failed
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if line_of_sight(cells, cols, path[i], path[mid]):
+                    lo = mid
+                else:
+                    hi = mid
+            best = lo
+        keep.append(path[best])
+        i = best
+    return keep
+
+
+def theta_star(
+    grid: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    max_expansions: Optional[int] = None,
+    workspace: Optional[SearchWorkspace] = None
+) -> SearchResult:
+    """Any-angle search (Lazy Theta*) over an occupancy grid
+
+    Expands the same 8-connected neighbourhood as ``astar``, but every
+    neighbour is linked straight to the current cell's parent, so paths are
+    made of a few straight segments between cell centers instead of one
+    entry per cell. The line of sight behind such a shortcut is only
+    checked once, when the cell is expanded; if it fails the cell falls
+    back to its best expanded neighbour. The octile heuristic of ``astar``
+    overestimates straight-line distances by at most 8%, so the search
+    heads for the goal about as directly as ``astar`` while paths stay
+    within that factor of the shortest any-angle path. The found path is
+    then pulled taut with ``prune_path``; the result holds only the segment
+    endpoints and its cost is their Euclidean length in cells.
+    """
+    rows, cols = grid.shape
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+        return SearchResult()
+    if not (0 <= goal[0] < rows and 0 <= goal[1] < cols):
+        return SearchResult()
+
+    cells = flat_cells(grid)
+    start_idx = start[0] * cols + start[1]
+    goal_idx = goal[0] * cols + goal[1]
+    if cells[goal_idx]:
+        return SearchResult()
+
+    if workspace is None or workspace.shape != (rows, cols):
+        workspace = SearchWorkspace((rows, cols))
+    workspace.reset()
+    g = memoryview(workspace.g)
+    parent = memoryview(workspace.parent)
+    closed = memoryview(workspace.closed)
+    touched = workspace.touched
+
+    goal_r, goal_c = goal
+    g[start_idx] = 0.0
+    touched.append(start_idx)
+    h = octile(start[0] - goal_r, start[1] - goal_c)
+    oheap = [(h, h, start_idx)]
+    expansions = 0
+
+    while oheap:
+        _, _, current = heappop(oheap)
+        if closed[current]:
+            continue
+        r, c = divmod(current, cols)
+
+        via = parent[current]
+        if via != -1:
+            pr, pc = divmod(via, cols)
+            # Links to a neighbouring cell are ordinary grid moves
+            if abs(pr - r) > 1 or abs(pc - c) > 1:
+                if not line_of_sight(cells, cols, (pr, pc), (r, c)):
+                    # Re-attach to the cheapest expanded neighbour
+                    best = math.inf
+                    for dr, dc, step in MOVES:
+                        nr = r + dr
+                        nc = c + dc
+                        if 0 <= nr < rows and 0 <= nc < cols:
+                            neighbor = nr * cols + nc
+                            if closed[neighbor] and g[neighbor] + step < best:
+                                best = g[neighbor] + step
+                                via = neighbor
+                    parent[current] = via
+                    g[current] = best
+
+        if current == goal_idx:
+            path = prune_path(grid, reconstruct_path(parent, goal_idx, cols))
+            return SearchResult(path, euclidean_cost(path), expansions, 'found')
+
+        if max_expansions is not None and expansions >= max_expansions:
+            return SearchResult(expansions=expansions, status='budget_exhausted')
+
+        closed[current] = 1
+        expansions += 1
+        if via == -1:
+            via = current
+            vr, vc = r, c
+        else:
+            vr, vc = divmod(via, cols)
+        g_via = g[via]
+
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if nr < 0 or nr >= rows or nc < 0 or nc >= cols:
+                continue
+            neighbor = nr * cols + nc
+            if cells[neighbor] or closed[neighbor]:
+                continue
+
+            tentative_g = g_via + math.hypot(nr - vr, nc - vc)
+            if tentative_g < g[neighbor]:
+                if g[neighbor] == math.inf:
+                    touched.append(neighbor)
+                g[neighbor] = tentative_g
+                parent[neighbor] = via
+                h = octile(nr - goal_r, nc - goal_c)
+                heappush(oheap, (tentative_g + h, h, neighbor))
+
+    return SearchResult(expansions=expansions)
+
+
+def _direction(a: int, b: int) -> int:
+    return (b > a) - (b < a)
+
+
+class JumpTable:
+    """Precomputed straight-line jump targets for Jump Point Search
+
+    For every cell and each of the four straight directions, stores the
+    index (column for east/west, row for north/south) of the nearest cell at
+    or beyond it that stops a straight jump: an obstacle, the map edge or a
+    cell with a forced neighbour. Straight jumps become O(1) lookups, which
+    leaves only the diagonal scans to step cell by cell.
+    """
+
+    def __init__(self, grid: np.ndarray):
+        rows, cols = grid.shape
+        self.shape = (rows, cols)
+        blocked = np.ones((rows + 2, cols + 2), dtype=bool)
+        blocked[1:-1, 1:-1] = grid != 0
+        inner = blocked[1:-1, 1:-1]
+        free = ~blocked
+
+        forced_east = (blocked[2:, 1:-1] & free[2:, 2:]) | (blocked[:-2, 1:-1] & free[:-2, 2:])
+        forced_west = (blocked[2:, 1:-1] & free[2:, :-2]) | (blocked[:-2, 1:-1] & free[:-2, :-2])
+        forced_south = (blocked[1:-1, 2:] & free[2:, 2:]) | (blocked[1:-1, :-2] & free[2:, :-2])
+        forced_north = (blocked[1:-1, 2:] & free[:-2, 2:]) | (blocked[1:-1, :-2] & free[:-2, :-2])
+
+        dtype = np.int16 if max(rows, cols) < np.iinfo(np.int16).max else np.int32
+        col_index = np.arange(cols)[None, :]
+        row_index = np.arange(rows)[:, None]
+
+        stop = np.where(inner | forced_east, col_index, cols)
+        self.east = np.minimum.accumulate(stop[:, ::-1], axis=1)[:, ::-1].astype(dtype)
+        stop = np.where(inner | forced_west, col_index, -1)
+        self.west = np.maximum.accumulate(stop, axis=1).astype(dtype)
+        stop = np.where(inner | forced_south, row_index, rows)
+        self.south = np.minimum.accumulate(stop[::-1], axis=0)[::-1].astype(dtype)
+        stop = np.where(inner | forced_north, row_index, -1)
+        self.north = np.maximum.accumulate(stop, axis=0).astype(dtype)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.east.nbytes + self.west.nbytes + self.south.nbytes + self.north.nbytes)
+
+
+def jps(
+    grid: np.ndarray,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    max_expansions: Optional[int] = None,
+    workspace: Optional[SearchWorkspace] = None,
+    jump_table: Optional[JumpTable] = None
+) -> SearchResult:
+    """Jump Point Search over an 8-connected occupancy grid
+
+    Uses the same move set and costs as ``astar`` (diagonal moves are only
+    blocked by an occupied target cell), so returned paths have identical
+    cost. Only jump points are pushed onto the heap and counted as
+    expansions; the returned path is expanded back to one entry per cell.
+    Pass a cached ``JumpTable`` to avoid rebuilding it per query.
+    """
+    rows, cols = grid.shape
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+        return SearchResult()
+    if not (0 <= goal[0] < rows and 0 <= goal[1] < cols):
+        return SearchResult()
+
+    cells = flat_cells(grid)
+    goal_r, goal_c = goal
+    goal_idx = goal_r * cols + goal_c
+    start_idx = start[0] * cols + start[1]
+    if cells[goal_idx]:
+        return SearchResult()
+
+    if jump_table is None or jump_table.shape != (rows, cols):
+        jump_table = JumpTable(grid)
+    east = memoryview(jump_table.east.reshape(-1))
+    west = memoryview(jump_table.west.reshape(-1))
+    south = memoryview(jump_table.south.reshape(-1))
+    north = memoryview(jump_table.north.reshape(-1))
+
+    def blocked(r: int, c: int) -> bool:
+        return r < 0 or r >= rows or c < 0 or c >= cols or cells[r * cols + c] != 0
+
+    def jump_straight(r: int, c: int, dr: int, dc: int) -> Optional[Tuple[int, int]]:
+        if dr == 0:
+            if dc > 0:
+                if c + 1 >= cols:
+                    return None
+                stop = east[r * cols + c + 1]
+                if r == goal_r and c < goal_c <= stop:
+                    return goal
+                if stop < cols and not cells[r * cols + stop]:
+                    return r, stop
+                return None
+            if c - 1 < 0:
+                return None
+            stop = west[r * cols + c - 1]
+            if r == goal_r and stop <= goal_c < c:
+                return goal
+            if stop >= 0 and not cells[r * cols + stop]:
+                return r, stop
+            return None
+        if dr > 0:
+            if r + 1 >= rows:
+                return None
+            stop = south[(r + 1) * cols + c]
+            if c == goal_c and r < goal_r <= stop:
+                return goal
+            if stop < rows and not cells[stop * cols + c]:
+                return stop, c
+            return None
+        if r - 1 < 0:
+            return None
+        stop = north[(r - 1) * cols + c]
+        if c == goal_c and stop <= goal_r < r:
+            return goal
+        if stop >= 0 and not cells[stop * cols + c]:
+            return stop, c
+        return None
+
+    def jump(r: int, c: int, dr: int, dc: int) -> Optional[Tuple[int, int]]:
+        if dr == 0 or dc == 0:
+            return jump_straight(r, c, dr, dc)
+        while True:
+            r += dr
+            c += dc
+            if blocked(r, c):
+                return None
+            if r == goal_r and c == goal_c:
+                return r, c
+            if (blocked(r, c - dc) and not blocked(r + dr, c - dc)) or \
+                    (blocked(r - dr, c) and not blocked(r - dr, c + dc)):
+                return r, c
+            if jump_straight(r, c, dr, 0) is not None or jump_straight(r, c, 0, dc) is not None:
+                return r, c
+
+    def successor_directions(r: int, c: int, dr: int, dc: int) -> List[Tuple[int, int]]:
+        if dr == 0 and dc == 0:
+            return [(m[0], m[1]) for m in MOVES]
+        if dr == 0:
+            dirs = [(0, dc)]
+            if blocked(r + 1, c):
+                dirs.append((1, dc))
+            if blocked(r - 1, c):
+                dirs.append((-1, dc))
+            return dirs
+        if dc == 0:
+            dirs = [(dr, 0)]
+            if blocked(r, c + 1):
+                dirs.append((dr, 1))
+            if blocked(r, c - 1):
+                dirs.append((dr, -1))
+            return dirs
+        dirs = [(dr, 0), (0, dc), (dr, dc)]
+        if blocked(r, c - dc):
+            dirs.append((dr, -dc))
+        if blocked(r - dr, c):
+            dirs.append((-dr, dc))
+        return dirs
+
+    if workspace is None or workspace.shape != (rows, cols):
+        workspace = SearchWorkspace((rows, cols))
+    workspace.reset()
+    g = memoryview(workspace.g)
+    parent = memoryview(workspace.parent)
+    closed = memoryview(workspace.closed)
+    touched = workspace.touched
+
+    g[start_idx] = 0.0
+    touched.append(start_idx)
+    h = octile(start[0] - goal_r, start[1] - goal_c)
+    oheap = [(h, h, start_idx)]
+    expansions = 0
+
+    while oheap:
+        _, _, current = heappop(oheap)
+        if closed[current]:
+            continue
+
+        if current == goal_idx:
+            jump_points = reconstruct_path(parent, goal_idx, cols)
+            return SearchResult(
+                _interpolate_jump_points(jump_points),
+                g[goal_idx],
+                expansions,
+                'found'
+            )
+
+        if max_expansions is not None and expansions >= max_expansions:
+            return SearchResult(expansions=expansions, status='budget_exhausted')
+
+        closed[current] = 1
+        expansions += 1
+        r, c = divmod(current, cols)
+        g_current = g[current]
+        if parent[current] == -1:
+            dr = dc = 0
+        else:
+            pr, pc = divmod(parent[current], cols)
+            dr, dc = _direction(pr, r), _direction(pc, c)
+
+        for sdr, sdc in successor_directions(r, c, dr, dc):
+            point = jump(r, c, sdr, sdc)
+            if point is None:
+                continue
+            jr, jc = point
+            neighbor = jr * cols + jc
+            if closed[neighbor]:
+                continue
+
+            tentative_g = g_current + octile(jr - r, jc - c)
+            if tentative_g < g[neighbor]:
+                if g[neighbor] == math.inf:
+                    touched.append(neighbor)
+                g[neighbor] = tentative_g
+                parent[neighbor] = current
+                h = octile(jr - goal_r, jc - goal_c)
+                heappush(oheap, (tentative_g + h, h, neighbor))
+
+    return SearchResult(expansions=expansions)
+
+
+def _interpolate_jump_points(points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Expand straight/diagonal segments between jump points cell by cell"""
+    if not points:
+        return []
+    path = [points[0]]
+    for (r0, c0), (r1, c1) in zip(points, points[1:]):
+        dr = _direction(r0, r1)
+        dc = _direction(c0, c1)
+        r, c = r0, c0
+        while (r, c) != (r1, c1):
+            # Diagonal first, then straight, matching the octile segment
+            if r != r1 and c != c1:
+                r += dr
+                c += dc
+            elif r != r1:
+                r += dr
+            else:
+                c += dc
+            path.append((r, c))
+    return path
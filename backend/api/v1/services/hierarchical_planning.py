@@ -0,0 +1,354 @@
+import math
+from heapq import heappush, heappop
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .grid_search import MOVES, SearchResult, astar, octile, path_cost
+
+DEFAULT_CLUSTER_SIZE = 64
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle
+ENTRANCE_SPLIT_WIDTH = 6
+
+
+def _cluster_distances(sub: np.ndarray, sources: List[Tuple[int, int]]) -> np.ndarray:
+    """Shortest 8-connected distances from sources to every cell of a subgrid"""
+    h, w = sub.shape
+    if not sub.any():
+        # Obstacle-free rectangles are convex for octile moves
+        rr, cc = np.mgrid[0:h, 0:w]
+        out = np.empty((len(sources), h * w))
+        for i, (r, c) in enumerate(sources):
+            dr = np.abs(rr - r).ravel()
+            dc = np.abs(cc - c).ravel()
+            out[i] = np.maximum(dr, dc) + (math.sqrt(2.0) - 1.0) * np.minimum(dr, dc)
+        return out
+
+    free = sub == 0
+    # Like A*, allow leaving a source cell even if it is occupied
+    for r, c in sources:
+        free[r, c] = True
+    ids = np.arange(h * w).reshape(h, w)
+    src, dst, weight = [], [], []
+    for dr, dc, step in MOVES:
+        if (dr, dc) not in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            continue
+        rs = slice(max(0, -dr), h - max(0, dr))
+        cs = slice(max(0, -dc), w - max(0, dc))
+        rd = slice(max(0, dr), h - max(0, -dr))
+        cd = slice(max(0, dc), w - max(0, -dc))
+        mask = free[rs, cs] & free[rd, cd]
+        src.append(ids[rs, cs][mask])
+        dst.append(ids[rd, cd][mask])
+        weight.append(np.full(int(mask.sum()), step))
+    graph = csr_matrix(
+        (np.concatenate(weight), (np.concatenate(src), np.concatenate(dst))),
+        shape=(h * w, h * w)
+    )
+    indices = [r * w + c for r, c in sources]
+    return dijkstra(graph, directed=False, indices=indices)
+
+
+class ClusterAbstraction:
+    """HPA* abstraction of an occupancy grid
+
+    The grid is partitioned into square clusters. Entrances are found along
+    each shared cluster border and represented by pairs of transition cells
+    (inter-cluster edges); within each cluster, transition cells are joined
+    by precomputed shortest-path distances (intra-cluster edges). Long
+    queries search this small abstract graph and only the clusters along the
+    chosen corridor are refined at cell level.
+
+    Abstract nodes are identified by their linearized cell id.
+    """
+
+    def __init__(self, grid: np.ndarray, cluster_size: int = DEFAULT_CLUSTER_SIZE):
+        self.cells = grid
+        self.shape = grid.shape
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.shape[0] // cluster_size)
+        self.cluster_cols = -(-self.shape[1] // cluster_size)
+        # (cluster_a, cluster_b) -> [(cell_a, cell_b), ...]
+        self.borders: Dict[tuple, List[Tuple[int, int]]] = {}
+        # cluster -> {node: {node: cost}}
+        self.intra: Dict[tuple, Dict[int, Dict[int, float]]] = {}
+
+        for border in self._all_borders():
+            self.borders[border] = self._find_transitions(*border)
+        self._rebuild_inter()
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                self.intra[(cr, cc)] = self._build_intra((cr, cc))
+
+    @property
+    def node_count(self) -> int:
+        return len(self.inter)
+
+    def cluster_of(self, cell: Tuple[int, int]) -> tuple:
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def cluster_bounds(self, cluster: tuple) -> Tuple[int, int, int, int]:
+        r0 = cluster[0] * self.cluster_size
+        c0 = cluster[1] * self.cluster_size
+        return (
+            r0, min(r0 + self.cluster_size, self.shape[0]),
+            c0, min(c0 + self.cluster_size, self.shape[1])
+        )
+
+    def repaired(self, grid: np.ndarray, window: Tuple[int, int, int, int]) -> 'ClusterAbstraction':
+        """Copy of this abstraction updated for cells changed inside window
+
+        Only borders touching the changed clusters are rescanned and only the
+        changed clusters and their direct neighbours (whose transition sets
+        may have moved) get new intra-cluster distances.
+        """
+        clone = object.__new__(ClusterAbstraction)
+        clone.cells = grid
+        clone.shape = self.shape
+        clone.cluster_size = self.cluster_size
+        clone.cluster_rows = self.cluster_rows
+        clone.cluster_cols = self.cluster_cols
+        clone.borders = dict(self.borders)
+        clone.intra = dict(self.intra)
+
+        r0, r1, c0, c1 = window
+        size = self.cluster_size
+        changed = {
+            (cr, cc)
+            for cr in range(r0 // size, (r1 - 1) // size + 1)
+            for cc in range(c0 // size, (c1 - 1) // size + 1)
+        }
+        affected = set(changed)
+        for border in self._all_borders():
+            if border[0] in changed or border[1] in changed:
+                clone.borders[border] = clone._find_transitions(*border)
+                affected.update(border)
+        clone._rebuild_inter()
+        for cluster in affected:
+            clone.intra[cluster] = clone._build_intra(cluster)
+        return clone
+
+    def find_path(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        max_expansions: Optional[int] = None
+    ) -> SearchResult:
+        """Plan on the abstract graph, then refine the chosen corridor"""
+        grid = self.cells
+        rows, cols = self.shape
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        if not (0 <= start[0] < rows and 0 <= start[1] < cols):
+            return SearchResult()
+        if not (0 <= goal[0] < rows and 0 <= goal[1] < cols) or grid[goal]:
+            return SearchResult()
+
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        if start_cluster == goal_cluster:
+            local = self._refine_in_cluster(start, goal, start_cluster)
+            if local.found:
+                return local
+
+        start_idx = start[0] * cols + start[1]
+        goal_idx = goal[0] * cols + goal[1]
+        start_links = self._link(start, start_cluster)
+        goal_links = self._link(goal, goal_cluster)
+        if not start_links or not goal_links:
+            return SearchResult()
+
+        # Abstract A* over transition nodes plus the temporary start/goal
+        g = {start_idx: 0.0}
+        parent = {start_idx: None}
+        closed = set()
+        h = octile(start[0] - goal[0], start[1] - goal[1])
+        oheap = [(h, h, start_idx)]
+        expansions = 0
+        found = False
+        while oheap:
+            _, _, current = heappop(oheap)
+            if current in closed:
+                continue
+            if current == goal_idx:
+                found = True
+                break
+            if max_expansions is not None and expansions >= max_expansions:
+                return SearchResult(expansions=expansions, status='budget_exhausted')
+            closed.add(current)
+            expansions += 1
+
+            if current == start_idx:
+                edges = start_links.items()
+            else:
+                edges = self._abstract_edges(current, goal_idx, goal_links)
+            for neighbor, cost in edges:
+                if neighbor in closed:
+                    continue
+                tentative_g = g[current] + cost
+                if tentative_g < g.get(neighbor, math.inf):
+                    g[neighbor] = tentative_g
+                    parent[neighbor] = current
+                    nr, nc = divmod(neighbor, cols)
+                    h = octile(nr - goal[0], nc - goal[1])
+                    heappush(oheap, (tentative_g + h, h, neighbor))
+
+        if not found:
+            return SearchResult(expansions=expansions)
+
+        abstract_path = []
+        node = goal_idx
+        while node is not None:
+            abstract_path.append(divmod(node, cols))
+            node = parent[node]
+        abstract_path.reverse()
+
+        # Refine each hop; hops between clusters are single adjacent moves
+        path = [abstract_path[0]]
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(a)
+            if cluster == self.cluster_of(b):
+                segment = self._refine_in_cluster(a, b, cluster)
+                if not segment.found:
+                    return SearchResult(expansions=expansions)
+                expansions += segment.expansions
+                path.extend(segment.path[1:])
+            elif a != b:
+                path.append(b)
+        return SearchResult(path, path_cost(path), expansions, 'found')
+
+    def _all_borders(self) -> Iterable[tuple]:
+        for cr in range(self.cluster_rows):
+            for cc in range(self.cluster_cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    nr, nc = cr + dr, cc + dc
+                    if 0 <= nr < self.cluster_rows and 0 <= nc < self.cluster_cols:
+                        yield (cr, cc), (nr, nc)
+
+    def _find_transitions(self, a: tuple, b: tuple) -> List[Tuple[int, int]]:
+        """Transition cell pairs for the moves crossing from cluster a to b
+
+        Straight and diagonal crossings along a shared edge are grouped into
+        entrances; diagonally adjacent clusters meet at a single corner move.
+        """
+        ar0, ar1, ac0, ac1 = self.cluster_bounds(a)
+        cells = self.cells
+        cols = self.shape[1]
+        if a[0] != b[0] and a[1] != b[1]:
+            if b[1] > a[1]:
+                ra, ca, rb, cb = ar1 - 1, ac1 - 1, ar1, ac1
+            else:
+                ra, ca, rb, cb = ar1 - 1, ac0, ar1, ac0 - 1
+            if cells[ra, ca] == 0 and cells[rb, cb] == 0:
+                return [(ra * cols + ca, rb * cols + cb)]
+            return []
+
+        if a[0] == b[0]:
+            # Vertical border: a is left of b
+            line = np.arange(ar0, ar1)
+            free_a = cells[ar0:ar1, ac1 - 1] == 0
+            free_b = cells[ar0:ar1, ac1] == 0
+            cell = lambda i, side: i * cols + ac1 - 1 + side
+        else:
+            # Horizontal border: a is above b
+            line = np.arange(ac0, ac1)
+            free_a = cells[ar1 - 1, ac0:ac1] == 0
+            free_b = cells[ar1, ac0:ac1] == 0
+            cell = lambda i, side: (ar1 - 1 + side) * cols + i
+
+        straight = free_a & free_b
+        forward = np.zeros_like(straight)
+        forward[:-1] = free_a[:-1] & free_b[1:]
+        backward = np.zeros_like(straight)
+        backward[1:] = free_a[1:] & free_b[:-1]
+        crossable = straight | forward | backward
+
+        transitions = []
+        padded = np.concatenate(([False], crossable, [False]))
+        edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+        for run_start, run_end in zip(edges[::2], edges[1::2]):
+            if run_end - run_start >= ENTRANCE_SPLIT_WIDTH:
+                picks = (run_start, run_end - 1)
+            else:
+                picks = ((run_start + run_end - 1) // 2,)
+            for i in picks:
+                if straight[i]:
+                    j = i
+                elif forward[i]:
+                    j = i + 1
+                else:
+                    j = i - 1
+                transitions.append((cell(int(line[i]), 0), cell(int(line[j]), 1)))
+        return transitions
+
+    def _rebuild_inter(self) -> None:
+        cols = self.shape[1]
+        self.inter: Dict[int, Dict[int, float]] = {}
+        for transitions in self.borders.values():
+            for cell_a, cell_b in transitions:
+                ra, ca = divmod(cell_a, cols)
+                rb, cb = divmod(cell_b, cols)
+                cost = octile(rb - ra, cb - ca)
+                self.inter.setdefault(cell_a, {})[cell_b] = cost
+                self.inter.setdefault(cell_b, {})[cell_a] = cost
+
+    def _cluster_nodes(self, cluster: tuple) -> List[int]:
+        cr, cc = cluster
+        nodes = set()
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                other = (cr + dr, cc + dc)
+                for border, side in (((cluster, other), 0), ((other, cluster), 1)):
+                    for pair in self.borders.get(border, ()):
+                        nodes.add(pair[side])
+        return sorted(nodes)
+
+    def _build_intra(self, cluster: tuple) -> Dict[int, Dict[int, float]]:
+        nodes = self._cluster_nodes(cluster)
+        edges = {node: {} for node in nodes}
+        if len(nodes) < 2:
+            return edges
+        r0, r1, c0, c1 = self.cluster_bounds(cluster)
+        cols = self.shape[1]
+        width = c1 - c0
+        local = [(n // cols - r0, n % cols - c0) for n in nodes]
+        dist = _cluster_distances(self.cells[r0:r1, c0:c1], local)
+        for i, node in enumerate(nodes):
+            for j, other in enumerate(nodes):
+                if i != j:
+                    d = dist[i, local[j][0] * width + local[j][1]]
+                    if np.isfinite(d):
+                        edges[node][other] = float(d)
+        return edges
+
+    def _link(self, cell: Tuple[int, int], cluster: tuple) -> Dict[int, float]:
+        """Distances from an arbitrary cell to its cluster's transition nodes"""
+        nodes = self._cluster_nodes(cluster)
+        if not nodes:
+            return {}
+        r0, r1, c0, c1 = self.cluster_bounds(cluster)
+        cols = self.shape[1]
+        width = c1 - c0
+        dist = _cluster_distances(self.cells[r0:r1, c0:c1], [(cell[0] - r0, cell[1] - c0)])[0]
+        links = {}
+        for node in nodes:
+            d = dist[(node // cols - r0) * width + node % cols - c0]
+            if np.isfinite(d):
+                links[node] = float(d)
+        return links
+
+    def _abstract_edges(self, node: int, goal_idx: int, goal_links: Dict[int, float]):
+        cluster = self.cluster_of(divmod(node, self.shape[1]))
+        yield from self.intra[cluster].get(node, {}).items()
+        yield from self.inter.get(node, {}).items()
+        if node in goal_links:
+            yield goal_idx, goal_links[node]
+
+    def _refine_in_cluster(self, a: Tuple[int, int], b: Tuple[int, int], cluster: tuple) -> SearchResult:
+        r0, r1, c0, c1 = self.cluster_bounds(cluster)
+        result = astar(self.cells[r0:r1, c0:c1], (a[0] - r0, a[1] - c0), (b[0] - r0, b[1] - c0))
+        result.path = [(r + r0, c + c0) for r, c in result.path]
+        return result
@@ -0,0 +1,374 @@
+import math
+import os
+from heapq import heappush, heappop
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .grid_search import SQRT2, SearchResult
+
+TWO_PI = 2.0 * math.pi
+# Heading bins of the (x, y, heading) search lattice; 72 gives 5 degrees
+DEFAULT_HEADINGS = 72
+# Cost multipliers discouraging needless steering and steering reversals
+TURN_PENALTY = 1.05
+SWITCH_PENALTY = 1.1
+# Analytic expansion is tried on every expansion within this many turning
+# radii of the goal, and every ANALYTIC_INTERVAL expansions further away
+ANALYTIC_RANGE = 8.0
+ANALYTIC_INTERVAL = 10
+# Half-size of the Dubins heuristic table, in turning radii
+HEURISTIC_WINDOW = 6.0
+
+# Dubins words: steering of each of the three segments (+1 left, -1 right,
+# 0 straight)
+DUBINS_WORDS = (
+    ('LSL', (1, 0, 1)),
+    ('RSR', (-1, 0, -1)),
+    ('LSR', (1, 0, -1)),
+    ('RSL', (-1, 0, 1)),
+    ('RLR', (-1, 1, -1)),
+    ('LRL', (1, -1, 1))
+)
+
+Pose = Tuple[float, float, float]
+
+
+def _mod2pi(angle):
+    return np.mod(angle, TWO_PI)
+
+
+def dubins_segments(alpha, beta, d) -> np.ndarray:
+    """Segment lengths (t, p, q) of every Dubins word, in turning radii
+
+    ``alpha`` and ``beta`` are the start and goal headings relative to the
+    line joining them and ``d`` their distance over the turning radius
+    (Shkel and Lumelsky's normal form); all three may be arrays. Returns an
+    array of shape (6, 3, ...) following ``DUBINS_WORDS``, with ``nan``
+    where a word has no solution.
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+    sa, sb = np.sin(alpha), np.sin(beta)
+    ca, cb = np.cos(alpha), np.cos(beta)
+    c_ab = np.cos(alpha - beta)
+    d2 = d * d
+    out = np.full((6, 3) + np.broadcast(alpha, beta, d).shape, np.nan)
+
+    with np.errstate(invalid='ignore'):
+        # LSL
+        p2 = 2 + d2 - 2 * c_ab + 2 * d * (sa - sb)
+        tmp = np.arctan2(cb - ca, d + sa - sb)
+        ok = p2 >= 0
+        out[0] = np.where(ok, [_mod2pi(-alpha + tmp), np.sqrt(p2), _mod2pi(beta - tmp)], np.nan)
+        # RSR
+        p2 = 2 + d2 - 2 * c_ab + 2 * d * (sb - sa)
+        tmp = np.arctan2(ca - cb, d - sa + sb)
+        ok = p2 >= 0
+        out[1] = np.where(ok, [_mod2pi(alpha - tmp), np.sqrt(p2), _mod2pi(-beta + tmp)], np.nan)
+        # LSR
+        p2 = -2 + d2 + 2 * c_ab + 2 * d * (sa + sb)
+        p = np.sqrt(p2)
+        tmp = np.arctan2(-ca - cb, d + sa + sb) - np.arctan2(-2.0, p)
+        ok = p2 >= 0
+        out[2] = np.where(ok, [_mod2pi(-alpha + tmp), p, _mod2pi(-beta + tmp)], np.nan)
+        # RSL
+        p2 = -2 + d2 + 2 * c_ab - 2 * d * (sa + sb)
+        p = np.sqrt(p2)
+        tmp = np.arctan2(ca + cb, d - sa - sb) - np.arctan2(2.0, p)
+        ok = p2 >= 0
+        out[3] = np.where(ok, [_mod2pi(alpha - tmp), p, _mod2pi(beta - tmp)], np.nan)
+        # RLR
+        tmp = (6 - d2 + 2 * c_ab + 2 * d * (sa - sb)) / 8
+        p = _mod2pi(TWO_PI - np.arccos(tmp))
+        t = _mod2pi(alpha - np.arctan2(ca - cb, d - sa + sb) + p / 2)
+        ok = np.abs(tmp) <= 1
+        out[4] = np.where(ok, [t, p, _mod2pi(alpha - beta - t + p)], np.nan)
+        # LRL
+        tmp = (6 - d2 + 2 * c_ab + 2 * d * (sb - sa)) / 8
+        p = _mod2pi(TWO_PI - np.arccos(tmp))
+        t = _mod2pi(-alpha - np.arctan2(ca - cb, d + sa - sb) + p / 2)
+        ok = np.abs(tmp) <= 1
+        out[5] = np.where(ok, [t, p, _mod2pi(beta - alpha - t + p)], np.nan)
+    return out
+
+
+def _normal_form(dx, dy, theta0, theta1, turning_radius):
+    d = np.hypot(dx, dy) / turning_radius
+    phi = np.arctan2(dy, dx)
+    return _mod2pi(theta0 - phi), _mod2pi(theta1 - phi), d
+
+
+def dubins_length(start: Pose, goal: Pose, turning_radius: float) -> float:
+    """Length of the shortest forward path between two poses"""
+    alpha, beta, d = _normal_form(goal[0] - start[0], goal[1] - start[1], start[2], goal[2], turning_radius)
+    return float(np.nanmin(dubins_segments(alpha, beta, d).sum(axis=1))) * turning_radius
+
+
+def dubins_path(start: Pose, goal: Pose, turning_radius: float, spacing: float) -> np.ndarray:
+    """Poses along the shortest Dubins path, about ``spacing`` apart"""
+    alpha, beta, d = _normal_form(goal[0] - start[0], goal[1] - start[1], start[2], goal[2], turning_radius)
+    segments = dubins_segments(alpha, beta, d)
+    word = int(np.nanargmin(segments.sum(axis=1)))
+    pieces = []
+    pose = start
+    for steer, length in zip(DUBINS_WORDS[word][1], segments[word]):
+        samples = sample_arc(pose, steer, float(length) * turning_radius, turning_radius, spacing)
+        pieces.append(samples)
+        pose = tuple(samples[-1])
+    poses = np.concatenate(pieces)
+    poses[-1] = goal
+    return poses
+
+
+def sample_arc(pose: Pose, steer: int, length: float, turning_radius: float, spacing: float) -> np.ndarray:
+    """Poses after driving ``length`` with constant steering, excluding the start
+
+    ``steer`` is +1 for a left turn at ``turning_radius``, -1 for a right
+    turn and 0 for straight; headings are wrapped to [0, 2*pi).
+    """
+    count = max(int(math.ceil(length / spacing - 1e-9)), 1)
+    s = np.linspace(length / count, length, count)
+    x0, y0, theta0 = pose
+    if steer == 0:
+        theta = np.full(count, theta0)
+        x = x0 + s * math.cos(theta0)
+        y = y0 + s * math.sin(theta0)
+    else:
+        theta = theta0 + steer * s / turning_radius
+        x = x0 + steer * turning_radius * (np.sin(theta) - math.sin(theta0))
+        y = y0 - steer * turning_radius * (np.cos(theta) - math.cos(theta0))
+    return np.column_stack([x, y, _mod2pi(theta)])
+
+
+class MotionPrimitives:
+    """Forward arcs (right, straight, left) precomputed for each heading bin
+
+    Turns use exactly the minimum turning radius and span a whole number of
+    heading bins, so every successor heading lies exactly on a bin and the
+    offsets only depend on the starting bin. Each primitive is long enough
+    to leave the current grid cell.
+    """
+
+    STEERS = (-1, 0, 1)
+
+    def __init__(self, turning_radius: float, resolution: float, headings: int = DEFAULT_HEADINGS):
+        self.turning_radius = float(turning_radius)
+        self.resolution = float(resolution)
+        self.headings = int(headings)
+        self.bin_size = TWO_PI / self.headings
+
+        step = SQRT2 * self.resolution
+        self.turn_bins = max(int(math.ceil(step / self.turning_radius / self.bin_size)), 1)
+        arc = self.turning_radius * self.turn_bins * self.bin_size
+        self.lengths = np.array([arc, step, arc])
+        self.costs = self.lengths * np.array([TURN_PENALTY, 1.0, TURN_PENALTY])
+
+        # Samples every half cell or closer, for collision checks and the
+        # returned path; all primitives share one sample count so they stack.
+        # poses[h, k] holds (dx, dy, heading) relative to the start position
+        samples = max(int(math.ceil(max(arc, step) / (self.resolution / 2))), 2)
+        self.poses = np.empty((self.headings, 3, samples, 3))
+        self.next_heading = np.empty((self.headings, 3), dtype=np.int64)
+        for h in range(self.headings):
+            theta = h * self.bin_size
+            for k, steer in enumerate(self.STEERS):
+                length = self.lengths[k]
+                self.poses[h, k] = sample_arc((0.0, 0.0, theta), steer, length, self.turning_radius, length / samples)
+                self.next_heading[h, k] = (h + steer * self.turn_bins) % self.headings
+        self.offsets = self.poses[..., :2]
+
+    def heading_bin(self, theta: float) -> int:
+        return int(round(_mod2pi(theta) / self.bin_size)) % self.headings
+
+
+class DubinsHeuristic:
+    """Obstacle-free Dubins distances from a pose to nearby goal offsets
+
+    ``table[dh, iy, ix]`` is the shortest forward path length from the
+    origin facing +x to the point (ix - w, iy - w) cells away with relative
+    heading bin ``dh``; ``table_any`` takes the minimum over headings for
+    goals given without a heading. Offsets outside the window fall back to
+    the straight-line distance.
+    """
+
+    def __init__(self, table: np.ndarray, resolution: float):
+        self.table = table
+        self.table_any = table.min(axis=0)
+        self.resolution = float(resolution)
+        self.headings = table.shape[0]
+        self.window = (table.shape[1] - 1) // 2
+
+    @classmethod
+    def build(cls, turning_radius: float, resolution: float, headings: int = DEFAULT_HEADINGS) -> 'DubinsHeuristic':
+        window = int(math.ceil(HEURISTIC_WINDOW * turning_radius / resolution))
+        offsets = np.arange(-window, window + 1) * resolution
+        dy, dx = np.meshgrid(offsets, offsets, indexing='ij')
+        theta1 = (np.arange(headings) * TWO_PI / headings)[:, None, None]
+        alpha, beta, d = _normal_form(dx[None], dy[None], 0.0, theta1, turning_radius)
+        lengths = np.nanmin(dubins_segments(alpha, beta, d).sum(axis=1), axis=0) * turning_radius
+        return cls(lengths.astype(np.float32), resolution)
+
+    @classmethod
+    def load(cls, path: str, resolution: float) -> 'DubinsHeuristic':
+        """Memory-map a table written by save()"""
+        return cls(np.load(path, mmap_mode='r'), resolution)
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(self.table, dtype=np.float32))
+        os.replace(tmp_path, path)
+
+    def distance(self, x: float, y: float, h: int, goal: Pose, goal_bin: Optional[int]) -> float:
+        """Heuristic path length from (x, y) at heading bin h to the goal"""
+        dx = goal[0] - x
+        dy = goal[1] - y
+        theta = h * TWO_PI / self.headings
+        cos_t = math.cos(theta)
+        sin_t = math.sin(theta)
+        ix = int(round((cos_t * dx + sin_t * dy) / self.resolution)) + self.window
+        iy = int(round((cos_t * dy - sin_t * dx) / self.resolution)) + self.window
+        size = 2 * self.window + 1
+        if not (0 <= ix < size and 0 <= iy < size):
+            return math.hypot(dx, dy)
+        if goal_bin is None:
+            return float(self.table_any[iy, ix])
+        return float(self.table[(goal_bin - h) % self.headings, iy, ix])
+
+
+def hybrid_astar(
+    grid: np.ndarray,
+    resolution: float,
+    start: Pose,
+    goal: Tuple[float, float, Optional[float]],
+    primitives: MotionPrimitives,
+    heuristic: DubinsHeuristic,
+    goal_distance: Optional[np.ndarray] = None,
+    max_expansions: Optional[int] = None
+) -> SearchResult:
+    """Kinematically feasible search over (x, y, heading)
+
+    Expands the forward ``primitives`` from continuous positions, keeping
+    one node per (cell, heading bin). The heuristic is the larger of the
+    obstacle-free Dubins distance and ``goal_distance``, an obstacle-aware
+    grid distance field to the goal in cells. Near the goal a Dubins path
+    straight to it is tried and accepted when collision free, which lands
+    exactly on the goal pose. A goal heading of ``None`` accepts any final
+    heading. The path holds (x, y, heading) world poses, including the
+    intermediate samples of each primitive; the cost is the driven length
+    in cells like the grid planners.
+    """
+    rows, cols = grid.shape
+    cells = np.ascontiguousarray(grid, dtype=np.uint8)
+    headings = primitives.headings
+    turning_radius = primitives.turning_radius
+    spacing = resolution / 2
+
+    def blocked(xy: np.ndarray) -> np.ndarray:
+        r = np.floor(xy[..., 1] / resolution).astype(np.int64)
+        c = np.floor(xy[..., 0] / resolution).astype(np.int64)
+        hits = (r < 0) | (c < 0) | (r >= rows) | (c >= cols)
+        inside = ~hits
+        hits[inside] = cells[r[inside], c[inside]] != 0
+        return hits
+
+    gx, gy, goal_theta = goal
+    if blocked(np.array([[gx, gy]])).any():
+        return SearchResult()
+    goal_bin = primitives.heading_bin(goal_theta) if goal_theta is not None else None
+    goal_cell = (int(gy // resolution), int(gx // resolution))
+
+    def heuristic_of(x: float, y: float, h: int) -> float:
+        estimate = heuristic.distance(x, y, h, (gx, gy), goal_bin)
+        if goal_distance is not None:
+            r = int(y // resolution)
+            c = int(x // resolution)
+            if 0 <= r < rows and 0 <= c < cols:
+                estimate = max(estimate, float(goal_distance[r, c]) * resolution)
+        return estimate
+
+    def analytic(x: float, y: float, theta: float) -> Optional[np.ndarray]:
+        final = goal_theta if goal_theta is not None else math.atan2(gy - y, gx - x)
+        poses = dubins_path((x, y, theta), (gx, gy, final), turning_radius, spacing)
+        if blocked(poses[:, :2]).any():
+            return None
+        return poses
+
+    start_bin = primitives.heading_bin(start[2])
+    sx, sy = float(start[0]), float(start[1])
+    start_key = ((int(sy // resolution) * cols) + int(sx // resolution)) * headings + start_bin
+    # Per node: pose, parent key, steering index, path cost
+    nodes = {start_key: (sx, sy, start_bin, -1, 1, 0.0)}
+    closed = set()
+    h0 = heuristic_of(sx, sy, start_bin)
+    oheap = [(h0, h0, start_key)]
+    expansions = 0
+
+    while oheap:
+        _, _, key = heappop(oheap)
+        if key in closed:
+            continue
+        x, y, h, _, steer_index, g = nodes[key]
+        theta = h * primitives.bin_size
+
+        tail = None
+        if math.hypot(gx - x, gy - y) <= ANALYTIC_RANGE * turning_radius or expansions % ANALYTIC_INTERVAL == 0:
+            tail = analytic(x, y, theta)
+        if tail is None and (goal_bin is None or h == goal_bin):
+            # Close enough: the goal lies in this node's cell
+            if (int(y // resolution), int(x // resolution)) == goal_cell:
+                tail = np.array([[gx, gy, theta]])
+        if tail is not None:
+            poses = np.concatenate([_reconstruct(nodes, key, primitives), tail])
+            length = float(np.hypot(*np.diff(poses[:, :2], axis=0).T).sum())
+            return SearchResult(
+                [tuple(pose) for pose in poses.tolist()],
+                length / resolution,
+                expansions,
+                'found'
+            )
+
+        if max_expansions is not None and expansions >= max_expansions:
+            return SearchResult(expansions=expansions, status='budget_exhausted')
+        closed.add(key)
+        expansions += 1
+
+        ends = primitives.offsets[h] + (x, y)
+        hits = blocked(ends).any(axis=1)
+        for k in range(3):
+            if hits[k]:
+                continue
+            nx, ny = ends[k, -1]
+            nh = int(primitives.next_heading[h, k])
+            r = int(ny // resolution)
+            c = int(nx // resolution)
+            neighbor = (r * cols + c) * headings + nh
+            if neighbor in closed:
+                continue
+            cost = primitives.costs[k]
+            if k != steer_index and k != 1 and steer_index != 1:
+                cost *= SWITCH_PENALTY
+            tentative_g = g + cost
+            previous = nodes.get(neighbor)
+            if previous is None or tentative_g < previous[5]:
+                nodes[neighbor] = (float(nx), float(ny), nh, key, k, tentative_g)
+                estimate = heuristic_of(nx, ny, nh)
+                heappush(oheap, (tentative_g + estimate, estimate, neighbor))
+
+    return SearchResult(expansions=expansions)
+
+
+def _reconstruct(nodes: dict, key: int, primitives: MotionPrimitives) -> np.ndarray:
+    """Poses from the start to node ``key``, with each primitive's samples"""
+    chain = []
+    while key != -1:
+        chain.append(key)
+        key = nodes[key][3]
+    chain.reverse()
+    x, y, h = nodes[chain[0]][:3]
+    pieces = [np.array([[x, y, h * primitives.bin_size]])]
+    for previous, current in zip(chain, chain[1:]):
+        px, py, ph = nodes[previous][:3]
+        pieces.append(primitives.poses[ph, nodes[current][4]] + (px, py, 0.0))
+    return np.concatenate(pieces)
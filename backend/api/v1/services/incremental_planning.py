@@ -0,0 +1,346 @@
+import math
+from heapq import heappush, heappop
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .configuration_space import inflate
+from .grid_search import MOVES, SearchResult, octile
+
+# Keys are sums of float edge costs and heuristics, so the same path length
+# summed in a different order can differ in the last bits; keys closer than
+# this compare equal
+KEY_TOLERANCE = 1e-9
+# Heuristic scale in the keys of overconsistent cells; found paths are at
+# most this factor longer than the shortest
+HEURISTIC_WEIGHT = 1.0 + 1e-7
+
+
+def _key_less(a: Tuple[float, float], b: Tuple[float, float]) -> bool:
+    """Lexicographic ``a < b`` that ignores rounding differences"""
+    if a[0] < b[0] - KEY_TOLERANCE:
+        return True
+    if a[0] > b[0] + KEY_TOLERANCE:
+        return False
+    return a[1] < b[1] - KEY_TOLERANCE
+
+
+class DStarLite:
+    """Incremental shortest paths on an 8-connected grid (D* Lite)
+
+    Searches backwards from the goal and keeps g/rhs values between calls,
+    so when cells change or the robot advances only the part of the search
+    tree affected by the change is repaired. Cell occupancy is read from a
+    shared base array plus a small dict of overrides; g and rhs live in
+    flat arrays indexed by linearized cell id, like ``SearchWorkspace``.
+
+    Expanding a cell only relaxes the edges into it, and a neighbour's rhs
+    is recomputed from all of its edges only when it depended on the cell.
+    Overconsistent cells are keyed with the heuristic scaled by
+    ``HEURISTIC_WEIGHT`` (the keys of Anytime D*), which breaks the ties
+    between the many equally short grid paths towards the start, as
+    ``astar`` does, instead of expanding all of them.
+    """
+
+    def __init__(
+        self,
+        cells: np.ndarray,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        max_expansions: Optional[int] = None
+    ):
+        self.rows, self.cols = cells.shape
+        self._base = memoryview(np.ascontiguousarray(cells, dtype=np.uint8).reshape(-1))
+        self.overrides: Dict[int, int] = {}
+        self.start = self._index(start)
+        self._start_cell = divmod(self.start, self.cols)
+        self.goal = self._index(goal)
+        self.max_expansions = max_expansions
+        self.expansions = 0
+        self._km = 0.0
+        self._last_start = self.start
+        self._g_values = np.full(self.rows * self.cols, math.inf)
+        self._rhs_values = np.full(self.rows * self.cols, math.inf)
+        self._g = memoryview(self._g_values)
+        self._rhs = memoryview(self._rhs_values)
+        self._rhs[self.goal] = 0.0
+        self._queue = []
+        self._queued: Dict[int, Tuple[float, float]] = {}
+        self._push(self.goal)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._g_values.nbytes + self._rhs_values.nbytes)
+
+    def blocked(self, idx: int) -> bool:
+        value = self.overrides.get(idx)
+        if value is None:
+            value = self._base[idx]
+        return value != 0
+
+    def set_blocked(self, cells: Iterable[Tuple[Tuple[int, int], bool]]) -> int:
+        """Apply occupancy changes and queue the affected vertices
+
+        Returns the number of cells whose occupancy actually changed.
+        """
+        changed = []
+        for cell, occupied in cells:
+            idx = self._index(cell)
+            if self.blocked(idx) == bool(occupied):
+                continue
+            if bool(self._base[idx]) == bool(occupied):
+                self.overrides.pop(idx, None)
+            else:
+                self.overrides[idx] = int(bool(occupied))
+            changed.append(idx)
+        self._edges_changed(changed)
+        return len(changed)
+
+    def move_start(self, start: Tuple[int, int]) -> None:
+        """Advance the robot; previous search results stay valid"""
+        old = self.start
+        self.start = self._index(start)
+        self._start_cell = divmod(self.start, self.cols)
+        # Heuristics now measure from the new start; queued keys stay lower
+        # bounds of the new ones as long as km grows by the largest weight
+        self._km += HEURISTIC_WEIGHT * self._heuristic(self._last_start)
+        self._last_start = self.start
+        # The robot may always leave its own cell, so edges only change
+        # when the old or new start cell is occupied
+        self._edges_changed([idx for idx in (old, self.start) if self.blocked(idx)])
+
+    def _edges_changed(self, cells) -> None:
+        touched = set()
+        for idx in cells:
+            touched.add(idx)
+            touched.update(self._neighbors(idx))
+        for idx in touched:
+            self._update_rhs(idx)
+            self._update_vertex(idx)
+
+    def plan(self) -> SearchResult:
+        """Repair the search and return the current best path from start"""
+        self.expansions = 0
+        status = self._compute_shortest_path()
+        if status != 'found':
+            return SearchResult(expansions=self.expansions, status=status)
+        path = self._extract_path()
+        if path is None:
+            return SearchResult(expansions=self.expansions)
+        return SearchResult(
+            [divmod(idx, self.cols) for idx in path],
+            self._g[self.start],
+            self.expansions,
+            'found'
+        )
+
+    def _index(self, cell: Tuple[int, int]) -> int:
+        r, c = int(cell[0]), int(cell[1])
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f"Cell {(r, c)} is outside the grid")
+        return r * self.cols + c
+
+    def _heuristic(self, idx: int) -> float:
+        r, c = divmod(idx, self.cols)
+        return octile(r - self._start_cell[0], c - self._start_cell[1])
+
+    def _key(self, idx: int) -> Tuple[float, float]:
+        g = self._g[idx]
+        rhs = self._rhs[idx]
+        if g > rhs:
+            return rhs + HEURISTIC_WEIGHT * self._heuristic(idx) + self._km, rhs
+        return g + self._heuristic(idx) + self._km, g
+
+    def _push(self, idx: int) -> None:
+        key = self._key(idx)
+        self._queued[idx] = key
+        heappush(self._queue, (key[0], key[1], idx))
+
+    def _top(self) -> Optional[Tuple[Tuple[float, float], int]]:
+        # Drop stale heap entries left by lazy deletion
+        while self._queue:
+            k1, k2, idx = self._queue[0]
+            if self._queued.get(idx) == (k1, k2):
+                return (k1, k2), idx
+            heappop(self._queue)
+        return None
+
+    def _neighbors(self, idx: int):
+        r, c = divmod(idx, self.cols)
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                yield nr * self.cols + nc
+
+    def _edges(self, idx: int):
+        """(neighbor, cost) pairs; edges touching an occupied cell are infinite"""
+        r, c = divmod(idx, self.cols)
+        here_blocked = self.blocked(idx) and idx != self.start
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                neighbor = nr * self.cols + nc
+                if here_blocked or self.blocked(neighbor):
+                    yield neighbor, math.inf
+                else:
+                    yield neighbor, step
+
+    def _predecessors(self, idx: int) -> list:
+        """(neighbor, cost) pairs of the finite edges into ``idx``"""
+        base = self._base
+        overrides = self.overrides
+        if overrides.get(idx, base[idx]):
+            return []
+        rows, cols = self.rows, self.cols
+        r, c = divmod(idx, cols)
+        edges = []
+        for dr, dc, step in MOVES:
+            nr = r + dr
+            nc = c + dc
+            if 0 <= nr < rows and 0 <= nc < cols:
+                neighbor = nr * cols + nc
+                if neighbor == self.start or not overrides.get(neighbor, base[neighbor]):
+                    edges.append((neighbor, step))
+        return edges
+
+    def _update_rhs(self, idx: int) -> None:
+        """Recompute rhs from every edge out of ``idx``"""
+        if idx != self.goal:
+            g = self._g
+            best = math.inf
+            for neighbor, cost in self._edges(idx):
+                value = cost + g[neighbor]
+                if value < best:
+                    best = value
+            self._rhs[idx] = best
+
+    def _update_vertex(self, idx: int) -> None:
+        self._queued.pop(idx, None)
+        if self._g[idx] != self._rhs[idx]:
+            self._push(idx)
+
+    def _compute_shortest_path(self) -> str:
+        g = self._g
+        rhs = self._rhs
+        while True:
+            top = self._top()
+            start_key = self._key(self.start)
+            # Keys within rounding of each other tie on the first component
+            # and are ordered by the second
+            if top is None or (not _key_less(top[0], start_key) and rhs[self.start] == g[self.start]):
+                break
+            if self.max_expansions is not None and self.expansions >= self.max_expansions:
+                return 'budget_exhausted'
+            key_old, idx = top
+            key_new = self._key(idx)
+            if _key_less(key_old, key_new):
+                self._push(idx)
+                continue
+            heappop(self._queue)
+            del self._queued[idx]
+            self.expansions += 1
+            if g[idx] > rhs[idx]:
+                g_new = g[idx] = rhs[idx]
+                for neighbor, cost in self._predecessors(idx):
+                    value = cost + g_new
+                    if value < rhs[neighbor] and neighbor != self.goal:
+                        rhs[neighbor] = value
+                        self._update_vertex(neighbor)
+            else:
+                g_old = g[idx]
+                g[idx] = math.inf
+                # Only neighbours whose rhs came through this cell change
+                for neighbor, cost in self._predecessors(idx):
+                    if rhs[neighbor] == cost + g_old:
+                        self._update_rhs(neighbor)
+                        self._update_vertex(neighbor)
+                self._update_vertex(idx)
+        if g[self.start] == math.inf:
+            return 'no_path'
+        return 'found'
+
+    def _extract_path(self) -> Optional[list]:
+        g = self._g
+        path = [self.start]
+        current = self.start
+        limit = self.rows * self.cols
+        while current != self.goal:
+            best = None
+            best_value = math.inf
+            for neighbor, cost in self._edges(current):
+                value = cost + g[neighbor]
+                if value < best_value:
+                    best_value = value
+                    best = neighbor
+            if best is None or best_value == math.inf or len(path) > limit:
+                return None
+            path.append(best)
+            current = best
+        return path
+
+
+class RouteSession:
+    """Incremental planner for one robot route in its configuration space
+
+    Changes are reported as raw occupancy (an obstacle appearing or
+    clearing); the session re-inflates only the window around each change
+    by the footprint radius and feeds the resulting C-space cell changes
+    to D* Lite. The first search runs on ``plan`` (or the first
+    ``update``); until then ``result`` is None.
+    """
+
+    def __init__(
+        self,
+        route_id: str,
+        robot_id: str,
+        raw_cells: np.ndarray,
+        space_cells: np.ndarray,
+        radius_cells: int,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        max_expansions: Optional[int] = None
+    ):
+        self.route_id = route_id
+        self.robot_id = robot_id
+        self.raw_cells = raw_cells
+        self.radius_cells = radius_cells
+        self.raw_overrides: Dict[Tuple[int, int], int] = {}
+        # World positions of the route ends, kept by the caller for output
+        self.endpoints: Tuple[Optional[Dict], Optional[Dict]] = (None, None)
+        self.planner = DStarLite(space_cells, start, goal, max_expansions)
+        self.result: Optional[SearchResult] = None
+
+    def plan(self) -> SearchResult:
+        """Search (or repair) the path from the current start"""
+        self.result = self.planner.plan()
+        return self.result
+
+    def update(self, changes: Iterable[Tuple[Tuple[int, int], bool]], start: Optional[Tuple[int, int]] = None) -> SearchResult:
+        """Apply raw cell changes (and a new start) and repair the path"""
+        rows, cols = self.raw_cells.shape
+        radius = self.radius_cells
+        space_changes = []
+        for (r, c), occupied in changes:
+            r, c = int(r), int(c)
+            if not (0 <= r < rows and 0 <= c < cols):
+                continue
+            self.raw_overrides[(r, c)] = int(bool(occupied))
+            # C-space cells within the footprint radius of (r, c) may change;
+            # they depend on raw cells up to twice the radius away
+            r0, r1 = max(r - radius, 0), min(r + radius + 1, rows)
+            c0, c1 = max(c - radius, 0), min(c + radius + 1, cols)
+            w0, w1 = max(r0 - radius, 0), min(r1 + radius, rows)
+            v0, v1 = max(c0 - radius, 0), min(c1 + radius, cols)
+            raw = np.array(self.raw_cells[w0:w1, v0:v1], dtype=np.uint8)
+            for (orow, ocol), value in self.raw_overrides.items():
+                if w0 <= orow < w1 and v0 <= ocol < v1:
+                    raw[orow - w0, ocol - v0] = value
+            inflated = inflate(raw, radius)[r0 - w0:r1 - w0, c0 - v0:c1 - v0]
+            for dr, dc in np.ndindex(inflated.shape):
+                space_changes.append(((r0 + dr, c0 + dc), bool(inflated[dr, dc])))
+        if start is not None:
+            self.planner.move_start(start)
+        self.planner.set_blocked(space_changes)
+        return self.plan()
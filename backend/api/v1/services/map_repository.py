@@ -0,0 +1,102 @@
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from .occupancy_grid import map_version
+
+# Top-level map_data.json sections served as pre-serialized JSON
+MAP_SECTIONS = ('zones', 'obstacles', 'charging_stations', 'paths')
+
+
+def empty_map() -> Dict:
+    """Stand-in map used while no map file can be read"""
+    return {
+        'map': {'width': 1000, 'height': 1000, 'resolution': 0.5},
+        'obstacles': [],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+
+class MapRepository:
+    """One parsed copy of map_data.json, reloaded when the file changes
+
+    ``refresh`` stats the file and only re-parses it when its mtime
+    changed; a rewrite with the same content keeps the current data
+    object and version. Map sections are serialized once per version and
+    served as bytes with an ETag derived from the version. Without a
+    ``path`` nothing is watched and the data only changes via ``replace``
+    (used for live edits and tiled maps).
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.mtime: Optional[float] = None
+        self.map_data: Dict = empty_map()
+        self.version: str = map_version(self.map_data)
+        self._serialized: Dict[str, Tuple[bytes, str]] = {}
+        self.stats = {'reloads': 0, 'serializations': 0}
+        if path is not None:
+            self.refresh(report_missing=True)
+
+    def refresh(self, report_missing: bool = False) -> bool:
+        """Reload the file if it changed; returns whether the version changed"""
+        if self.path is None:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            if report_missing:
+                print(f"Error loading map data: {e}")
+            return False
+        if mtime == self.mtime:
+            return False
+        try:
+            with open(self.path) as f:
+                map_data = json.load(f)
+        except Exception as e:
+            print(f"Error loading map data: {e}")
+            return False
+        self.mtime = mtime
+        self.stats['reloads'] += 1
+        version = map_version(map_data)
+        if version == self.version:
+            return False
+        self.replace(map_data, version)
+        return True
+
+    def replace(self, map_data: Dict, version: Optional[str] = None) -> None:
+        """Swap in new map data, e.g. after a live edit"""
+        self.map_data = map_data
+        self.version = version or map_version(map_data)
+        self._serialized = {}
+
+    def get(self) -> Dict:
+        """Current map data, reloading it first if the file changed"""
+        self.refresh()
+        return self.map_data
+
+    def section(self, name: str) -> Tuple[bytes, str]:
+        """JSON bytes and ETag of one map section, serialized once per version"""
+        if name not in MAP_SECTIONS:
+            raise KeyError(f"Unknown map section: {name}")
+        self.refresh()
+        cached = self._serialized.get(name)
+        if cached is None:
+            body = json.dumps(self.map_data.get(name, []), separators=(',', ':')).encode('utf-8')
+            cached = (body, f'"{self.version[:16]}-{name}"')
+            self._serialized[name] = cached
+            self.stats['serializations'] += 1
+        return cached
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value covers ``etag``"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
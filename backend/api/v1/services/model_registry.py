@@ -0,0 +1,302 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+# Directory holding the trained model artifacts, flat or one subdirectory per version
+DEFAULT_MODEL_DIR = os.environ.get('AI_MODEL_DIR', 'ai/models')
+# Artifacts of a version are '<name>.joblib' files
+ARTIFACT_SUFFIX = '.joblib'
+# File in the model directory naming the activated version, shared by every
+# worker process
+CURRENT_FILE = 'CURRENT'
+
+
+def version_key(version: str) -> list:
+    """Natural sort key of a version name: digit runs compare as numbers
+
+    'v9' sorts before 'v10'; zero-padded and date names sort as written.
+    """
+    # re.split with a group alternates text and digit parts, so every
+    # position holds the same type in all keys
+    return [int(part) if i % 2 else part for i, part in enumerate(re.split(r'(\d+)', version))]
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def mapped_bytes(obj: Any, _seen: Optional[set] = None) -> int:
+    """Bytes of memory-mapped arrays reachable from an estimator's attributes"""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.memmap):
+        return obj.nbytes
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes if isinstance(obj.base, np.memmap) else 0
+    if isinstance(obj, (list, tuple)):
+        return sum(mapped_bytes(item, seen) for item in obj)
+    if isinstance(obj, dict):
+        return sum(mapped_bytes(item, seen) for item in obj.values())
+    if hasattr(obj, '__dict__'):
+        return mapped_bytes(vars(obj), seen)
+    return 0
+
+
+@dataclass
+class ModelArtifact:
+    """One loaded model or preprocessing object and what loading it cost"""
+    name: str
+    version: str
+    model: Any
+    path: Optional[str] = None
+    mtime: Optional[float] = None
+    file_bytes: int = 0
+    load_seconds: float = 0.0
+    resident_bytes: Optional[int] = None
+    mapped_bytes: int = 0
+    generation: int = 0
+
+    @property
+    def tag(self) -> str:
+        """Identifies this exact artifact; changes whenever it is reloaded or replaced"""
+        return f"{self.version}#{self.generation}"
+
+    def metrics(self) -> Dict:
+        return {
+            'version': self.version,
+            'generation': self.generation,
+            'path': self.path,
+            'file_bytes': self.file_bytes,
+            'load_seconds': self.load_seconds,
+            'resident_bytes': self.resident_bytes,
+            'mapped_bytes': self.mapped_bytes
+        }
+
+
+class ModelRegistry:
+    """Trained models loaded lazily from a model directory, shared per process
+
+    Artifacts are ``<name>.joblib`` files, either directly in ``model_dir``
+    (version '') or in one subdirectory per version. The active version is
+    the one named in the directory's ``CURRENT`` file, written by
+    ``activate``, else the newest by natural sort order ('v10' after 'v9').
+    Each artifact is loaded on first ``get`` with ``mmap_mode='r'``, so
+    plain NumPy arrays in it are mapped read-only from the file and their
+    pages are shared by every worker process. ``get`` reloads an artifact
+    whose file changed, and switches versions once ``CURRENT`` names
+    another one, so an activation in any worker reaches all of them
+    without a restart; callers holding a model from before a swap keep
+    using it safely. Models ``put`` in memory (no ``model_dir`` needed) are
+    never reloaded.
+    """
+
+    def __init__(self, model_dir: Optional[str] = DEFAULT_MODEL_DIR):
+        self.model_dir = model_dir
+        self.active_version: Optional[str] = None
+        self._artifacts: Dict[str, ModelArtifact] = {}
+        # path -> (mtime, digest) of files digested so far
+        self._digests: Dict[str, Tuple[float, str]] = {}
+        # (mtime, version) last read from the CURRENT file
+        self._current: Optional[Tuple[float, str]] = None
+        self._lock = threading.RLock()
+        self._generation = 0
+        self.stats = {'loads': 0, 'reloads': 0, 'swaps': 0}
+
+    def versions(self) -> List[str]:
+        """Versions present in the model directory, oldest first"""
+        if self.model_dir is None or not os.path.isdir(self.model_dir):
+            return []
+        versions = []
+        entries = os.listdir(self.model_dir)
+        for entry in entries:
+            path = os.path.join(self.model_dir, entry)
+            if os.path.isdir(path) and any(f.endswith(ARTIFACT_SUFFIX) for f in os.listdir(path)):
+                versions.append(entry)
+        versions.sort(key=version_key)
+        if any(entry.endswith(ARTIFACT_SUFFIX) for entry in entries):
+            versions.insert(0, '')
+        return versions
+
+    @property
+    def version(self) -> str:
+        """The active version, following the CURRENT file when it changes"""
+        current = self._read_current()
+        if current is not None and current != self.active_version and current in self.versions():
+            self._swap(current)
+        if self.active_version is None:
+            versions = self.versions()
+            self.active_version = versions[-1] if versions else ''
+        return self.active_version
+
+    def activate(self, version: str) -> None:
+        """Serve models of ``version`` from now on, in every worker process
+
+        The version is recorded in the CURRENT file, which other processes
+        pick up on their next ``get``; models load on first use.
+        """
+        if version not in self.versions():
+            raise KeyError(f"Unknown model version: {version}")
+        with self._lock:
+            path = os.path.join(self.model_dir, CURRENT_FILE)
+            tmp_path = f"{path}.tmp.{os.getpid()}"
+            with open(tmp_path, 'w') as f:
+                f.write(version + '\n')
+            os.replace(tmp_path, path)
+            self._current = (os.path.getmtime(path), version)
+            self._swap(version)
+
+    def _swap(self, version: str) -> None:
+        with self._lock:
+            if version != self.active_version:
+                if self.active_version is not None:
+                    self.stats['swaps'] += 1
+                self.active_version = version
+                self._artifacts = {}
+
+    def _read_current(self) -> Optional[str]:
+        """Version named in the CURRENT file, re-read only when it changes"""
+        if self.model_dir is None:
+            return None
+        path = os.path.join(self.model_dir, CURRENT_FILE)
+        try:
+            mtime = os.path.getmtime(path)
+            if self._current is None or self._current[0] != mtime:
+                with open(path) as f:
+                    self._current = (mtime, f.read().strip())
+        except OSError:
+            return None
+        return self._current[1]
+
+    def path_of(self, name: str) -> str:
+        if self.model_dir is None:
+            raise KeyError(f"Model not loaded: {name}")
+        return os.path.join(self.model_dir, self.version, name + ARTIFACT_SUFFIX)
+
+    def artifact(self, name: str) -> ModelArtifact:
+        """Loaded artifact ``name`` of the active version, (re)loading it if needed"""
+        artifact = self._artifacts.get(name)
+        if artifact is not None and artifact.path is None:
+            return artifact
+        path = self.path_of(name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError as e:
+            print(f"Error loading model {name}: {e}")
+            raise
+        if artifact is not None and artifact.path == path and artifact.mtime == mtime:
+            return artifact
+        with self._lock:
+            artifact = self._artifacts.get(name)
+            if artifact is not None and artifact.path == path and artifact.mtime == mtime:
+                return artifact
+            reloading = artifact is not None
+            artifact = self._load(name, path, mtime)
+            self._generation += 1
+            artifact.generation = self._generation
+            self._artifacts[name] = artifact
+            self.stats['reloads' if reloading else 'loads'] += 1
+        return artifact
+
+    def __contains__(self, name: str) -> bool:
+        """Whether ``name`` is loaded or has a file in the active version"""
+        artifact = self._artifacts.get(name)
+        if artifact is not None and artifact.path is None:
+            return True
+        return self.model_dir is not None and os.path.exists(self.path_of(name))
+
+    def digest(self, name: str) -> Optional[str]:
+        """SHA-256 of artifact ``name``'s file in the active version
+
+        None when there is no such file, or when ``name`` was ``put`` in
+        memory and no longer comes from it. Recomputed only when the file's
+        mtime changes.
+        """
+        artifact = self._artifacts.get(name)
+        if self.model_dir is None or (artifact is not None and artifact.path is None):
+            return None
+        path = self.path_of(name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = self._digests[path] = (mtime, file_digest(path))
+        return cached[1]
+
+    def get(self, name: str) -> Any:
+        return self.artifact(name).model
+
+    def _load(self, name: str, path: str, mtime: float) -> ModelArtifact:
+        rss = _rss_bytes()
+        t0 = time.perf_counter()
+        model = joblib.load(path, mmap_mode='r')
+        load_seconds = time.perf_counter() - t0
+        after = _rss_bytes()
+        return ModelArtifact(
+            name=name,
+            version=self.version,
+            model=model,
+            path=path,
+            mtime=mtime,
+            file_bytes=os.path.getsize(path),
+            load_seconds=load_seconds,
+            resident_bytes=after - rss if rss is not None and after is not None else None,
+            mapped_bytes=mapped_bytes(model)
+        )
+
+    def put(self, name: str, model: Any, version: str = 'memory') -> None:
+        """Register an in-memory model under ``name``, replacing any loaded one"""
+        with self._lock:
+            self._generation += 1
+            self._artifacts[name] = ModelArtifact(name=name, version=version, model=model, generation=self._generation)
+
+    def unload(self) -> None:
+        """Drop every loaded artifact; the next ``get`` loads them again"""
+        with self._lock:
+            self._artifacts = {}
+
+    def metrics(self) -> Dict:
+        return dict(
+            self.stats,
+            model_dir=self.model_dir,
+            active_version=self.version,
+            versions=self.versions(),
+            models={name: artifact.metrics() for name, artifact in self._artifacts.items()}
+        )
+
+
+_registries: Dict[Optional[str], ModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def shared_registry(model_dir: Optional[str] = DEFAULT_MODEL_DIR) -> ModelRegistry:
+    """The process-wide registry for ``model_dir``"""
+    with _registries_lock:
+        registry = _registries.get(model_dir)
+        if registry is None:
+            registry = _registries[model_dir] = ModelRegistry(model_dir)
+        return registry
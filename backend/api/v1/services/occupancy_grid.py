@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def map_version(map_data: Dict) -> str:
+    """Content hash identifying a map version"""
+    payload = json.dumps(map_data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def rasterize_map(map_data: Dict) -> np.ndarray:
+    """Rasterize map obstacles into a uint8 occupancy array (1 = occupied)"""
+    width = map_data['map']['width']
+    height = map_data['map']['height']
+    resolution = map_data['map']['resolution']
+
+    grid_width = int(width / resolution)
+    grid_height = int(height / resolution)
+
+    grid = np.zeros((grid_height, grid_width), dtype=np.uint8)
+
+    # Mark obstacles
+    for obstacle in map_data['obstacles']:
+        rasterize_obstacle(grid, obstacle, resolution)
+
+    return grid
+
+
+def rasterize_obstacle(
+    grid: np.ndarray,
+    obstacle: Dict,
+    resolution: float,
+    origin: Tuple[int, int] = (0, 0)
+) -> Optional[Tuple[int, int, int, int]]:
+    """Mark one obstacle in a grid in place
+
+    ``origin`` is the (row, col) of the map cell at grid[0, 0], so a tile of
+    a larger map can be rasterized on its own. Returns the (row_start,
+    row_end, col_start, col_end) window of cells that may have changed, or
+    None if the obstacle lies outside the grid.
+    """
+    grid_height, grid_width = grid.shape
+    row0, col0 = origin
+    if obstacle['type'] == 'rectangle':
+        r0 = max(int(obstacle['y1'] / resolution) - row0, 0)
+        r1 = min(int(obstacle['y2'] / resolution) - row0, grid_height)
+        c0 = max(int(obstacle['x1'] / resolution) - col0, 0)
+        c1 = min(int(obstacle['x2'] / resolution) - col0, grid_width)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        grid[r0:r1, c0:c1] = 1
+    elif obstacle['type'] == 'point':
+        x = int(obstacle['x'] / resolution) - col0
+        y = int(obstacle['y'] / resolution) - row0
+        radius = int(obstacle['radius'] / resolution)
+        r0 = max(y - radius, 0)
+        r1 = min(y + radius + 1, grid_height)
+        c0 = max(x - radius, 0)
+        c1 = min(x + radius + 1, grid_width)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        # Disc mask over the clipped bounding box
+        dy = np.arange(r0, r1)[:, None] - y
+        dx = np.arange(c0, c1)[None, :] - x
+        grid[r0:r1, c0:c1] |= (dy * dy + dx * dx <= radius * radius).astype(grid.dtype)
+    else:
+        return None
+    return r0, r1, c0, c1
+
+
+def integral_image(cells: np.ndarray) -> np.ndarray:
+    """Summed-area table of occupied cells, padded with a leading zero row/col"""
+    integral = np.zeros((cells.shape[0] + 1, cells.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(cells, axis=0, dtype=np.int32), axis=1, out=integral[1:, 1:])
+    return integral
+
+
+def count_occupied(integral: np.ndarray, r0, r1, c0, c1) -> np.ndarray:
+    """Occupied cells in the half-open boxes [r0, r1) x [c0, c1), vectorized"""
+    return integral[r1, c1] - integral[r0, c1] - integral[r1, c0] + integral[r0, c0]
+
+
+class OccupancyGrid:
+    """Occupancy grid for one map version, stored bit-packed
+
+    The packed bits are the canonical representation (and what is written to
+    disk); a read-only uint8 view is unpacked lazily for the planners.
+    """
+
+    def __init__(self, packed: np.ndarray, shape: tuple, resolution: float, version: str):
+        self.packed = packed
+        self.shape = tuple(int(s) for s in shape)
+        self.resolution = float(resolution)
+        self.version = version
+        self._cells = None
+        self._derived = {}
+
+    @classmethod
+    def from_array(cls, cells: np.ndarray, resolution: float, version: str) -> 'OccupancyGrid':
+        """Pack a dense occupancy array"""
+        packed = np.packbits(cells.astype(bool), axis=None)
+        return cls(packed, cells.shape, resolution, version)
+
+    @classmethod
+    def load(cls, path: str) -> 'OccupancyGrid':
+        """Load a grid previously written with save()"""
+        with np.load(path) as data:
+            return cls(
+                data['packed'],
+                tuple(data['shape']),
+                float(data['resolution']),
+                str(data['version'])
+            )
+
+    def save(self, path: str) -> None:
+        """Write the packed grid to disk"""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            packed=self.packed,
+            shape=np.array(self.shape),
+            resolution=np.array(self.resolution),
+            version=np.array(self.version)
+        )
+        os.replace(tmp_path, path)
+
+    @property
+    def cells(self) -> np.ndarray:
+        """Dense read-only uint8 occupancy array indexed as [row, col]"""
+        if self._cells is None:
+            size = self.shape[0] * self.shape[1]
+            cells = np.unpackbits(self.packed, count=size).reshape(self.shape)
+            cells.setflags(write=False)
+            self._cells = cells
+        return self._cells
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the packed representation in bytes"""
+        return int(self.packed.nbytes)
+
+    def derived(self, key: str, build: Callable[[np.ndarray], Any]) -> Any:
+        """Memoize a structure derived from this grid version
+
+        Planners use this for per-map precomputation; because a grid object
+        is tied to one map version, the derived data is dropped with it.
+        """
+        if key not in self._derived:
+            self._derived[key] = build(self.cells)
+        return self._derived[key]
+
+    def peek_derived(self, key: str) -> Any:
+        """Return a derived structure if it has already been built"""
+        return self._derived.get(key)
+
+    def derived_keys(self) -> list:
+        """Keys of the derived structures built so far"""
+        return list(self._derived)
+
+
+class OccupancyGridCache:
+    """Versioned occupancy grid cache keyed on the map content hash
+
+    Grids are kept in a small in-memory LRU and, when ``cache_dir`` is set,
+    persisted as packed ``.npz`` files so restarts skip rasterization.
+    """
+
+    def __init__(
+        self,
+        rasterize: Callable[[Dict], np.ndarray] = rasterize_map,
+        cache_dir: Optional[str] = None,
+        max_entries: int = 4
+    ):
+        self.rasterize = rasterize
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._grids = OrderedDict()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'builds': 0}
+
+    def get(self, map_data: Dict, version: Optional[str] = None) -> OccupancyGrid:
+        """Return the grid for a map, building it only on a cache miss"""
+        version = version or map_version(map_data)
+        grid = self._grids.get(version)
+        if grid is not None:
+            self._grids.move_to_end(version)
+            self.stats['hits'] += 1
+            return grid
+
+        grid = self._load_from_disk(version)
+        if grid is not None:
+            self.stats['disk_hits'] += 1
+        else:
+            cells = self.rasterize(map_data)
+            grid = OccupancyGrid.from_array(cells, map_data['map']['resolution'], version)
+            self.stats['builds'] += 1
+            self._save_to_disk(grid)
+
+        self.put(grid)
+        return grid
+
+    def put(self, grid: OccupancyGrid) -> None:
+        """Insert a grid built elsewhere, e.g. by an incremental map edit"""
+        self._grids[grid.version] = grid
+        self._grids.move_to_end(grid.version)
+        while len(self._grids) > self.max_entries:
+            self._grids.popitem(last=False)
+
+    def invalidate(self, version: Optional[str] = None) -> None:
+        """Drop one version (or everything) from the in-memory cache"""
+        if version is None:
+            self._grids.clear()
+        else:
+            self._grids.pop(version, None)
+
+    def _path_for(self, version: str) -> str:
+        return os.path.join(self.cache_dir, f"occupancy_{version}.npz")
+
+    def _load_from_disk(self, version: str) -> Optional[OccupancyGrid]:
+        if not self.cache_dir:
+            return None
+        path = self._path_for(version)
+        if not os.path.exists(path):
+            return None
+        try:
+            grid = OccupancyGrid.load(path)
+        except Exception as e:
+            print(f"Error loading cached occupancy grid: {e}")
+            return None
+        return grid if grid.version == version else None
+
+    def _save_to_disk(self, grid: OccupancyGrid) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            grid.save(self._path_for(grid.version))
+        except Exception as e:
+            print(f"Error saving occupancy grid cache: {e}")
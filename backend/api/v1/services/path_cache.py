@@ -0,0 +1,13 @@
+import math
+from typing import Dict
+
+from .cache import VersionedLRUCache
+
+
+def quantize(position: Dict, quantum: float) -> tuple:
+    """Bucket a world position into ``quantum``-sized squares"""
+    return (math.floor(position['x'] / quantum), math.floor(position['y'] / quantum))
+
+
+class PathQueryCache(VersionedLRUCache):
+    """LRU cache of planned paths, bound to the map version they were planned on"""
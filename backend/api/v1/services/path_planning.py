@@ -1,243 +1,1245 @@
 import json
+import math
+import os
+import time
+import uuid
+from collections import OrderedDict
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional
 from ..schemas.robotics import RobotPosition
+from .occupancy_grid import (
+    OccupancyGrid,
+    OccupancyGridCache,
+    map_version,
+    rasterize_obstacle
+)
+from .configuration_space import (
+    CSPACE_KEY_PREFIX,
+    configuration_space,
+    footprint_radius,
+    inflate_window,
+    inflation_cells
+)
+from .grid_search import (
+    JumpTable,
+    SearchResult,
+    SearchWorkspace,
+    astar,
+    astar_sparse,
+    euclidean_cost,
+    jps,
+    prune_path,
+    theta_star
+)
+from .hierarchical_planning import DEFAULT_CLUSTER_SIZE, ClusterAbstraction
+from .distance_field import DistanceField
+from .batch_planning import PlannerPool
+from .spatial_index import MapIndex
+from .tiled_map import TiledOccupancyMap
+from .incremental_planning import RouteSession
+from .cooperative_planning import DEFAULT_REPAIR_EXPANSIONS, ReservationTable, plan_cooperative
+from .coverage_planning import CoveragePlan, plan_coverage
+from .route_optimization import plan_routes, route_cost
+from .path_cache import PathQueryCache, quantize
+from .map_repository import MapRepository, empty_map
+from .hybrid_astar import DEFAULT_HEADINGS, DubinsHeuristic, MotionPrimitives, hybrid_astar
+from .trajectory import BlockedFn, segment_clear, smooth_trajectory, velocity_profile
+
+MAP_DATA_PATH = 'robotics/config/map_data.json'
+ROBOT_CONFIG_PATH = 'robotics/config/robot_config.json'
+# Robot specification fields that shape planning (footprint and dynamics)
+FOOTPRINT_FIELDS = ('width', 'length', 'turning_radius', 'max_speed', 'max_acceleration')
+# Upper bound on A* node expansions per query; the default covers a full
+# sweep of the 2000x2000 default map
+DEFAULT_MAX_EXPANSIONS = int(os.getenv('PATH_PLANNING_MAX_EXPANSIONS', '4000000'))
+# Worker processes for batch planning (1 plans in-process)
+DEFAULT_BATCH_WORKERS = int(os.getenv('PATH_PLANNING_WORKERS', str(os.cpu_count() or 1)))
+# Batch requests sharing a goal switch to one reverse distance field once
+# there are at least this many of them
+SHARED_GOAL_MIN_REQUESTS = 4
+GOAL_FIELD_CACHE_SIZE = 4
+# Active incremental route sessions kept, and the megabytes of search state
+# they may hold together; the least recently used are dropped
+MAX_ROUTE_SESSIONS = 64
+ROUTE_MEMORY_MB = float(os.getenv('PATH_PLANNING_ROUTE_MEMORY_MB', '1024'))
+# Planners whose paths are already straight segments between waypoints
+ANY_ANGLE_ALGORITHMS = ('theta',)
+# Planners searching (x, y, heading) under the robot's turning radius
+KINEMATIC_ALGORITHMS = ('hybrid_astar',)
+# Planners whose cell-by-cell paths can be timed by the cooperative planner
+COORDINATED_ALGORITHMS = ('astar', 'jps')
+# Wall-clock budget (seconds) for one coordinated batch; robots not reached
+# in time are reported as 'budget_exhausted'
+DEFAULT_COORDINATION_BUDGET = float(os.getenv('PATH_PLANNING_COORDINATION_BUDGET', '10'))
+# Path query cache: entries kept, seconds they stay valid (0 disables the
+# TTL) and the size of the position buckets in meters (0 uses the map
+# resolution, i.e. queries from the same grid cell share a path)
+PATH_CACHE_SIZE = int(os.getenv('PATH_PLANNING_PATH_CACHE_SIZE', '1024'))
+PATH_CACHE_TTL = float(os.getenv('PATH_PLANNING_PATH_CACHE_TTL', '300'))
+PATH_CACHE_QUANTUM = float(os.getenv('PATH_PLANNING_PATH_CACHE_QUANTUM', '0'))
+# Seconds spent improving visiting orders beyond the first construction
+DEFAULT_ROUTE_BUDGET = float(os.getenv('PATH_PLANNING_ROUTE_BUDGET', '1'))
+# Coverage plans kept per (configuration space, zone, tool width)
+COVERAGE_CACHE_SIZE = 16
 
 class PathPlanningService:
-    def __init__(self):
+    def __init__(
+        self,
+        map_path: str = MAP_DATA_PATH,
+        cache_dir: Optional[str] = None,
+        robot_config_path: str = ROBOT_CONFIG_PATH
+    ):
+        self.map_path = map_path
+        self._map_mtime = None
+        # Set when map_path is a tiled on-disk map; tiles are then read
+        # lazily instead of rasterizing a dense grid
+        self.tiled_map: Optional[TiledOccupancyMap] = None
+        # Parsed map shared with the /map endpoints; tiled maps are not
+        # watched through it and fill it on load instead
+        self.map_repository = MapRepository(None if TiledOccupancyMap.is_tiled_map(map_path) else map_path)
         self.map_data = self._load_map_data()
+        self.map_version = self.tiled_map.version if self.tiled_map else self.map_repository.version
+        self.grid_cache = OccupancyGridCache(
+            cache_dir=cache_dir or os.getenv('PATH_PLANNING_CACHE_DIR')
+        )
+        # Rasterize once at load; later calls reuse the cached grid
+        self.occupancy_grid = None if self.tiled_map else self.grid_cache.get(self.map_data, self.map_version)
+        self.max_expansions = DEFAULT_MAX_EXPANSIONS
+        self._search_workspace = None
+        self.last_search: Optional[SearchResult] = None
+        self.hpa_cluster_size = DEFAULT_CLUSTER_SIZE
+        self.batch_workers = DEFAULT_BATCH_WORKERS
+        self._goal_fields = OrderedDict()
+        self._planner_pool: Optional[PlannerPool] = None
+        self._map_index: Optional[MapIndex] = None
+        self._routes = OrderedDict()
+        self._motion_primitives = {}
+        self._dubins_heuristics = {}
+        self._reservations: Optional[ReservationTable] = None
+        self._coverage_plans = OrderedDict()
+        self.path_cache = PathQueryCache(PATH_CACHE_SIZE, PATH_CACHE_TTL or None)
+        self.planners = {
+            'astar': self._astar,
+            'jps': self._jps,
+            'hpa': self._hpa,
+            'theta': self._theta
+        }
         self.robot_specs = {
             'width': 0.5,  # meters
             'length': 0.8,  # meters
             'turning_radius': 1.0,  # meters
-            'max_speed': 1.0  # meters/second
+            'max_speed': 1.0,  # meters/second
+            'max_acceleration': 0.5  # meters/second^2
         }
+        self.robot_config = self._load_robot_config(robot_config_path)
     
     def _load_map_data(self) -> Dict:
-        """Load map data from configuration file"""
+        """Load map data from configuration file or a tiled map directory"""
+        if self.map_repository.path is not None:
+            return self.map_repository.map_data
         try:
-            with open('robotics/config/map_data.json') as f:
-                return json.load(f)
+            self.tiled_map = TiledOccupancyMap(self.map_path)
+            self._map_mtime = os.path.getmtime(self.tiled_map.index_path)
+            map_data = self.tiled_map.map_data()
+            self.map_repository.replace(map_data, self.tiled_map.version)
+            return map_data
         except Exception as e:
             print(f"Error loading map data: {e}")
-            return {
-                'map': {'width': 1000, 'height': 1000, 'resolution': 0.5},
-                'obstacles': [],
-                'zones': [],
-                'charging_stations': [],
-                'paths': []
-            }
-    
-    def plan_path(self, start: Dict, goal: Dict, robot_id: str) -> List[Dict]:
-        """Plan a path from start to goal position"""
+            return empty_map()
+    
+    def _load_robot_config(self, path: str) -> Dict:
+        """Load robot configurations; planning falls back to the default specs"""
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading robot config: {e}")
+            return {'robots': {}}
+    
+    def robot_footprint(self, robot_id: Optional[str]) -> Dict:
+        """Planning specs for a robot: defaults overridden by its configuration"""
+        specs = dict(self.robot_specs)
+        config = self.robot_config.get('robots', {}).get(robot_id) if robot_id else None
+        if config:
+            for field in FOOTPRINT_FIELDS:
+                if field in config.get('specifications', {}):
+                    specs[field] = config['specifications'][field]
+        return specs
+    
+    def plan_path(
+        self,
+        start: Dict,
+        goal: Dict,
+        robot_id: str,
+        algorithm: str = 'astar',
+        any_angle: bool = False
+    ) -> List[Dict]:
+        """Plan a path from start to goal position
+        
+        With ``any_angle`` (implied by the ``theta`` planner) the grid path
+        is pulled taut by line-of-sight pruning and returned as the few
+        waypoints joining its straight segments, instead of a smoothed
+        trajectory with one point per cell. ``hybrid_astar`` returns poses
+        with a 'heading' (radians, counter-clockwise from +x) along a path
+        the robot can drive at its turning radius; an optional 'heading' on
+        start and goal fixes the initial and final orientation.
+        
+        Paths found are cached per start and goal bucket, robot footprint,
+        algorithm and map version (``path_cache``); failed searches are not,
+        so they are retried. A cached path is returned as a copy with its
+        ends moved to the exact positions asked for, and only while the
+        straight segments to the new ends stay clear; a bucket wider than a
+        cell could otherwise put an end inside an obstacle. A cache hit runs
+        no search and leaves ``last_search`` unchanged.
+        """
+        if algorithm not in self.planners and algorithm not in KINEMATIC_ALGORITHMS:
+            raise ValueError(f"Unknown planning algorithm: {algorithm}")
+        self._refresh_map_data()
+        self.path_cache.bind(self.map_version)
+        key = self._path_cache_key(start, goal, robot_id, algorithm, any_angle)
+        path = self.path_cache.get(key)
+        if path is not None and not self._ends_clear(path, start, goal, robot_id):
+            path = None
+        if path is None:
+            path = self._plan_path(start, goal, robot_id, algorithm, any_angle)
+            if path:
+                self.path_cache.put(key, path)
+        if not path:
+            return []
+        first = dict(path[0], x=float(start['x']), y=float(start['y']))
+        last = dict(path[-1], x=float(goal['x']), y=float(goal['y']))
+        return [first] + [dict(point) for point in path[1:-1]] + [last] if len(path) > 1 else [first]
+    
+    def _ends_clear(self, path: List[Dict], start: Dict, goal: Dict, robot_id: str) -> bool:
+        """Whether a cached path still joins this start and goal in straight clear segments"""
+        blocked = self._blocked_fn(robot_id)
+        step = self.map_data['map']['resolution'] / 4
+        # A one-point path joins the two ends directly
+        second, second_last = (path[1], path[-2]) if len(path) > 1 else (goal, start)
+        points = np.array([[p['x'], p['y']] for p in (start, path[0], second, second_last, path[-1], goal)], dtype=np.float64)
+        start_point, cached_start, second, second_last, cached_goal, goal_point = points
+        if (start_point != cached_start).any() and not segment_clear(blocked, start_point, second, step):
+            return False
+        if (goal_point != cached_goal).any() and not segment_clear(blocked, second_last, goal_point, step):
+            return False
+        return True
+    
+    def _plan_path(self, start: Dict, goal: Dict, robot_id: str, algorithm: str, any_angle: bool) -> List[Dict]:
+        any_angle = any_angle or algorithm in ANY_ANGLE_ALGORITHMS
+        
         # Convert positions to grid coordinates
         start_grid = self._world_to_grid(start)
         goal_grid = self._world_to_grid(goal)
         
-        # Create occupancy grid
-        grid = self._create_occupancy_grid()
+        if self.tiled_map is not None:
+            if any_angle:
+                raise ValueError("Any-angle paths are not available for tiled maps")
+            path = self._astar_tiled(robot_id, start_grid, goal_grid, algorithm)
+            return self._to_dicts(self._path_points(path, start, goal, robot_id))
         
-        # Use A* algorithm to find path
-        path = self._astar(grid, start_grid, goal_grid)
+        # Fetch the cached grid inflated for this robot's footprint
+        grid = self._get_configuration_space(robot_id)
         
-        # Convert path back to world coordinates
-        world_path = [self._grid_to_world(p) for p in path]
+        if algorithm in KINEMATIC_ALGORITHMS:
+            return self._hybrid_astar(grid, start, goal, robot_id)
         
-        # Smooth path
-        smoothed_path = self._smooth_path(world_path)
+        # Search the grid with the selected algorithm
+        path = self.planners[algorithm](grid, start_grid, goal_grid)
+        if any_angle and algorithm not in ANY_ANGLE_ALGORITHMS:
+            path = prune_path(grid.cells, path)
         
-        return smoothed_path
+        # Shortcut and smooth in world coordinates, as arrays until the end
+        return self._to_dicts(self._path_points(path, start, goal, robot_id, any_angle))
     
-    def optimize_path(self, path: List[Dict], robot_id: str) -> List[Dict]:
-        """Optimize an existing path for smoother movement"""
-        if not path or len(path) < 3:
-            return path
+    def _path_cache_key(self, start: Dict, goal: Dict, robot_id: str, algorithm: str, any_angle: bool) -> tuple:
+        quantum = PATH_CACHE_QUANTUM or self.map_data['map']['resolution']
+        specs = self.robot_footprint(robot_id)
+        headings = tuple(
+            None if position.get('heading') is None else round(float(position['heading']), 3)
+            for position in (start, goal)
+        )
+        return (
+            quantize(start, quantum),
+            quantize(goal, quantum),
+            headings,
+            tuple(specs[field] for field in FOOTPRINT_FIELDS),
+            algorithm,
+            any_angle,
+            self.map_version
+        )
+    
+    def path_cache_metrics(self) -> Dict:
+        """Hit, miss, expiry and eviction counts of the path query cache"""
+        return self.path_cache.metrics()
+    
+    def clear_path_cache(self) -> None:
+        self.path_cache.invalidate()
+    
+    def plan_paths(
+        self,
+        requests: List[Dict],
+        algorithm: str = 'astar',
+        workers: Optional[int] = None,
+        any_angle: bool = False
+    ) -> List[Dict]:
+        """Plan many routes in one call against a single cached grid
         
-        # Apply path smoothing algorithm
-        optimized_path = self._smooth_path(path)
+        Each request is a dict with 'robot_id', 'start' and 'goal'. Requests
+        that share a goal cell are answered from one reverse distance field
+        when there are enough of them; the remaining searches run across a
+        process pool. Results are returned in request order.
+        """
+        if algorithm not in self.planners:
+            raise ValueError(f"Unknown planning algorithm: {algorithm}")
+        workers = workers or self.batch_workers
         
-        # Add velocity profile
-        path_with_velocity = self._add_velocity_profile(optimized_path)
+        cells_of = [
+            (self._world_to_grid(request['start']), self._world_to_grid(request['goal']))
+            for request in requests
+        ]
+        results: List[Optional[SearchResult]] = [None] * len(requests)
         
-        return path_with_velocity
-    
-    def check_collision(self, position: Dict, robot_id: str) -> bool:
-        """Check if a position would cause a collision"""
-        # Convert position to grid coordinates
-        grid_pos = self._world_to_grid(position)
-        
-        # Get robot dimensions
-        robot_width = self.robot_specs['width']
-        robot_length = self.robot_specs['length']
-        
-        # Check collision with obstacles
-        for obstacle in self.map_data['obstacles']:
-            if obstacle['type'] == 'rectangle':
-                if self._check_rectangle_collision(
-                    grid_pos,
-                    robot_width,
-                    robot_length,
-                    obstacle
-                ):
-                    return True
-            elif obstacle['type'] == 'point':
-                if self._check_circle_collision(
-                    grid_pos,
-                    robot_width,
-                    obstacle
-                ):
-                    return True
-        
-        return False
+        # Robots sharing a footprint share one inflated grid
+        by_space = {}
+        spaces = {}
+        for i, request in enumerate(requests):
+            grid = self._get_configuration_space(request.get('robot_id'))
+            spaces[grid.version] = (grid, self._footprint_cells(request.get('robot_id'), grid.resolution))
+            by_space.setdefault(grid.version, []).append(i)
+        
+        for space_version, space_indices in by_space.items():
+            grid, radius_cells = spaces[space_version]
+            by_goal = {}
+            for i in space_indices:
+                by_goal.setdefault(cells_of[i][1], []).append(i)
+            
+            pending = []
+            for goal_cell, indices in by_goal.items():
+                # Distance fields give optimal paths, so only stand in for the
+                # exact planners
+                if algorithm in ('astar', 'jps') and len(indices) >= SHARED_GOAL_MIN_REQUESTS:
+                    field = self._get_goal_field(grid, goal_cell)
+                    for i in indices:
+                        results[i] = field.descend(cells_of[i][0])
+                else:
+                    pending.extend(indices)
+            
+            pairs = [cells_of[i] for i in pending]
+            if workers > 1 and len(pairs) > 1 and algorithm in PlannerPool.PARALLEL_ALGORITHMS:
+                searched = self._get_planner_pool(workers).search(algorithm, pairs, self.max_expansions, radius_cells)
+            else:
+                searched = []
+                for start_cell, goal_cell in pairs:
+                    self.planners[algorithm](grid, start_cell, goal_cell)
+                    searched.append(self.last_search)
+            for i, result in zip(pending, searched):
+                results[i] = result
+            
+            if any_angle and algorithm not in ANY_ANGLE_ALGORITHMS:
+                for i in space_indices:
+                    if results[i].found:
+                        path = prune_path(grid.cells, results[i].path)
+                        results[i] = SearchResult(path, euclidean_cost(path), results[i].expansions, 'found')
+        
+        resolution = self.map_data['map']['resolution']
+        planned = []
+        for request, result in zip(requests, results):
+            points = self._path_points(
+                result.path,
+                request['start'],
+                request['goal'],
+                request.get('robot_id'),
+                any_angle or algorithm in ANY_ANGLE_ALGORITHMS
+            )
+            planned.append({
+                'robot_id': request.get('robot_id'),
+                'status': result.status,
+                'path': self._to_dicts(points),
+                'cost': float(result.cost * resolution) if result.found else None,
+                'expansions': result.expansions
+            })
+        return planned
     
-    def _create_occupancy_grid(self) -> np.ndarray:
-        """Create an occupancy grid from map data"""
-        width = self.map_data['map']['width']
-        height = self.map_data['map']['height']
+    def route_to_nearest_charger(self, position: Dict, robot_id: str) -> Dict:
+        """Route from a position to the closest charging station
+        
+        Follows the precomputed charging station distance field, so no
+        search is run at request time.
+        """
+        field = self._get_charger_field(robot_id)
+        result = field.descend(self._world_to_grid(position))
+        self.last_search = result
+        if not result.found:
+            return {'station_id': None, 'distance': None, 'path': []}
+        
+        station = None
+        end = self._grid_to_world(result.path[-1])
         resolution = self.map_data['map']['resolution']
+        for _, candidate in self._get_map_index().charging_stations.nearest(end['x'], end['y'], k=4, max_distance=2 * resolution):
+            if self._world_to_grid(candidate['position']) == result.path[-1]:
+                station = candidate
+                break
+        goal = station['position'] if station is not None else None
+        points = self._trajectory(self._cells_to_points(result.path, position, goal), robot_id)
+        return {
+            'station_id': station['id'] if station is not None else None,
+            'distance': float(result.cost * self.map_data['map']['resolution']),
+            'path': self._to_dicts(points)
+        }
+    
+    def optimize_visit_order(
+        self,
+        targets: List[Dict],
+        robots: List[Dict],
+        algorithm: str = 'jps',
+        return_to_start: bool = False,
+        time_budget: Optional[float] = None,
+        capacity_field: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> Dict:
+        """Order target positions into short routes for one or more robots
         
-        grid_width = int(width / resolution)
-        grid_height = int(height / resolution)
-        
-        grid = np.zeros((grid_height, grid_width))
-        
-        # Mark obstacles
-        for obstacle in self.map_data['obstacles']:
-            if obstacle['type'] == 'rectangle':
-                x1 = int(obstacle['x1'] / resolution)
-                y1 = int(obstacle['y1'] / resolution)
-                x2 = int(obstacle['x2'] / resolution)
-                y2 = int(obstacle['y2'] / resolution)
-                grid[y1:y2, x1:x2] = 1
-            elif obstacle['type'] == 'point':
-                x = int(obstacle['x'] / resolution)
-                y = int(obstacle['y'] / resolution)
-                radius = int(obstacle['radius'] / resolution)
-                for i in range(-radius, radius + 1):
-                    for j in range(-radius, radius + 1):
-                        if i*i + j*j <= radius*radius:
-                            if 0 <= y + i < grid_height and 0 <= x + j < grid_width:
-                                grid[y + i, x + j] = 1
-        
-        return grid
-    
-    def _astar(self, grid: np.ndarray, start: tuple, goal: tuple) -> List[tuple]:
-        """A* path planning algorithm"""
-        # Implementation of A* algorithm
-        # This is a simplified version - in practice, you'd want to use a more robust implementation
-        from heapq import heappush, heappop
+        ``targets`` are positions with an optional 'demand' (default 1);
+        ``robots`` are dicts with 'robot_id', 'start' and an optional
+        'capacity'. Without one, the robot's ``capacity_field``
+        specification (e.g. 'payload_capacity') is used when given,
+        otherwise capacity is unlimited. Travel costs between all stops are
+        grid path lengths on each robot's configuration space, searched as
+        one batch (across the planner pool when there are workers). Routes
+        are built by cheapest insertion and improved with 2-opt and Or-opt
+        for ``time_budget`` seconds. Targets no robot can reach or carry
+        are returned as 'unassigned'.
+        """
+        if algorithm not in PlannerPool.PARALLEL_ALGORITHMS:
+            raise ValueError(f"Algorithm {algorithm} cannot be used for route optimization")
+        if not robots:
+            raise ValueError("At least one robot is needed")
+        if len({robot['robot_id'] for robot in robots}) != len(robots):
+            raise ValueError("Robot ids must be unique")
         
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        count = len(targets)
+        nodes = [self._world_to_grid(target) for target in targets]
+        nodes += [self._world_to_grid(robot['start']) for robot in robots]
+        cost_of = {}
+        searches = 0
+        matrices = {}
+        for i, robot in enumerate(robots):
+            robot_id = robot['robot_id']
+            grid = self._get_configuration_space(robot_id)
+            if grid.version not in matrices:
+                radius_cells = self._footprint_cells(robot_id, grid.resolution)
+                matrices[grid.version] = (grid, radius_cells, np.full((len(nodes), len(nodes)), np.inf), [])
+            matrices[grid.version][3].append(count + i)
+            cost_of[robot_id] = matrices[grid.version][2]
+        for grid, radius_cells, matrix, start_nodes in matrices.values():
+            searches += self._fill_cost_matrix(grid, radius_cells, matrix, nodes, count, start_nodes, algorithm, workers)
         
-        neighbors = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+        capacities = {}
+        for robot in robots:
+            capacity = robot.get('capacity')
+            if capacity is None and capacity_field:
+                config = self.robot_config.get('robots', {}).get(robot['robot_id'], {})
+                capacity = config.get('specifications', {}).get(capacity_field)
+            if capacity is not None:
+                capacities[robot['robot_id']] = float(capacity)
         
-        close_set = set()
-        came_from = {}
-        gscore = {start: 0}
-        fscore = {start: heuristic(start, goal)}
-        oheap = []
-        heappush(oheap, (fscore[start], start))
+        solution = plan_routes(
+            cost_of,
+            {robot['robot_id']: count + i for i, robot in enumerate(robots)},
+            range(count),
+            demands=[float(target.get('demand', 1.0)) for target in targets],
+            capacities=capacities,
+            closed=return_to_start,
+            time_budget=DEFAULT_ROUTE_BUDGET if time_budget is None else time_budget
+        )
         
-        while oheap:
-            current = heappop(oheap)[1]
-            
-            if current == goal:
-                data = []
-                while current in came_from:
-                    data.append(current)
-                    current = came_from[current]
-                return data[::-1]
-            
-            close_set.add(current)
-            for i, j in neighbors:
-                neighbor = current[0] + i, current[1] + j
-                tentative_g_score = gscore[current] + heuristic(current, neighbor)
-                
-                if 0 <= neighbor[0] < grid.shape[0]:
-                    if 0 <= neighbor[1] < grid.shape[1]:
-                        if grid[neighbor[0]][neighbor[1]] == 1:
-                            continue
-                    else:
-                        continue
-                else:
+        resolution = self.map_data['map']['resolution']
+        routes = []
+        for robot in robots:
+            robot_id = robot['robot_id']
+            route = solution['routes'][robot_id]
+            order = route[1:]
+            routes.append({
+                'robot_id': robot_id,
+                'order': order,
+                'positions': [targets[t] for t in order],
+                'cost': route_cost(cost_of[robot_id], route, return_to_start) * resolution,
+                'load': solution['load'][robot_id]
+            })
+        return {
+            'routes': routes,
+            'unassigned': solution['unassigned'],
+            'cost': sum(route['cost'] for route in routes),
+            'searches': searches
+        }
+    
+    def _fill_cost_matrix(
+        self,
+        grid: OccupancyGrid,
+        radius_cells: int,
+        matrix: np.ndarray,
+        nodes: List[tuple],
+        count: int,
+        start_nodes: List[int],
+        algorithm: str,
+        workers: Optional[int]
+    ) -> int:
+        """Grid path lengths between node pairs, searched as one batch
+        
+        ``grid`` is the configuration space of a footprint ``radius_cells``
+        wide. The first ``count`` nodes are targets; entries are filled
+        between targets and from ``start_nodes`` to targets. Paths on the
+        grid are symmetric, so each unordered pair of distinct target cells
+        is searched once. Searches from a robot start always run from the
+        start: a robot may start inside the inflated obstacles, which a
+        search can leave but not enter. Returns the number of searches.
+        """
+        workers = workers or self.batch_workers
+        pairs = {}
+        members = list(range(count)) + start_nodes
+        for a in members:
+            matrix[a, a] = 0.0
+            for b in range(count):
+                if a < count and b <= a:
                     continue
-                
-                if neighbor in close_set and tentative_g_score >= gscore.get(neighbor, 0):
+                if a < count:
+                    key = (min(nodes[a], nodes[b]), max(nodes[a], nodes[b]))
+                else:
+                    key = (nodes[a], nodes[b])
+                pairs.setdefault(key, []).append((a, b))
+        unique = [key for key in pairs if key[0] != key[1]]
+        if workers > 1 and len(unique) > 1:
+            searched = self._get_planner_pool(workers).search(algorithm, unique, self.max_expansions, radius_cells)
+        else:
+            searched = []
+            for start_cell, goal_cell in unique:
+                self.planners[algorithm](grid, start_cell, goal_cell)
+                searched.append(self.last_search)
+        costs = {key: result.cost for key, result in zip(unique, searched)}
+        for key, entries in pairs.items():
+            cost = costs.get(key, 0.0 if not grid.cells[key[0]] else math.inf)
+            for a, b in entries:
+                matrix[a, b] = matrix[b, a] = cost
+        return len(unique)
+    
+    def plan_zone_coverage(self, zone_id: str, robot_id: str, tool_width: Optional[float] = None) -> Dict:
+        """Boustrophedon sweep covering a zone with a tool of the given width
+        
+        Lanes run along the zone's longer side, one tool width apart (the
+        robot's width by default), over the part of the zone the robot's
+        configuration space leaves free. Obstacles split the lanes into
+        cells that are swept one after another; the path stays inside the
+        zone. Plans are cached per configuration space version, zone and
+        tool width. 'coverage' is the fraction of the zone's free area the
+        tool passes over.
+        """
+        zone = next((z for z in self.map_data['zones'] if z.get('id') == zone_id), None)
+        if zone is None:
+            raise KeyError(f"Zone {zone_id} not found")
+        if tool_width is None:
+            tool_width = self.robot_footprint(robot_id)['width']
+        if tool_width <= 0:
+            raise ValueError("Tool width must be positive")
+        
+        grid = self._get_configuration_space(robot_id)
+        key = (grid.version, zone_id, float(tool_width))
+        plan = self._coverage_plans.get(key)
+        if plan is None:
+            plan = self._build_coverage_plan(grid, zone, tool_width)
+            self._coverage_plans[key] = plan
+            while len(self._coverage_plans) > COVERAGE_CACHE_SIZE:
+                self._coverage_plans.popitem(last=False)
+        else:
+            self._coverage_plans.move_to_end(key)
+        
+        resolution = grid.resolution
+        return {
+            'zone_id': zone_id,
+            'tool_width': float(tool_width),
+            'path': self._to_dicts(self._cells_to_points(plan.waypoints)),
+            'length': float(plan.length * resolution),
+            'coverage': plan.coverage,
+            'cells': plan.cells,
+            'lanes': plan.lanes,
+            'skipped': plan.skipped
+        }
+    
+    def _build_coverage_plan(self, grid: OccupancyGrid, zone: Dict, tool_width: float) -> CoveragePlan:
+        resolution = grid.resolution
+        area = zone['area']
+        rows, cols = grid.shape
+        r0 = min(max(int(math.floor(min(area['y1'], area['y2']) / resolution)), 0), rows)
+        r1 = min(max(int(math.ceil(max(area['y1'], area['y2']) / resolution)), 0), rows)
+        c0 = min(max(int(math.floor(min(area['x1'], area['x2']) / resolution)), 0), cols)
+        c1 = min(max(int(math.ceil(max(area['x1'], area['x2']) / resolution)), 0), cols)
+        if r0 == r1 or c0 == c1:
+            return CoveragePlan()
+        return plan_coverage(
+            grid.cells[r0:r1, c0:c1] == 0,
+            int(math.floor(tool_width / resolution + 1e-9)),
+            offset=(r0, c0),
+            obstacles=self._get_occupancy_grid().cells[r0:r1, c0:c1],
+            transpose=(r1 - r0) > (c1 - c0),
+            max_expansions=self.max_expansions
+        )
+    
+    def plan_coordinated(
+        self,
+        requests: List[Dict],
+        algorithm: str = 'jps',
+        start_time: Optional[float] = None,
+        time_budget: Optional[float] = None
+    ) -> List[Dict]:
+        """Plan conflict-free timed routes for a batch of robots
+        
+        Each request is a dict with 'robot_id', 'start' and 'goal'; earlier
+        requests have priority. Every robot's path is searched in its own
+        configuration space and then timed around the routes already in the
+        shared space-time reservation table, waiting or detouring where
+        robots would come closer than their footprints allow. Routes stay
+        reserved (and robots parked at their goals) until they are replanned
+        or released, so later batches avoid them too. Points carry 't', the
+        time in seconds (``start_time``, default now, plus whole steps of
+        ``coordination_step``). Robot ids must be unique.
+        """
+        if algorithm not in COORDINATED_ALGORITHMS:
+            raise ValueError(f"Algorithm {algorithm} cannot be used for coordinated planning")
+        if len({request['robot_id'] for request in requests}) != len(requests):
+            raise ValueError("Robot ids must be unique")
+        if start_time is None:
+            start_time = time.time()
+        step_seconds = self.coordination_step
+        start_step = int(math.ceil(start_time / step_seconds))
+        table = self._get_reservation_table()
+        table.expire(start_step)
+        
+        robots = []
+        grids = {}
+        for request in requests:
+            robot_id = request['robot_id']
+            grid = self._get_configuration_space(robot_id)
+            self.planners[algorithm](grid, self._world_to_grid(request['start']), self._world_to_grid(request['goal']))
+            grids[robot_id] = grid.cells
+            robots.append({
+                'robot_id': robot_id,
+                'path': self.last_search.path,
+                'radius': footprint_radius(self.robot_footprint(robot_id)) / grid.resolution
+            })
+        
+        results = plan_cooperative(
+            grids,
+            table,
+            robots,
+            start_step,
+            time_budget=DEFAULT_COORDINATION_BUDGET if time_budget is None else time_budget,
+            max_expansions=min(self.max_expansions, DEFAULT_REPAIR_EXPANSIONS)
+        )
+        
+        cols = table.shape[1]
+        planned = []
+        for request, result in zip(requests, results):
+            timed = result['timed']
+            cells = [divmod(idx, cols) for idx, _ in timed]
+            points = self._cells_to_points(cells, request['start'], request['goal'])
+            times = [step * step_seconds for _, step in timed]
+            planned.append({
+                'robot_id': request['robot_id'],
+                'status': result['status'],
+                'path': [{'x': x, 'y': y, 't': t} for (x, y), t in zip(points.tolist(), times)],
+                'arrival': times[-1] if times else None
+            })
+        return planned
+    
+    def release_reservations(self, robot_id: str) -> None:
+        """Drop a robot's timed route and parked goal from the reservation table"""
+        if self._reservations is None or not self._reservations.release(robot_id):
+            raise KeyError(f"No reservations for robot {robot_id}")
+    
+    @property
+    def coordination_step(self) -> float:
+        """Seconds per coordination step: one diagonal cell for the slowest robot"""
+        speeds = [self.robot_specs['max_speed']] + [
+            robot.get('specifications', {}).get('max_speed', self.robot_specs['max_speed'])
+            for robot in self.robot_config.get('robots', {}).values()
+        ]
+        return math.sqrt(2.0) * self.map_data['map']['resolution'] / min(speeds)
+    
+    def _get_reservation_table(self) -> ReservationTable:
+        """Space-time reservations shared by all coordinated routes on this map"""
+        shape = self._get_occupancy_grid().shape
+        if self._reservations is None or self._reservations.shape != tuple(shape):
+            self._reservations = ReservationTable(shape)
+        return self._reservations
+    
+    def start_route(self, start: Dict, goal: Dict, robot_id: str) -> Dict:
+        """Plan a route and keep its search state for incremental repair"""
+        session = self.new_route(start, goal, robot_id)
+        session.plan()
+        return self.keep_route(session)
+    
+    def new_route(self, start: Dict, goal: Dict, robot_id: str) -> RouteSession:
+        """Unplanned search state for a route on the current map
+        
+        The session only reads the grids of the map version it was created
+        on, which are never modified in place, so its first and most
+        expensive search (``session.plan()``) may run in another thread.
+        Pass it to ``keep_route`` afterwards.
+        """
+        grid = self._get_occupancy_grid()
+        space = self._get_configuration_space(robot_id)
+        route_id = uuid.uuid4().hex
+        session = RouteSession(
+            route_id,
+            robot_id,
+            grid.cells,
+            space.cells,
+            self._footprint_cells(robot_id, grid.resolution),
+            self._world_to_grid(start),
+            self._world_to_grid(goal),
+            max_expansions=self.max_expansions
+        )
+        session.endpoints = (start, goal)
+        return session
+    
+    def keep_route(self, session: RouteSession) -> Dict:
+        """Keep a route for ``update_route`` and return its path"""
+        if session.result is None:
+            session.plan()
+        self._routes[session.route_id] = session
+        # Each route holds two floats per grid cell
+        budget = ROUTE_MEMORY_MB * 2 ** 20
+        held = sum(route.planner.nbytes for route in self._routes.values())
+        while len(self._routes) > 1 and (len(self._routes) > MAX_ROUTE_SESSIONS or held > budget):
+            _, dropped = self._routes.popitem(last=False)
+            held -= dropped.planner.nbytes
+        return self._route_response(session)
+    
+    def update_route(self, route_id: str, changes: List[Dict], position: Optional[Dict] = None) -> Dict:
+        """Repair a route after cells change, optionally from a new position
+        
+        ``changes`` are {'x', 'y', 'occupied'} dicts in world coordinates;
+        only the part of the search affected by them is recomputed.
+        """
+        session = self._routes.get(route_id)
+        if session is None:
+            raise KeyError(f"Route {route_id} not found")
+        self._routes.move_to_end(route_id)
+        cells = [(self._world_to_grid(change), bool(change['occupied'])) for change in changes]
+        start = self._world_to_grid(position) if position is not None else None
+        session.update(cells, start)
+        if position is not None:
+            session.endpoints = (position, session.endpoints[1])
+        return self._route_response(session)
+    
+    def end_route(self, route_id: str) -> None:
+        """Drop the search state of a finished route"""
+        if self._routes.pop(route_id, None) is None:
+            raise KeyError(f"Route {route_id} not found")
+    
+    def _route_response(self, session: RouteSession) -> Dict:
+        result = session.result
+        self.last_search = result
+        points = self._trajectory(self._cells_to_points(result.path, *session.endpoints), session.robot_id)
+        return {
+            'route_id': session.route_id,
+            'robot_id': session.robot_id,
+            'status': result.status,
+            'path': self._to_dicts(points),
+            'cost': float(result.cost * self.map_data['map']['resolution']) if result.found else None,
+            'expansions': result.expansions
+        }
+    
+    def add_obstacle(self, obstacle: Dict) -> str:
+        """Add an obstacle to the live map and return the new map version
+        
+        The grid is updated by rasterizing only the new obstacle, and an
+        existing HPA* abstraction is repaired for the affected clusters
+        instead of being rebuilt.
+        """
+        if obstacle.get('type') not in ('rectangle', 'point'):
+            raise ValueError(f"Unsupported obstacle type: {obstacle.get('type')}")
+        
+        old_grid = self._get_occupancy_grid()
+        resolution = self.map_data['map']['resolution']
+        cells = old_grid.cells.copy()
+        window = rasterize_obstacle(cells, obstacle, resolution)
+        
+        map_data = dict(self.map_data)
+        map_data['obstacles'] = self.map_data['obstacles'] + [obstacle]
+        version = map_version(map_data)
+        grid = OccupancyGrid.from_array(cells, resolution, version)
+        
+        if window is not None:
+            self._carry_abstraction(old_grid, grid, window)
+            # Update the inflated grids already built for robot footprints
+            for key in old_grid.derived_keys():
+                if not key.startswith(CSPACE_KEY_PREFIX):
                     continue
-                
-                if tentative_g_score < gscore.get(neighbor, 0) or neighbor not in [i[1] for i in oheap]:
-                    came_from[neighbor] = current
-                    gscore[neighbor] = tentative_g_score
-                    fscore[neighbor] = tentative_g_score + heuristic(neighbor, goal)
-                    heappush(oheap, (fscore[neighbor], neighbor))
+                old_space = old_grid.peek_derived(key)
+                radius_cells = int(key[len(CSPACE_KEY_PREFIX):])
+                inflated, space_window = inflate_window(old_space.cells, cells, window, radius_cells)
+                space = grid.derived(key, lambda _: OccupancyGrid.from_array(
+                    inflated, resolution, f"{version}-r{radius_cells}"
+                ))
+                self._carry_abstraction(old_space, space, space_window)
         
-        return []
+        self.grid_cache.put(grid)
+        self.map_data = map_data
+        self.map_version = version
+        self.map_repository.replace(map_data, version)
+        self.occupancy_grid = grid
+        return version
     
-    def _smooth_path(self, path: List[Dict]) -> List[Dict]:
-        """Smooth a path using spline interpolation"""
-        if len(path) < 3:
+    def _carry_abstraction(self, old_grid: OccupancyGrid, grid: OccupancyGrid, window: tuple) -> None:
+        """Repair an HPA* abstraction built on old_grid for the new grid"""
+        abstraction = old_grid.peek_derived('cluster_abstraction')
+        if abstraction is not None:
+            grid.derived('cluster_abstraction', lambda cells: abstraction.repaired(cells, window))
+    
+    def optimize_path(self, path: List[Dict], robot_id: str) -> List[Dict]:
+        """Optimize an existing path for smoother movement"""
+        if not path or len(path) < 3:
             return path
         
-        # Extract x and y coordinates
-        x = [p['x'] for p in path]
-        y = [p['y'] for p in path]
+        # Shortcut and spline-fit against the robot's configuration space
+        points = self._trajectory(self._to_points(path), robot_id)
         
-        # Create parameter t
-        t = np.linspace(0, 1, len(path))
+        # Add velocity profile
+        specs = self.robot_footprint(robot_id)
+        speeds = velocity_profile(
+            points,
+            specs['max_speed'],
+            specs['max_acceleration'],
+            specs['turning_radius']
+        )
         
-        # Create new parameter t for interpolation
-        t_new = np.linspace(0, 1, len(path) * 2)
+        return self._to_dicts(points, speeds)
+    
+    def check_collision(self, position: Dict, robot_id: str) -> bool:
+        """Check if a position would cause a collision"""
+        return self.check_collisions([position], robot_id)[0]
+    
+    def check_collisions(self, positions, robot_id: str) -> List[bool]:
+        """Check many positions against the robot's configuration space
         
-        # Interpolate x and y coordinates
-        from scipy.interpolate import interp1d
-        fx = interp1d(t, x, kind='cubic')
-        fy = interp1d(t, y, kind='cubic')
+        ``positions`` is a list of {'x', 'y'} dicts or an (N, 2) array of
+        world coordinates. Each check is a single lookup in the grid inflated
+        by the robot footprint, the same grid the planners search, so planned
+        paths always pass it. Positions off the map collide.
+        """
+        if isinstance(positions, np.ndarray):
+            xy = positions.astype(np.float64).reshape(-1, 2)
+        else:
+            xy = self._to_points(positions)
         
-        x_new = fx(t_new)
-        y_new = fy(t_new)
+        return self._blocked_fn(robot_id)(xy).tolist()
+    
+    def colliding_obstacles(self, position: Dict, robot_id: str) -> List[Dict]:
+        """Obstacles overlapping the robot footprint at a position"""
+        half = footprint_radius(self.robot_footprint(robot_id))
+        return self._get_map_index().obstacles.query_radius(position['x'], position['y'], half)
+    
+    def find_obstacles(
+        self,
+        bbox: Optional[tuple] = None,
+        center: Optional[Dict] = None,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        """Obstacles intersecting a (x1, y1, x2, y2) box and/or within radius of center"""
+        return self._query(self._get_map_index().obstacles, bbox, center, radius)
+    
+    def find_zones(
+        self,
+        bbox: Optional[tuple] = None,
+        center: Optional[Dict] = None,
+        radius: Optional[float] = None
+    ) -> List[Dict]:
+        """Zones intersecting a box and/or within radius of center"""
+        return self._query(self._get_map_index().zones, bbox, center, radius)
+    
+    def zones_at(self, position: Dict) -> List[Dict]:
+        """Zones containing a position"""
+        return self._get_map_index().zones.containing(position['x'], position['y'])
+    
+    def nearest_charging_stations(self, position: Dict, k: int = 1) -> List[Dict]:
+        """The k closest charging stations by straight-line distance"""
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        nearest = self._get_map_index().charging_stations.nearest(position['x'], position['y'], k)
+        return [dict(station, distance=float(d)) for d, station in nearest]
+    
+    def _query(self, index, bbox, center, radius) -> List[Dict]:
+        if bbox is not None:
+            x1, y1, x2, y2 = bbox
+            if x1 > x2 or y1 > y2:
+                raise ValueError("Bounding box must be given as x1,y1,x2,y2 with x1 <= x2 and y1 <= y2")
+        if radius is not None and (center is None or radius < 0):
+            raise ValueError("A radius query needs a center and a non-negative radius")
+        if radius is not None:
+            items = index.query_radius(center['x'], center['y'], radius)
+            if bbox is not None:
+                inside = {id(item) for item in index.query_bbox(bbox)}
+                items = [item for item in items if id(item) in inside]
+            return items
+        if bbox is not None:
+            return index.query_bbox(bbox)
+        return list(index.items)
+    
+    def _get_map_index(self) -> MapIndex:
+        """Spatial index over the features of the current map version"""
+        self._refresh_map_data()
+        if self._map_index is None or self._map_index.version != self.map_version:
+            self._map_index = MapIndex(self.map_data, self.map_version)
+        return self._map_index
+    
+    def _create_occupancy_grid(self) -> np.ndarray:
+        """Return the occupancy grid for the current map version"""
+        return self._get_occupancy_grid().cells
+    
+    def _get_configuration_space(self, robot_id: Optional[str] = None) -> OccupancyGrid:
+        """The current grid inflated by a robot's footprint, cached per footprint"""
+        grid = self._get_occupancy_grid()
+        return configuration_space(grid, self._footprint_cells(robot_id, grid.resolution))
+    
+    def _footprint_cells(self, robot_id: Optional[str], resolution: float) -> int:
+        return inflation_cells(footprint_radius(self.robot_footprint(robot_id)), resolution)
+    
+    def _get_occupancy_grid(self) -> OccupancyGrid:
+        """Get the cached grid, reloading the map if its file changed"""
+        self._refresh_map_data()
+        if self.tiled_map is not None:
+            raise ValueError("Operation needs an in-memory grid and is not available for tiled maps")
+        return self.occupancy_grid
+    
+    def _refresh_map_data(self) -> None:
+        """Reload map data and swap grids when map_data.json changes"""
+        if self.tiled_map is not None:
+            try:
+                mtime = os.path.getmtime(self.tiled_map.index_path)
+            except OSError:
+                return
+            if mtime != self._map_mtime:
+                # A rebuilt tiled map is reopened; tiles stay on disk
+                self.map_data = self._load_map_data()
+                self.map_version = self.tiled_map.version
+            return
         
-        # Create new path
-        smoothed_path = []
-        for i in range(len(x_new)):
-            smoothed_path.append({
-                'x': float(x_new[i]),
-                'y': float(y_new[i])
-            })
+        self.map_repository.refresh()
+        if self.map_repository.version != self.map_version:
+            self.map_data = self.map_repository.map_data
+            self.map_version = self.map_repository.version
+            self.occupancy_grid = self.grid_cache.get(self.map_data, self.map_version)
+    
+    def _astar(self, grid: OccupancyGrid, start: tuple, goal: tuple) -> List[tuple]:
+        """A* path planning algorithm"""
+        result = astar(
+            grid.cells,
+            start,
+            goal,
+            max_expansions=self.max_expansions,
+            workspace=self._get_search_workspace(grid.shape)
+        )
+        self.last_search = result
+        return result.path
+    
+    def _jps(self, grid: OccupancyGrid, start: tuple, goal: tuple) -> List[tuple]:
+        """Jump Point Search, same path cost as A* with far fewer expansions"""
+        result = jps(
+            grid.cells,
+            start,
+            goal,
+            max_expansions=self.max_expansions,
+            workspace=self._get_search_workspace(grid.shape),
+            jump_table=grid.derived('jump_table', JumpTable)
+        )
+        self.last_search = result
+        return result.path
+    
+    def _hpa(self, grid: OccupancyGrid, start: tuple, goal: tuple) -> List[tuple]:
+        """Hierarchical A* over the precomputed cluster abstraction"""
+        abstraction = grid.derived(
+            'cluster_abstraction',
+            lambda cells: ClusterAbstraction(cells, self.hpa_cluster_size)
+        )
+        result = abstraction.find_path(start, goal, max_expansions=self.max_expansions)
+        self.last_search = result
+        if result.status == 'no_path':
+            # The abstraction can miss connections squeezed through cluster
+            # corners; confirm with a full search before giving up
+            return self._astar(grid, start, goal)
+        return result.path
+    
+    def _theta(self, grid: OccupancyGrid, start: tuple, goal: tuple) -> List[tuple]:
+        """Theta* any-angle search; returns only the segment endpoints"""
+        result = theta_star(
+            grid.cells,
+            start,
+            goal,
+            max_expansions=self.max_expansions,
+            workspace=self._get_search_workspace(grid.shape)
+        )
+        self.last_search = result
+        return result.path
+    
+    def _hybrid_astar(self, grid: OccupancyGrid, start: Dict, goal: Dict, robot_id: str) -> List[Dict]:
+        """Hybrid A* over (x, y, heading) with the robot's motion primitives"""
+        turning_radius = self._planning_turning_radius(robot_id, grid.resolution)
+        goal_cell = self._world_to_grid(goal)
+        start_heading = start.get('heading')
+        if start_heading is None:
+            # Without a known orientation, assume the robot faces the goal
+            start_heading = float(np.arctan2(goal['y'] - start['y'], goal['x'] - start['x']))
+        goal_field = None
+        rows, cols = grid.shape
+        if 0 <= goal_cell[0] < rows and 0 <= goal_cell[1] < cols:
+            goal_field = self._get_goal_field(grid, goal_cell).dist
+        result = hybrid_astar(
+            grid.cells,
+            grid.resolution,
+            (start['x'], start['y'], start_heading),
+            (goal['x'], goal['y'], goal.get('heading')),
+            self._get_motion_primitives(turning_radius, grid.resolution),
+            self._get_dubins_heuristic(turning_radius, grid.resolution),
+            goal_distance=goal_field,
+            max_expansions=self.max_expansions
+        )
+        self.last_search = result
+        return [{'x': x, 'y': y, 'heading': heading} for x, y, heading in result.path]
+    
+    def _planning_turning_radius(self, robot_id: Optional[str], resolution: float) -> float:
+        """Turning radius for kinematic planning; robots that turn in place use one cell"""
+        turning_radius = float(self.robot_footprint(robot_id)['turning_radius'])
+        return turning_radius if turning_radius > 0 else resolution
+    
+    def _get_motion_primitives(self, turning_radius: float, resolution: float) -> MotionPrimitives:
+        """Motion primitives shared by robot types with the same turning radius"""
+        key = (turning_radius, resolution)
+        primitives = self._motion_primitives.get(key)
+        if primitives is None:
+            primitives = MotionPrimitives(turning_radius, resolution)
+            self._motion_primitives[key] = primitives
+        return primitives
+    
+    def _get_dubins_heuristic(self, turning_radius: float, resolution: float) -> DubinsHeuristic:
+        """Dubins heuristic table shared by robot types with the same turning radius"""
+        key = (turning_radius, resolution)
+        heuristic = self._dubins_heuristics.get(key)
+        if heuristic is None:
+            heuristic = self._build_dubins_heuristic(turning_radius, resolution)
+            self._dubins_heuristics[key] = heuristic
+        return heuristic
+    
+    def _build_dubins_heuristic(self, turning_radius: float, resolution: float) -> DubinsHeuristic:
+        """Load the Dubins heuristic table from the cache directory or compute it"""
+        cache_dir = self.grid_cache.cache_dir
+        name = f"dubins_r{turning_radius:g}_res{resolution:g}_h{DEFAULT_HEADINGS}.npy"
+        path = os.path.join(cache_dir, name) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                return DubinsHeuristic.load(path, resolution)
+            except Exception as e:
+                print(f"Error loading Dubins heuristic: {e}")
+        
+        heuristic = DubinsHeuristic.build(turning_radius, resolution)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                heuristic.save(path)
+            except Exception as e:
+                print(f"Error saving Dubins heuristic: {e}")
+        return heuristic
+    
+    def _astar_tiled(self, robot_id: str, start: tuple, goal: tuple, algorithm: str) -> List[tuple]:
+        """A* over the tiled map, reading footprint-inflated tiles on demand"""
+        if algorithm != 'astar':
+            raise ValueError(f"Algorithm {algorithm} is not available for tiled maps")
+        self._refresh_map_data()
+        tiled = self.tiled_map
+        result = astar_sparse(
+            tiled.lookup(self._footprint_cells(robot_id, tiled.resolution)),
+            tiled.shape,
+            start,
+            goal,
+            max_expansions=self.max_expansions
+        )
+        self.last_search = result
+        return result.path
+    
+    def _get_charger_field(self, robot_id: Optional[str] = None) -> DistanceField:
+        """Distance field to all charging stations for the current map version"""
+        grid = self._get_configuration_space(robot_id)
+        if not self.map_data['charging_stations']:
+            raise ValueError("No charging stations in map")
+        return grid.derived('charger_field', lambda cells: self._build_charger_field(grid))
+    
+    def _build_charger_field(self, grid: OccupancyGrid) -> DistanceField:
+        """Load the charger field from the cache directory or compute it"""
+        sources = [self._world_to_grid(s['position']) for s in self.map_data['charging_stations']]
+        cache_dir = self.grid_cache.cache_dir
+        path = os.path.join(cache_dir, f"charger_field_{grid.version}.npy") if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                return DistanceField.load(path, sources)
+            except Exception as e:
+                print(f"Error loading charger distance field: {e}")
         
-        return smoothed_path
+        field = DistanceField.build(grid.cells, sources)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                field.save(path)
+            except Exception as e:
+                print(f"Error saving charger distance field: {e}")
+        return field
+    
+    def _get_goal_field(self, grid: OccupancyGrid, goal_cell: tuple) -> DistanceField:
+        """Reverse distance field to one goal, kept in a small LRU"""
+        key = (grid.version, goal_cell)
+        field = self._goal_fields.get(key)
+        if field is None:
+            field = DistanceField.build(grid.cells, [goal_cell])
+            self._goal_fields[key] = field
+            while len(self._goal_fields) > GOAL_FIELD_CACHE_SIZE:
+                self._goal_fields.popitem(last=False)
+        else:
+            self._goal_fields.move_to_end(key)
+        return field
+    
+    def _get_planner_pool(self, workers: int) -> PlannerPool:
+        """Process pool bound to the current map version, for every footprint"""
+        grid = self._get_occupancy_grid()
+        pool = self._planner_pool
+        if pool is None or pool.version != grid.version or pool.workers != workers:
+            if pool is not None:
+                pool.shutdown()
+            pool = PlannerPool(grid, workers)
+            self._planner_pool = pool
+        return pool
     
-    def _add_velocity_profile(self, path: List[Dict]) -> List[Dict]:
+    def _get_search_workspace(self, shape: tuple) -> SearchWorkspace:
+        """Reuse the flat search arrays across calls on the same grid shape"""
+        if self._search_workspace is None or self._search_workspace.shape != tuple(shape):
+            self._search_workspace = SearchWorkspace(shape)
+        return self._search_workspace
+    
+    def _smooth_path(self, path: List[Dict], robot_id: Optional[str] = None) -> List[Dict]:
+        """Smooth a path by shortcutting and spline fitting"""
+        if len(path) < 3:
+            return path
+        return self._to_dicts(self._trajectory(self._to_points(path), robot_id))
+    
+    def _add_velocity_profile(self, path: List[Dict], robot_id: Optional[str] = None) -> List[Dict]:
         """Add velocity profile to path"""
-        max_speed = self.robot_specs['max_speed']
-        max_acceleration = 0.5  # m/s^2
-        
-        # Calculate distances between points
-        distances = []
-        for i in range(1, len(path)):
-            dx = path[i]['x'] - path[i-1]['x']
-            dy = path[i]['y'] - path[i-1]['y']
-            distances.append(np.sqrt(dx*dx + dy*dy))
-        
-        # Calculate velocities
-        velocities = [0.0]
-        for i in range(1, len(distances)):
-            # Simple velocity profile - accelerate to max speed, maintain, then decelerate
-            if i < len(distances) / 3:
-                # Acceleration phase
-                velocities.append(min(velocities[-1] + max_acceleration, max_speed))
-            elif i > 2 * len(distances) / 3:
-                # Deceleration phase
-                velocities.append(max(velocities[-1] - max_acceleration, 0.0))
-            else:
-                # Constant speed phase
-                velocities.append(max_speed)
+        specs = self.robot_footprint(robot_id)
+        speeds = velocity_profile(
+            self._to_points(path),
+            specs['max_speed'],
+            specs['max_acceleration'],
+            specs['turning_radius']
+        )
+        for point, speed in zip(path, speeds.tolist()):
+            point['velocity'] = speed
+        return path
+    
+    def _path_points(
+        self,
+        path: List[tuple],
+        start: Dict,
+        goal: Dict,
+        robot_id: Optional[str],
+        any_angle: bool = False
+    ) -> np.ndarray:
+        """World points for a planned grid path
         
-        # Add velocities to path
-        for i in range(len(path)):
-            path[i]['velocity'] = float(velocities[i])
+        Grid paths are smoothed into a trajectory. Any-angle paths are
+        already straight segments and keep just their waypoints; the exact
+        start and goal replace the end cell centers when the adjoining
+        segments stay clear, and are joined to them otherwise.
+        """
+        if not any_angle:
+            return self._trajectory(self._cells_to_points(path, start, goal), robot_id)
+        points = self._cells_to_points(path)
+        if len(points) == 0:
+            return points
+        blocked = self._blocked_fn(robot_id)
+        step = self.map_data['map']['resolution'] / 4
+        start_point = np.array([start['x'], start['y']], dtype=np.float64)
+        goal_point = np.array([goal['x'], goal['y']], dtype=np.float64)
+        if len(points) > 1 and segment_clear(blocked, start_point, points[1], step):
+            points[0] = start_point
+        else:
+            points = np.vstack([start_point, points])
+        if segment_clear(blocked, points[-2], goal_point, step):
+            points[-1] = goal_point
+        else:
+            points = np.vstack([points, goal_point])
+        return points
+    
+    def _trajectory(self, points: np.ndarray, robot_id: Optional[str]) -> np.ndarray:
+        """Smoothed (N, 2) world path clear of the robot's configuration space"""
+        if len(points) < 3:
+            return points
+        return smooth_trajectory(
+            points,
+            self._blocked_fn(robot_id),
+            self.map_data['map']['resolution'],
+            self.robot_footprint(robot_id)['turning_radius']
+        )
+    
+    def _blocked_fn(self, robot_id: Optional[str]) -> BlockedFn:
+        """Vectorized test of world points against the robot's configuration space"""
+        if self.tiled_map is not None:
+            tiled = self.tiled_map
+            occupied = tiled.lookup(self._footprint_cells(robot_id, tiled.resolution))
+            resolution = tiled.resolution
+            return lambda xy: np.fromiter(
+                (occupied(int(y // resolution), int(x // resolution)) for x, y in xy.tolist()),
+                dtype=bool,
+                count=len(xy)
+            )
         
-        return path
+        space = self._get_configuration_space(robot_id)
+        cells = space.cells
+        rows, cols = space.shape
+        resolution = space.resolution
+        
+        def blocked(xy: np.ndarray) -> np.ndarray:
+            r = np.floor(xy[:, 1] / resolution).astype(np.int64)
+            c = np.floor(xy[:, 0] / resolution).astype(np.int64)
+            hits = (r < 0) | (c < 0) | (r >= rows) | (c >= cols)
+            inside = ~hits
+            hits[inside] = cells[r[inside], c[inside]] != 0
+            return hits
+        
+        return blocked
+    
+    def _cells_to_points(self, cells: List[tuple], start: Optional[Dict] = None, goal: Optional[Dict] = None) -> np.ndarray:
+        """Grid path to an (N, 2) array of world coordinates
+        
+        Cells map to their centers, so a diagonal step between two free
+        cells never crosses a third one; the ends are replaced by the exact
+        start and goal positions, which lie in the first and last cells.
+        """
+        resolution = self.map_data['map']['resolution']
+        points = (np.array(cells, dtype=np.float64).reshape(-1, 2)[:, ::-1] + 0.5) * resolution
+        if len(points):
+            if start is not None:
+                points[0] = (start['x'], start['y'])
+            if goal is not None:
+                points[-1] = (goal['x'], goal['y'])
+        return points
+    
+    def _to_points(self, path: List[Dict]) -> np.ndarray:
+        return np.array([[p['x'], p['y']] for p in path], dtype=np.float64).reshape(-1, 2)
+    
+    def _to_dicts(self, points: np.ndarray, speeds: Optional[np.ndarray] = None) -> List[Dict]:
+        """Convert an array path to API dicts"""
+        if speeds is None:
+            return [{'x': x, 'y': y} for x, y in points.tolist()]
+        return [
+            {'x': x, 'y': y, 'velocity': v}
+            for (x, y), v in zip(points.tolist(), speeds.tolist())
+        ]
     
     def _world_to_grid(self, position: Dict) -> tuple:
         """Convert world coordinates to grid coordinates"""
@@ -283,4 +1285,4 @@ class PathPlanningService:
         distance = np.sqrt(dx*dx + dy*dy)
         
         # Check if distance is less than sum of radii
-        return distance < (robot_radius_grid + obstacle_radius_grid) 
\ No newline at end of file
+        return bool(distance < (robot_radius_grid + obstacle_radius_grid)) 
\ No newline at end of file
@@ -0,0 +1,244 @@
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Improvements smaller than this (in cost units) are ignored, so floating
+# point noise cannot make the local search cycle
+MIN_GAIN = 1e-9
+# Longest run of consecutive stops moved at once by Or-opt
+OR_OPT_SEGMENT = 3
+# Stand-in for unreachable pairs inside the local search, where infinities
+# would turn move gains into NaN
+UNREACHABLE_COST = 1e12
+# Perturbations in a row that may fail to improve a route before the
+# iterated local search stops early
+MAX_STALE_KICKS = 100
+
+
+def _padded(cost: np.ndarray) -> np.ndarray:
+    """Cost matrix with an extra zero row/column standing for 'no stop'
+
+    An open route's last stop has no successor; indexing the pad instead
+    makes its outgoing edge free, so open and closed routes share the same
+    vectorized move evaluation.
+    """
+    n = cost.shape[0]
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = np.where(np.isfinite(cost), cost, UNREACHABLE_COST)
+    return padded
+
+
+def route_cost(cost: np.ndarray, route: Sequence[int], closed: bool = False) -> float:
+    """Length of a route under a cost matrix, optionally back to its start"""
+    route = list(route)
+    total = float(sum(cost[a, b] for a, b in zip(route, route[1:])))
+    if closed and len(route) > 1:
+        total += float(cost[route[-1], route[0]])
+    return total
+
+
+def two_opt(cost: np.ndarray, route: List[int], closed: bool = False, deadline: Optional[float] = None) -> List[int]:
+    """Reverse route sections while that shortens the route
+
+    The first stop stays in place. For each edge (a, b) the gains of all
+    reversals ending at a later edge (c, d) are evaluated at once with
+    NumPy; the best one is applied. ``cost`` must be symmetric.
+    """
+    padded = _padded(cost)
+    pad = cost.shape[0]
+    route = np.asarray(route, dtype=np.int64)
+    improved = True
+    while improved:
+        improved = False
+        n = len(route)
+        successor = np.append(route[1:], route[0] if closed else pad)
+        for i in range(n - 2):
+            if deadline is not None and time.monotonic() > deadline:
+                return route.tolist()
+            a = route[i]
+            b = route[i + 1]
+            c = route[i + 2:]
+            d = successor[i + 2:]
+            gain = padded[a, b] + padded[c, d] - padded[a, c] - padded[b, d]
+            j = int(np.argmax(gain))
+            if gain[j] > MIN_GAIN:
+                j += i + 2
+                route[i + 1:j + 1] = route[i + 1:j + 1][::-1].copy()
+                successor = np.append(route[1:], route[0] if closed else pad)
+                improved = True
+    return route.tolist()
+
+
+def or_opt(cost: np.ndarray, route: List[int], closed: bool = False, deadline: Optional[float] = None) -> List[int]:
+    """Move short runs of stops (either way round) to cheaper positions
+
+    Runs of 1 to ``OR_OPT_SEGMENT`` stops are cut out and reinserted
+    between any other two consecutive stops; the insertion costs of all
+    positions are evaluated at once. The first stop stays in place.
+    """
+    padded = _padded(cost)
+    pad = cost.shape[0]
+    route = list(route)
+    improved = True
+    while improved:
+        improved = False
+        for length in range(1, OR_OPT_SEGMENT + 1):
+            i = 1
+            while i + length <= len(route):
+                if deadline is not None and time.monotonic() > deadline:
+                    return route
+                segment = route[i:i + length]
+                rest = route[:i] + route[i + length:]
+                before = route[i - 1]
+                after = route[i + length] if i + length < len(route) else (route[0] if closed else pad)
+                removed = padded[before, segment[0]] + padded[segment[-1], after] - padded[before, after]
+                x = np.asarray(rest, dtype=np.int64)
+                y = np.append(x[1:], rest[0] if closed else pad)
+                forward = padded[x, segment[0]] + padded[segment[-1], y] - padded[x, y]
+                backward = padded[x, segment[-1]] + padded[segment[0], y] - padded[x, y]
+                # Putting the run back where it was is not a move
+                forward[i - 1] = backward[i - 1] = math.inf
+                k_forward = int(np.argmin(forward))
+                k_backward = int(np.argmin(backward))
+                if min(forward[k_forward], backward[k_backward]) < removed - MIN_GAIN:
+                    if forward[k_forward] <= backward[k_backward]:
+                        k, run = k_forward, segment
+                    else:
+                        k, run = k_backward, segment[::-1]
+                    route = rest[:k + 1] + run + rest[k + 1:]
+                    improved = True
+                else:
+                    i += 1
+    return route
+
+
+def _local_search(cost: np.ndarray, route: List[int], closed: bool, deadline: Optional[float]) -> List[int]:
+    """Alternate 2-opt and Or-opt until neither helps or time runs out"""
+    best = route_cost(cost, route, closed)
+    while deadline is None or time.monotonic() < deadline:
+        route = or_opt(cost, two_opt(cost, route, closed, deadline), closed, deadline)
+        current = route_cost(cost, route, closed)
+        if current > best - MIN_GAIN:
+            break
+        best = current
+    return route
+
+
+def _double_bridge(route: List[int], rng: np.random.Generator) -> List[int]:
+    """Swap two middle sections of a route, a move 2-opt cannot undo"""
+    cuts = np.sort(rng.choice(np.arange(1, len(route)), size=3, replace=False))
+    p1, p2, p3 = (int(c) for c in cuts)
+    return route[:p1] + route[p2:p3] + route[p1:p2] + route[p3:]
+
+
+def improve_route(
+    cost: np.ndarray,
+    route: List[int],
+    closed: bool = False,
+    deadline: Optional[float] = None,
+    seed: int = 0
+) -> List[int]:
+    """Local search to a 2-opt/Or-opt optimum, then iterated until the deadline
+
+    With a deadline, the remaining time is spent kicking the best route
+    with a double bridge and re-optimizing, keeping the result if it is
+    shorter; the search stops after ``MAX_STALE_KICKS`` kicks in a row fail.
+    The first stop stays in place.
+    """
+    if len(route) < 3:
+        return list(route)
+    route = _local_search(cost, list(route), closed, deadline)
+    if deadline is None or len(route) < 5:
+        return route
+    rng = np.random.default_rng(seed)
+    best = route_cost(cost, route, closed)
+    stale = 0
+    while stale < MAX_STALE_KICKS and time.monotonic() < deadline:
+        candidate = _local_search(cost, _double_bridge(route, rng), closed, deadline)
+        current = route_cost(cost, candidate, closed)
+        if current < best - MIN_GAIN:
+            route, best, stale = candidate, current, 0
+        else:
+            stale += 1
+    return route
+
+
+def plan_routes(
+    cost_of: Dict[str, np.ndarray],
+    starts: Dict[str, int],
+    targets: Sequence[int],
+    demands: Optional[Sequence[float]] = None,
+    capacities: Optional[Dict[str, float]] = None,
+    closed: bool = False,
+    time_budget: Optional[float] = None
+) -> Dict:
+    """Visiting orders for one or more robots over a set of targets
+
+    ``cost_of[robot]`` is the robot's travel cost matrix over all nodes,
+    with ``inf`` for unreachable pairs; ``starts[robot]`` is the node it
+    starts from. Targets are assigned by cheapest insertion across all
+    robots, largest detour first, without exceeding a robot's capacity
+    (``demands`` default to 1 per target). Each route is then improved by
+    2-opt and Or-opt (``improve_route``) within ``time_budget`` seconds,
+    shared evenly between the robots. Returns
+    'routes' (robot -> node list starting at its start node) and
+    'unassigned' targets.
+    """
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    robots = list(starts)
+    targets = list(targets)
+    demand = dict(zip(targets, demands)) if demands is not None else {t: 1.0 for t in targets}
+    capacities = capacities or {}
+    routes = {robot: [starts[robot]] for robot in robots}
+    load = {robot: 0.0 for robot in robots}
+    unassigned = []
+    pending = list(targets)
+
+    while pending:
+        cheapest = []
+        for t in pending:
+            options = []
+            for robot in robots:
+                if load[robot] + demand[t] > capacities.get(robot, math.inf):
+                    continue
+                cost = cost_of[robot]
+                x = np.asarray(routes[robot], dtype=np.int64)
+                if closed:
+                    y = np.append(x[1:], x[0])
+                    added = cost[x, t] + cost[t, y] - cost[x, y]
+                else:
+                    y = x[1:]
+                    added = np.append(cost[x[:-1], t] + cost[t, y] - cost[x[:-1], y], cost[x[-1], t])
+                with np.errstate(invalid='ignore'):
+                    added = np.where(np.isnan(added), math.inf, added)
+                k = int(np.argmin(added))
+                if math.isfinite(added[k]):
+                    options.append((float(added[k]), robot, k))
+            if not options:
+                cheapest.append((math.inf, t, None))
+                continue
+            options.sort(key=lambda option: option[0])
+            cheapest.append((options[0][0], t, options[0]))
+        # Place the target whose cheapest insertion is most expensive first,
+        # so far-off targets do not end up as long detours at the end
+        placeable = [entry for entry in cheapest if entry[2] is not None]
+        for _, t, option in cheapest:
+            if option is None:
+                unassigned.append(t)
+                pending.remove(t)
+        if not placeable:
+            break
+        _, t, (_, robot, k) = max(placeable, key=lambda entry: entry[0])
+        routes[robot].insert(k + 1, t)
+        load[robot] += demand[t]
+        pending.remove(t)
+
+    for i, robot in enumerate(robots):
+        route_deadline = None
+        if deadline is not None:
+            share = max(deadline - time.monotonic(), 0.0) / (len(robots) - i)
+            route_deadline = time.monotonic() + share
+        routes[robot] = improve_route(cost_of[robot], routes[robot], closed, route_deadline)
+    return {'routes': routes, 'unassigned': sorted(unassigned), 'load': load}
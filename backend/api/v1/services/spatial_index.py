@@ -0,0 +1,166 @@
+import math
+from heapq import heappush, heappop, nsmallest
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BUCKET_SIZE = 25.0  # meters
+
+BBox = Tuple[float, float, float, float]  # (x1, y1, x2, y2)
+
+
+def obstacle_geometry(obstacle: Dict) -> Tuple[BBox, Optional[Tuple[float, float, float]]]:
+    """Bounding box and, for circular obstacles, (x, y, radius)"""
+    if obstacle['type'] == 'point':
+        x, y, r = obstacle['x'], obstacle['y'], obstacle['radius']
+        return (x - r, y - r, x + r, y + r), (x, y, r)
+    return (
+        min(obstacle['x1'], obstacle['x2']), min(obstacle['y1'], obstacle['y2']),
+        max(obstacle['x1'], obstacle['x2']), max(obstacle['y1'], obstacle['y2'])
+    ), None
+
+
+def zone_geometry(zone: Dict) -> Tuple[BBox, None]:
+    area = zone['area']
+    return (area['x1'], area['y1'], area['x2'], area['y2']), None
+
+
+def station_geometry(station: Dict) -> Tuple[BBox, None]:
+    x, y = station['position']['x'], station['position']['y']
+    return (x, y, x, y), None
+
+
+def _bbox_distance(bbox: BBox, x: float, y: float) -> float:
+    dx = max(bbox[0] - x, 0.0, x - bbox[2])
+    dy = max(bbox[1] - y, 0.0, y - bbox[3])
+    return math.hypot(dx, dy)
+
+
+class SpatialIndex:
+    """Uniform bucket-grid index over map features
+
+    Each feature is registered in every bucket its bounding box overlaps,
+    so bounding-box, radius and nearest-neighbour queries only look at the
+    buckets around the query instead of scanning every feature.
+    """
+
+    def __init__(self, items: List[Dict], geometry, bucket_size: float = DEFAULT_BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.items = list(items)
+        self._geometry = [geometry(item) for item in self.items]
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+        for i, (bbox, _) in enumerate(self._geometry):
+            for key in self._bucket_range(bbox):
+                self._buckets.setdefault(key, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def query_bbox(self, bbox: BBox) -> List[Dict]:
+        """Features whose geometry intersects the box"""
+        x1, y1, x2, y2 = bbox
+        hits = []
+        for i in self._candidates(bbox):
+            box, circle = self._geometry[i]
+            if box[0] > x2 or box[2] < x1 or box[1] > y2 or box[3] < y1:
+                continue
+            if circle is not None:
+                cx = min(max(circle[0], x1), x2)
+                cy = min(max(circle[1], y1), y2)
+                if math.hypot(circle[0] - cx, circle[1] - cy) > circle[2]:
+                    continue
+            hits.append(i)
+        return [self.items[i] for i in hits]
+
+    def query_radius(self, x: float, y: float, radius: float) -> List[Dict]:
+        """Features within radius of a point, nearest first"""
+        bbox = (x - radius, y - radius, x + radius, y + radius)
+        hits = []
+        for i in self._candidates(bbox):
+            d = self.distance(i, x, y)
+            if d <= radius:
+                hits.append((d, i))
+        hits.sort()
+        return [self.items[i] for _, i in hits]
+
+    def containing(self, x: float, y: float) -> List[Dict]:
+        """Features whose geometry contains the point"""
+        return self.query_radius(x, y, 0.0)
+
+    def nearest(self, x: float, y: float, k: int = 1, max_distance: float = math.inf) -> List[Tuple[float, Dict]]:
+        """The k nearest features as (distance, feature), searching rings of buckets"""
+        if not self.items or k <= 0:
+            return []
+        bx, by = self._bucket_of(x, y)
+        seen = set()
+        found = []
+        ring = 0
+        max_ring = self._max_ring(bx, by)
+        while ring <= max_ring:
+            for key in self._ring(bx, by, ring):
+                for i in self._buckets.get(key, ()):
+                    if i not in seen:
+                        seen.add(i)
+                        d = self.distance(i, x, y)
+                        if d <= max_distance:
+                            heappush(found, (d, i))
+            # Everything not yet seen is at least `ring` buckets away
+            if len(found) >= k and nsmallest(k, found)[-1][0] <= ring * self.bucket_size:
+                break
+            if ring * self.bucket_size > max_distance:
+                break
+            ring += 1
+        result = []
+        while found and len(result) < k:
+            d, i = heappop(found)
+            result.append((d, self.items[i]))
+        return result
+
+    def distance(self, i: int, x: float, y: float) -> float:
+        """Distance from a point to feature i (0 inside it)"""
+        bbox, circle = self._geometry[i]
+        if circle is not None:
+            return max(math.hypot(x - circle[0], y - circle[1]) - circle[2], 0.0)
+        return _bbox_distance(bbox, x, y)
+
+    def _bucket_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.bucket_size)), int(math.floor(y / self.bucket_size))
+
+    def _bucket_range(self, bbox: BBox):
+        bx1, by1 = self._bucket_of(bbox[0], bbox[1])
+        bx2, by2 = self._bucket_of(bbox[2], bbox[3])
+        for bx in range(bx1, bx2 + 1):
+            for by in range(by1, by2 + 1):
+                yield bx, by
+
+    def _candidates(self, bbox: BBox) -> List[int]:
+        seen = set()
+        for key in self._bucket_range(bbox):
+            for i in self._buckets.get(key, ()):
+                if i not in seen:
+                    seen.add(i)
+        return sorted(seen)
+
+    def _ring(self, bx: int, by: int, ring: int):
+        if ring == 0:
+            yield bx, by
+            return
+        for dx in range(-ring, ring + 1):
+            yield bx + dx, by - ring
+            yield bx + dx, by + ring
+        for dy in range(-ring + 1, ring):
+            yield bx - ring, by + dy
+            yield bx + ring, by + dy
+
+    def _max_ring(self, bx: int, by: int) -> int:
+        if not self._buckets:
+            return 0
+        return max(max(abs(kx - bx), abs(ky - by)) for kx, ky in self._buckets)
+
+
+class MapIndex:
+    """Spatial indexes for the obstacles, zones and charging stations of a map"""
+
+    def __init__(self, map_data: Dict, version: str, bucket_size: float = DEFAULT_BUCKET_SIZE):
+        self.version = version
+        self.obstacles = SpatialIndex(map_data.get('obstacles', []), obstacle_geometry, bucket_size)
+        self.zones = SpatialIndex(map_data.get('zones', []), zone_geometry, bucket_size)
+        self.charging_stations = SpatialIndex(map_data.get('charging_stations', []), station_geometry, bucket_size)
@@ -0,0 +1,237 @@
+import json
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .configuration_space import inflate
+from .occupancy_grid import map_version, rasterize_obstacle
+
+TILE_INDEX_FILE = 'index.json'
+TILE_OFFSETS_FILE = 'offsets.npy'
+TILE_DATA_FILE = 'tiles.bin'
+DEFAULT_TILE_SIZE = 256
+DEFAULT_RESIDENT_TILES = int(os.getenv('PATH_PLANNING_RESIDENT_TILES', '64'))
+
+# Offsets of tiles that are not stored in the data file
+EMPTY_TILE = -1
+FULL_TILE = -2
+
+
+def _obstacle_cell_bounds(obstacle: Dict, resolution: float) -> Optional[Tuple[int, int, int, int]]:
+    """Inclusive (row_min, row_max, col_min, col_max) cells an obstacle can mark"""
+    if obstacle['type'] == 'rectangle':
+        return (
+            int(obstacle['y1'] / resolution), int(obstacle['y2'] / resolution),
+            int(obstacle['x1'] / resolution), int(obstacle['x2'] / resolution)
+        )
+    if obstacle['type'] == 'point':
+        x = int(obstacle['x'] / resolution)
+        y = int(obstacle['y'] / resolution)
+        radius = int(obstacle['radius'] / resolution)
+        return y - radius, y + radius, x - radius, x + radius
+    return None
+
+
+def write_tiled_map(path: str, map_data: Dict, tile_size: int = DEFAULT_TILE_SIZE) -> Dict:
+    """Rasterize a map tile by tile into a tiled on-disk map
+
+    Only one tile is held in memory at a time. Tiles with no obstacles or
+    fully covered by them are recorded in the offsets index and take no
+    space in the data file. Returns the index metadata.
+    """
+    resolution = map_data['map']['resolution']
+    rows = int(map_data['map']['height'] / resolution)
+    cols = int(map_data['map']['width'] / resolution)
+    tile_rows = -(-rows // tile_size)
+    tile_cols = -(-cols // tile_size)
+
+    # Bucket obstacles by the tiles they overlap
+    buckets = {}
+    for obstacle in map_data['obstacles']:
+        bounds = _obstacle_cell_bounds(obstacle, resolution)
+        if bounds is None:
+            continue
+        r0, r1, c0, c1 = bounds
+        for tr in range(max(r0 // tile_size, 0), min(r1 // tile_size, tile_rows - 1) + 1):
+            for tc in range(max(c0 // tile_size, 0), min(c1 // tile_size, tile_cols - 1) + 1):
+                buckets.setdefault((tr, tc), []).append(obstacle)
+
+    os.makedirs(path, exist_ok=True)
+    offsets = np.full((tile_rows, tile_cols), EMPTY_TILE, dtype=np.int64)
+    data_path = os.path.join(path, TILE_DATA_FILE)
+    stored = 0
+    with open(f"{data_path}.tmp", 'wb') as f:
+        for (tr, tc), obstacles in sorted(buckets.items()):
+            origin = (tr * tile_size, tc * tile_size)
+            tile = np.zeros((tile_size, tile_size), dtype=np.uint8)
+            for obstacle in obstacles:
+                rasterize_obstacle(tile, obstacle, resolution, origin)
+            # Cells past the map edge in the last row/column of tiles stay free
+            tile[rows - origin[0]:, :] = 0
+            tile[:, cols - origin[1]:] = 0
+            if not tile.any():
+                continue
+            if tile.all():
+                offsets[tr, tc] = FULL_TILE
+                continue
+            f.write(tile.tobytes())
+            offsets[tr, tc] = stored
+            stored += 1
+    os.replace(f"{data_path}.tmp", data_path)
+
+    meta = {
+        'version': map_version(map_data),
+        'shape': [rows, cols],
+        'resolution': resolution,
+        'tile_size': tile_size,
+        'stored_tiles': stored,
+        'map': map_data['map'],
+        'features': {
+            key: map_data.get(key, [])
+            for key in ('obstacles', 'zones', 'charging_stations', 'paths')
+        }
+    }
+    offsets_path = os.path.join(path, TILE_OFFSETS_FILE)
+    np.save(f"{offsets_path}.tmp.npy", offsets)
+    os.replace(f"{offsets_path}.tmp.npy", offsets_path)
+    index_path = os.path.join(path, TILE_INDEX_FILE)
+    with open(f"{index_path}.tmp", 'w') as f:
+        json.dump(meta, f)
+    os.replace(f"{index_path}.tmp", index_path)
+    return meta
+
+
+class TiledOccupancyMap:
+    """Occupancy map stored as fixed-size uint8 tiles in a memory-mapped file
+
+    Tiles are read on first access and kept in an LRU of at most
+    ``max_resident_tiles`` entries, so memory is bounded by the region a
+    search touches rather than the map size. Tiles inflated for a robot
+    footprint are built lazily from the tile and a halo of its neighbours
+    and share the same LRU.
+    """
+
+    def __init__(self, path: str, max_resident_tiles: int = DEFAULT_RESIDENT_TILES):
+        self.path = path
+        with open(os.path.join(path, TILE_INDEX_FILE)) as f:
+            self.meta = json.load(f)
+        self.version = self.meta['version']
+        self.shape = tuple(self.meta['shape'])
+        self.resolution = float(self.meta['resolution'])
+        self.tile_size = int(self.meta['tile_size'])
+        self.offsets = np.load(os.path.join(path, TILE_OFFSETS_FILE))
+        data_path = os.path.join(path, TILE_DATA_FILE)
+        self._data = np.memmap(data_path, dtype=np.uint8, mode='r') if os.path.getsize(data_path) else None
+        self.max_resident_tiles = max_resident_tiles
+        self._resident = OrderedDict()
+        self._empty = np.zeros((self.tile_size, self.tile_size), dtype=np.uint8)
+        self._full = np.ones((self.tile_size, self.tile_size), dtype=np.uint8)
+        self._empty.setflags(write=False)
+        self._full.setflags(write=False)
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0}
+
+    @staticmethod
+    def is_tiled_map(path: str) -> bool:
+        return os.path.isdir(path) and os.path.exists(os.path.join(path, TILE_INDEX_FILE))
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, TILE_INDEX_FILE)
+
+    @property
+    def resident_tiles(self) -> int:
+        return len(self._resident)
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(tile.nbytes for tile in self._resident.values())
+
+    def map_data(self) -> Dict:
+        """Map metadata and features in the map_data.json layout"""
+        return dict(self.meta['features'], map=self.meta['map'])
+
+    def tile(self, tr: int, tc: int, radius_cells: int = 0) -> np.ndarray:
+        """Read-only tile, optionally inflated by a footprint radius in cells"""
+        key = (radius_cells, tr, tc)
+        tile = self._resident.get(key)
+        if tile is not None:
+            self._resident.move_to_end(key)
+            self.stats['hits'] += 1
+            return tile
+
+        if radius_cells > 0:
+            tile = self._inflated_tile(tr, tc, radius_cells)
+        else:
+            tile = self._read_tile(tr, tc)
+        self.stats['loads'] += 1
+        if tile is not self._empty and tile is not self._full:
+            self._resident[key] = tile
+            while len(self._resident) > self.max_resident_tiles:
+                self._resident.popitem(last=False)
+                self.stats['evictions'] += 1
+        return tile
+
+    def lookup(self, radius_cells: int = 0) -> Callable[[int, int], bool]:
+        """Fast ``occupied(row, col)`` for searches; off-map cells are occupied"""
+        rows, cols = self.shape
+        size = self.tile_size
+        current = [None, None]
+
+        def occupied(r: int, c: int) -> bool:
+            if r < 0 or c < 0 or r >= rows or c >= cols:
+                return True
+            tr = r // size
+            tc = c // size
+            if current[0] != (tr, tc):
+                current[0] = (tr, tc)
+                current[1] = self.tile(tr, tc, radius_cells)
+            return current[1][r - tr * size, c - tc * size] != 0
+
+        return occupied
+
+    def window(self, r0: int, r1: int, c0: int, c1: int, radius_cells: int = 0) -> np.ndarray:
+        """Dense copy of cells [r0, r1) x [c0, c1); cells off the map are free"""
+        size = self.tile_size
+        out = np.zeros((r1 - r0, c1 - c0), dtype=np.uint8)
+        tile_rows, tile_cols = self.offsets.shape
+        for tr in range(max(r0 // size, 0), min((r1 - 1) // size, tile_rows - 1) + 1):
+            for tc in range(max(c0 // size, 0), min((c1 - 1) // size, tile_cols - 1) + 1):
+                tile = self.tile(tr, tc, radius_cells)
+                ar0 = max(r0, tr * size)
+                ar1 = min(r1, (tr + 1) * size)
+                ac0 = max(c0, tc * size)
+                ac1 = min(c1, (tc + 1) * size)
+                out[ar0 - r0:ar1 - r0, ac0 - c0:ac1 - c0] = \
+                    tile[ar0 - tr * size:ar1 - tr * size, ac0 - tc * size:ac1 - tc * size]
+        return out
+
+    def _read_tile(self, tr: int, tc: int) -> np.ndarray:
+        tile_rows, tile_cols = self.offsets.shape
+        if not (0 <= tr < tile_rows and 0 <= tc < tile_cols):
+            return self._empty
+        offset = int(self.offsets[tr, tc])
+        if offset == EMPTY_TILE:
+            return self._empty
+        if offset == FULL_TILE:
+            return self._full
+        n = self.tile_size * self.tile_size
+        tile = np.array(self._data[offset * n:(offset + 1) * n]).reshape(self.tile_size, self.tile_size)
+        tile.setflags(write=False)
+        return tile
+
+    def _inflated_tile(self, tr: int, tc: int, radius_cells: int) -> np.ndarray:
+        if radius_cells > self.tile_size:
+            raise ValueError("Footprint radius exceeds the map tile size")
+        size = self.tile_size
+        r0 = tr * size
+        c0 = tc * size
+        halo = self.window(r0 - radius_cells, r0 + size + radius_cells, c0 - radius_cells, c0 + size + radius_cells)
+        if not halo.any():
+            return self._empty
+        tile = inflate(halo, radius_cells)[radius_cells:radius_cells + size, radius_cells:radius_cells + size]
+        tile = np.ascontiguousarray(tile)
+        tile.setflags(write=False)
+        return tile
+
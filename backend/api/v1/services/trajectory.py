@@ -0,0 +1,195 @@
+import math
+from typing import Callable, Optional
+
+import numpy as np
+from scipy.interpolate import make_interp_spline
+
+# Maps an (M, 2) array of world points to an (M,) bool array, True where a
+# point is not traversable
+BlockedFn = Callable[[np.ndarray], np.ndarray]
+
+
+def arc_lengths(points: np.ndarray) -> np.ndarray:
+    """Cumulative distance along a polyline, starting at 0"""
+    s = np.zeros(len(points))
+    if len(points) > 1:
+        np.cumsum(np.hypot(*np.diff(points, axis=0).T), out=s[1:])
+    return s
+
+
+def curvature(points: np.ndarray) -> np.ndarray:
+    """Discrete (Menger) curvature at each point; 0 at the ends"""
+    kappa = np.zeros(len(points))
+    if len(points) < 3:
+        return kappa
+    a = points[:-2]
+    b = points[1:-1]
+    c = points[2:]
+    ab = b - a
+    bc = c - b
+    cross = np.abs(ab[:, 0] * bc[:, 1] - ab[:, 1] * bc[:, 0])
+    denom = np.hypot(*ab.T) * np.hypot(*bc.T) * np.hypot(*(c - a).T)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kappa[1:-1] = np.where(denom > 0, 2.0 * cross / denom, 0.0)
+    return kappa
+
+
+def resample(points: np.ndarray, spacing: float) -> np.ndarray:
+    """Points at (about) equal spacing along a polyline, keeping both ends"""
+    s = arc_lengths(points)
+    if len(points) < 2 or s[-1] == 0:
+        return points.copy()
+    count = max(int(math.ceil(s[-1] / spacing)), 1) + 1
+    targets = np.linspace(0.0, s[-1], count)
+    return np.column_stack([np.interp(targets, s, points[:, 0]), np.interp(targets, s, points[:, 1])])
+
+
+def segment_clear(blocked: BlockedFn, a: np.ndarray, b: np.ndarray, step: float) -> bool:
+    """Whether the straight segment a-b avoids blocked space, sampled every step"""
+    count = max(int(math.ceil(math.hypot(b[0] - a[0], b[1] - a[1]) / step)), 1) + 1
+    t = np.linspace(0.0, 1.0, count)[:, None]
+    return not blocked(a + t * (b - a)).any()
+
+
+def shortcut(points: np.ndarray, blocked: BlockedFn, step: float) -> np.ndarray:
+    """Drop waypoints that have line of sight past them
+
+    From each kept waypoint the farthest visible one is found by galloping
+    and then bisecting, so a path of N points needs O(log N) line-of-sight
+    checks per kept waypoint. Consecutive input points are always accepted,
+    which keeps the result valid even if the start lies in blocked space.
+    """
+    n = len(points)
+    if n < 3:
+        return points.copy()
+    keep = [0]
+    i = 0
+    while i < n - 1:
+        best = i + 1
+        failed = None
+        k = 1
+        while best < n - 1:
+            j = min(i + 2 ** k, n - 1)
+            if segment_clear(blocked, points[i], points[j], step):
+                best = j
+                k += 1
+            else:
+                failed = j
+                break
+        if failed is not None:
+            lo, hi = best, failed
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if segment_clear(blocked, points[i], points[mid], step):
+                    lo = mid
+                else:
+                    hi = mid
+            best = lo
+        keep.append(best)
+        i = best
+    return points[keep]
+
+
+def fit_spline(points: np.ndarray, spacing: float, turning_radius: float = 0.0) -> np.ndarray:
+    """Interpolating spline through waypoints, sampled densest where it bends
+
+    The spline is parameterized by chord length, which avoids the overshoot
+    of a uniform parameter on unevenly spaced waypoints. Samples are placed
+    at equal steps of ``ds * (1 + turning_radius * curvature)``, so tight
+    turns get proportionally more points. Endpoints are kept exactly.
+    """
+    if len(points) < 3:
+        return resample(points, spacing)
+    u = arc_lengths(points)
+    keep = np.concatenate([[True], np.diff(u) > 0])
+    points = points[keep]
+    u = u[keep]
+    if len(points) < 3:
+        return resample(points, spacing)
+    spline = make_interp_spline(u, points, k=min(3, len(points) - 1), axis=0)
+
+    fine = spline(np.linspace(0.0, u[-1], max(int(4 * u[-1] / spacing), 4 * len(points)) + 1))
+    kappa = curvature(fine)
+    ds = np.hypot(*np.diff(fine, axis=0).T)
+    weight = np.concatenate([[0.0], np.cumsum(ds * (1.0 + turning_radius * 0.5 * (kappa[1:] + kappa[:-1])))])
+    count = max(int(math.ceil(weight[-1] / spacing)), 1) + 1
+    targets = np.interp(np.linspace(0.0, weight[-1], count), weight, np.linspace(0.0, u[-1], len(fine)))
+    samples = spline(targets)
+    samples[0] = points[0]
+    samples[-1] = points[-1]
+    return samples
+
+
+def _collides(samples: np.ndarray, blocked: BlockedFn) -> bool:
+    hits = blocked(samples)
+    if hits.size and hits[0]:
+        # A start inside blocked space is allowed until the path leaves it
+        hits = hits[np.argmax(~hits):] if not hits.all() else hits[:0]
+    return bool(hits.any())
+
+
+def smooth_trajectory(
+    points: np.ndarray,
+    blocked: Optional[BlockedFn],
+    spacing: float,
+    turning_radius: float = 0.0
+) -> np.ndarray:
+    """Shortcut, then spline-fit a path, falling back to safer shapes
+
+    If the spline through the shortcut waypoints cuts into blocked space,
+    a spline through the full input is tried, then the resampled shortcut
+    polyline, and finally the shortcut waypoints themselves.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 2:
+        return points.copy()
+    if blocked is None:
+        return fit_spline(points, spacing, turning_radius)
+
+    waypoints = shortcut(points, blocked, spacing / 2)
+    for candidate in (waypoints, points):
+        samples = fit_spline(candidate, spacing, turning_radius)
+        if not _collides(samples, blocked):
+            return samples
+    samples = resample(waypoints, spacing)
+    if not _collides(samples, blocked):
+        return samples
+    return waypoints
+
+
+def velocity_profile(
+    points: np.ndarray,
+    max_speed: float,
+    max_acceleration: float,
+    turning_radius: float = 0.0,
+    start_speed: float = 0.0,
+    end_speed: float = 0.0
+) -> np.ndarray:
+    """Time-optimal speeds along a path under speed and acceleration limits
+
+    Each point is capped by ``max_speed`` and by the lateral acceleration
+    limit ``sqrt(max_acceleration / curvature)``; points bending tighter
+    than ``turning_radius`` are stopping points. The forward (acceleration)
+    and backward (braking) passes are the closed forms of the usual
+    recursions, ``v_i^2 = min_j (cap_j^2 +/- 2 a (s_i - s_j))``, computed
+    with running minima.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    if n == 0:
+        return np.zeros(0)
+    s = arc_lengths(points)
+    kappa = curvature(points)
+    cap = np.full(n, float(max_speed))
+    with np.errstate(divide='ignore'):
+        cap = np.minimum(cap, np.where(kappa > 0, np.sqrt(max_acceleration / kappa), np.inf))
+    if turning_radius > 0:
+        cap[kappa * turning_radius > 1.0 + 1e-9] = 0.0
+    cap[0] = min(cap[0], start_speed)
+    cap[-1] = min(cap[-1], end_speed)
+
+    cap2 = cap * cap
+    two_a = 2.0 * max_acceleration
+    forward = np.minimum.accumulate(cap2 - two_a * s) + two_a * s
+    backward = (np.minimum.accumulate((cap2 + two_a * s)[::-1]) - two_a * s[::-1])[::-1]
+    return np.sqrt(np.clip(np.minimum(forward, backward), 0.0, None))
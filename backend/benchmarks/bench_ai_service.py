@@ -0,0 +1,153 @@
+"""Benchmark per-row versus batched AIService growth and water scoring
+
+Forests are fitted on synthetic rows with the settings of
+``ai/train_models.py`` (100 trees, depth 10), so no trained model files are
+needed. Per-row scoring is timed on a sample of the rows and reported as
+throughput; batched scoring and NDJSON streaming run on all of them. A
+second table compares the latency of scikit-learn's ``predict``, the flat
+forest engine and the service pipeline (which picks between them) per
+batch size. Run from the backend directory:
+
+    python -m benchmarks.bench_ai_service --rows 10000
+    python -m benchmarks.bench_ai_service --batch-sizes 1,100,10000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from api.v1.services.ai_service import GROWTH_FEATURES, WATER_FEATURES, AIService
+from api.v1.services.flat_forest import FlatForest
+from api.v1.services.model_registry import ModelRegistry
+
+
+def fitted_service(features, seed: int = 0) -> AIService:
+    """AIService whose scaler and model are fitted for ``features`` rows"""
+    rng = np.random.default_rng(seed)
+    X = rng.random((2000, len(features)))
+    y = X @ rng.random(len(features)) + 0.1 * rng.standard_normal(len(X))
+    service = AIService(registry=ModelRegistry(None))
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42).fit(scaler.transform(X), y)
+    service.growth_model = service.water_model = model
+    service.growth_scaler = service.water_scaler = scaler
+    return service
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def bench_growth(rows: np.ndarray, sample: int) -> dict:
+    service = fitted_service(GROWTH_FEATURES)
+    data = [dict(zip(GROWTH_FEATURES, row)) for row in rows.tolist()]
+    t0 = time.perf_counter()
+    for row in data[:sample]:
+        service.predict_vegetation_growth(
+            "acacia",
+            {k: row[k] for k in ("ph", "moisture_content", "organic_matter")},
+            {k: row[k] for k in ("average_temperature", "average_rainfall")},
+            row["duration_days"]
+        )
+    per_row = time.perf_counter() - t0
+    return _compare(service, "growth", data, per_row, sample)
+
+
+def bench_water(rows: np.ndarray, sample: int) -> dict:
+    service = fitted_service(WATER_FEATURES)
+    data = [dict(zip(WATER_FEATURES, row)) for row in rows.tolist()]
+    t0 = time.perf_counter()
+    for row in data[:sample]:
+        service.optimize_water_usage(
+            1,
+            {k: row[k] for k in ("daily_usage", "soil_moisture")},
+            {k: row[k] for k in ("temperature", "humidity", "precipitation_probability")}
+        )
+    per_row = time.perf_counter() - t0
+    return _compare(service, "water", data, per_row, sample)
+
+
+def _compare(service: AIService, kind: str, data: list, per_row: float, sample: int) -> dict:
+    predict = service.predict_vegetation_growth_batch if kind == "growth" else service.optimize_water_usage_batch
+    t0 = time.perf_counter()
+    predict(data)
+    batched = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for row in service.stream_batch_predictions(kind, data):
+        json.dumps(row, separators=(',', ':'))
+    streamed = time.perf_counter() - t0
+    return {
+        'per_row': _rate(sample, per_row),
+        'batched': _rate(len(data), batched),
+        'streamed': _rate(len(data), streamed)
+    }
+
+
+def _latency(fn, X: np.ndarray, budget: float = 0.5) -> float:
+    """Median seconds per call, repeating for about ``budget`` seconds"""
+    fn(X)
+    times = []
+    start = time.perf_counter()
+    while not times or (time.perf_counter() - start < budget and len(times) < 200):
+        t0 = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def engine_latency(sizes, seed: int = 1) -> list:
+    """(batch size, sklearn, flat, pipeline) median latencies in seconds
+
+    The engines are given pre-scaled rows, as the pipeline hands them;
+    unscaled rows would take different, shorter paths through the trees.
+    """
+    service = fitted_service(GROWTH_FEATURES)
+    model = service.growth_model
+    flat = FlatForest.from_model(model)
+    pipeline = service.pipeline("growth")
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        X = rng.random((size, len(GROWTH_FEATURES)))
+        scaled = pipeline.transform(X.copy())
+        results.append((
+            size,
+            _latency(model.predict, scaled),
+            _latency(flat.predict, scaled),
+            _latency(lambda rows: pipeline.predict_matrix(rows.copy()), X)
+        ))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--per-row-sample', type=int, default=500, help='rows scored one call at a time')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--batch-sizes', default='1,10,100,1000,10000,100000', help='comma-separated batch sizes')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sample = min(args.per_row_sample, args.rows)
+    print(f"{'model':8s} {'per-row/s':>12s} {'batched/s':>12s} {'streamed/s':>12s} {'speedup':>8s}")
+    for name, bench, features in (('growth', bench_growth, GROWTH_FEATURES), ('water', bench_water, WATER_FEATURES)):
+        result = bench(rng.random((args.rows, len(features))), sample)
+        print(
+            f"{name:8s} {result['per_row']:12.0f} {result['batched']:12.0f} {result['streamed']:12.0f} "
+            f"{result['batched'] / result['per_row']:7.0f}x"
+        )
+
+    print()
+    print(f"{'batch':>8s} {'sklearn ms':>12s} {'flat ms':>12s} {'pipeline ms':>12s} {'speedup':>8s}")
+    for size, sklearn_s, flat_s, pipeline_s in engine_latency([int(v) for v in args.batch_sizes.split(',')], args.seed):
+        print(
+            f"{size:8d} {sklearn_s * 1e3:12.3f} {flat_s * 1e3:12.3f} {pipeline_s * 1e3:12.3f} "
+            f"{sklearn_s / pipeline_s:7.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
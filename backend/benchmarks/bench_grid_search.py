@@ -0,0 +1,129 @@
+"""Benchmark grid search engines on the shipped map
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_grid_search --map ../robotics/config/map_data.json
+"""
+import argparse
+import json
+import time
+from functools import partial
+from heapq import heappush, heappop
+from typing import List
+
+import numpy as np
+
+from api.v1.services.grid_search import JumpTable, SearchWorkspace, astar, jps, path_cost
+from api.v1.services.occupancy_grid import rasterize_map
+
+# (start, goal) pairs in world coordinates (meters)
+DEFAULT_QUERIES = [
+    ((10, 10), (40, 60)),
+    ((10, 10), (90, 250)),
+    ((0, 0), (250, 280)),
+    ((50, 450), (600, 480)),
+    ((20, 980), (980, 20)),
+]
+
+
+def legacy_astar(grid: np.ndarray, start: tuple, goal: tuple) -> List[tuple]:
+    """The original PathPlanningService._astar, kept as a baseline"""
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    neighbors = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+    close_set = set()
+    came_from = {}
+    gscore = {start: 0}
+    fscore = {start: heuristic(start, goal)}
+    oheap = []
+    heappush(oheap, (fscore[start], start))
+
+    while oheap:
+        current = heappop(oheap)[1]
+
+        if current == goal:
+            data = []
+            while current in came_from:
+                data.append(current)
+                current = came_from[current]
+            return data[::-1]
+
+        close_set.add(current)
+        for i, j in neighbors:
+            neighbor = current[0] + i, current[1] + j
+            tentative_g_score = gscore[current] + heuristic(current, neighbor)
+
+            if 0 <= neighbor[0] < grid.shape[0]:
+                if 0 <= neighbor[1] < grid.shape[1]:
+                    if grid[neighbor[0]][neighbor[1]] == 1:
+                        continue
+                else:
+                    continue
+            else:
+                continue
+
+            if neighbor in close_set and tentative_g_score >= gscore.get(neighbor, 0):
+                continue
+
+            if tentative_g_score < gscore.get(neighbor, 0) or neighbor not in [i[1] for i in oheap]:
+                came_from[neighbor] = current
+                gscore[neighbor] = tentative_g_score
+                fscore[neighbor] = tentative_g_score + heuristic(neighbor, goal)
+                heappush(oheap, (fscore[neighbor], neighbor))
+
+    return []
+
+
+def to_grid(point, resolution):
+    return (int(point[1] / resolution), int(point[0] / resolution))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--map', default='../robotics/config/map_data.json')
+    parser.add_argument(
+        '--legacy-max-cells',
+        type=int,
+        default=150,
+        help='Only run the legacy planner on queries shorter than this (grid cells)'
+    )
+    args = parser.parse_args()
+
+    with open(args.map) as f:
+        map_data = json.load(f)
+    resolution = map_data['map']['resolution']
+    grid = rasterize_map(map_data)
+    workspace = SearchWorkspace(grid.shape)
+
+    t0 = time.perf_counter()
+    jump_table = JumpTable(grid)
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"jump table: {elapsed:.1f} ms, {jump_table.nbytes / 1e6:.1f} MB (built once per map version)")
+    engines = (('astar', astar), ('jps', partial(jps, jump_table=jump_table)))
+
+    print(f"{'query':<28}{'engine':<10}{'ms':>10}{'expansions':>12}{'cells':>8}{'cost':>10}")
+    for start, goal in DEFAULT_QUERIES:
+        s = to_grid(start, resolution)
+        g = to_grid(goal, resolution)
+        label = f"{start}->{goal}"
+
+        for name, engine in engines:
+            t0 = time.perf_counter()
+            result = engine(grid, s, g, workspace=workspace)
+            elapsed = (time.perf_counter() - t0) * 1000
+            print(
+                f"{label:<28}{name:<10}{elapsed:>10.1f}{result.expansions:>12}"
+                f"{len(result.path):>8}{result.cost:>10.1f}"
+            )
+
+        if max(abs(s[0] - g[0]), abs(s[1] - g[1])) <= args.legacy_max_cells:
+            t0 = time.perf_counter()
+            path = legacy_astar(grid, s, g)
+            elapsed = (time.perf_counter() - t0) * 1000
+            print(f"{label:<28}{'legacy':<10}{elapsed:>10.1f}{'-':>12}{len(path):>8}{path_cost(path):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
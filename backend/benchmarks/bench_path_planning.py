@@ -0,0 +1,328 @@
+"""Benchmark PathPlanningService planning modes on synthetic maps
+
+Maps are generated from a seed, so every run of a scenario plans the same
+queries on the same obstacles. For each planning mode the harness reports
+p50/p99 latency, search expansions, peak traced memory and path cost, and
+compares them against stored baselines. Run from the backend directory:
+
+    python -m benchmarks.bench_path_planning --scenario small
+    python -m benchmarks.bench_path_planning --scenario medium --save-baseline
+
+Latency and memory baselines are machine specific; expansions and cost are
+deterministic and flag behaviour changes on any machine.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from api.v1.services.path_cache import PathQueryCache
+from api.v1.services.path_planning import PathPlanningService
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'path_planning.json')
+
+# name -> (map width and height in meters, resolution, obstacle density, queries)
+SCENARIOS = {
+    'small': (100, 0.5, 0.10, 40),
+    'medium': (400, 0.5, 0.15, 20),
+    'large': (1000, 0.5, 0.20, 10),
+}
+# Queries run by the slow kinematic planner, at most
+HYBRID_MAX_QUERIES = 5
+# Requests per call for the batch and coordinated modes
+BATCH_SIZE = 8
+
+# Regression thresholds: ratios against the baseline
+LATENCY_TOLERANCE = 1.5
+MEMORY_TOLERANCE = 1.25
+
+
+def synthetic_map(size: float, resolution: float, density: float, seed: int = 0, stations: int = 4) -> Dict:
+    """Desert-like map: rock discs and building rectangles covering ``density``
+
+    Obstacles are drawn until their summed area (overlaps counted twice)
+    reaches ``density`` of the map; about a third of it is rectangles.
+    Charging stations are placed on cells no obstacle covers.
+    """
+    rng = np.random.default_rng(seed)
+    obstacles = []
+    covered = 0.0
+    target = density * size * size
+    while covered < target:
+        if rng.random() < 0.35:
+            w, h = rng.uniform(2.0, 15.0, 2)
+            x, y = rng.uniform(0, size - w), rng.uniform(0, size - h)
+            obstacles.append({'type': 'rectangle', 'x1': round(x, 2), 'y1': round(y, 2), 'x2': round(x + w, 2), 'y2': round(y + h, 2)})
+            covered += w * h
+        else:
+            radius = rng.uniform(0.5, 2.5)
+            x, y = rng.uniform(0, size, 2)
+            obstacles.append({'type': 'point', 'x': round(x, 2), 'y': round(y, 2), 'radius': round(radius, 2)})
+            covered += math.pi * radius * radius
+    map_data = {
+        'map': {'width': size, 'height': size, 'resolution': resolution, 'origin': {'x': 0, 'y': 0}},
+        'obstacles': obstacles,
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+    map_data['charging_stations'] = [
+        {'id': f'station_{i + 1}', 'position': position}
+        for i, position in enumerate(_free_positions(map_data, stations, rng))
+    ]
+    return map_data
+
+
+def _free_positions(map_data: Dict, count: int, rng: np.random.Generator, clearance: float = 3.0) -> List[Dict]:
+    size = map_data['map']['width']
+    positions = []
+    while len(positions) < count:
+        x, y = rng.uniform(clearance, size - clearance, 2)
+        if not any(_near(obstacle, x, y, clearance) for obstacle in map_data['obstacles']):
+            positions.append({'x': round(float(x), 2), 'y': round(float(y), 2)})
+    return positions
+
+
+def _near(obstacle: Dict, x: float, y: float, clearance: float) -> bool:
+    if obstacle['type'] == 'rectangle':
+        return (obstacle['x1'] - clearance <= x <= obstacle['x2'] + clearance and
+                obstacle['y1'] - clearance <= y <= obstacle['y2'] + clearance)
+    return math.hypot(x - obstacle['x'], y - obstacle['y']) <= obstacle['radius'] + clearance
+
+
+def query_set(service: PathPlanningService, robot_id: str, count: int, seed: int = 1) -> List[Tuple[Dict, Dict]]:
+    """Start/goal pairs on free configuration space cells, at least a quarter map apart"""
+    rng = np.random.default_rng(seed)
+    cells = service._get_configuration_space(robot_id).cells
+    resolution = service.map_data['map']['resolution']
+    free = np.argwhere(cells == 0)
+    min_distance = 0.25 * max(cells.shape) * resolution
+    queries = []
+    while len(queries) < count:
+        (r0, c0), (r1, c1) = free[rng.integers(len(free), size=2)]
+        start = {'x': (c0 + 0.5) * resolution, 'y': (r0 + 0.5) * resolution}
+        goal = {'x': (c1 + 0.5) * resolution, 'y': (r1 + 0.5) * resolution}
+        if math.hypot(goal['x'] - start['x'], goal['y'] - start['y']) >= min_distance:
+            queries.append((start, goal))
+    return queries
+
+
+def path_length(path: List[Dict]) -> float:
+    return float(sum(math.hypot(b['x'] - a['x'], b['y'] - a['y']) for a, b in zip(path, path[1:])))
+
+
+def _single(algorithm: str, any_angle: bool = False) -> Callable:
+    def run(service, robot_id, queries):
+        samples = []
+        for start, goal in queries:
+            t0 = time.perf_counter()
+            path = service.plan_path(start, goal, robot_id, algorithm=algorithm, any_angle=any_angle)
+            elapsed = time.perf_counter() - t0
+            samples.append((elapsed, service.last_search.expansions, path_length(path) if path else None))
+        return samples
+    return run
+
+
+def _batch(service, robot_id, queries):
+    samples = []
+    for i in range(0, len(queries), BATCH_SIZE):
+        chunk = [{'robot_id': robot_id, 'start': s, 'goal': g} for s, g in queries[i:i + BATCH_SIZE]]
+        t0 = time.perf_counter()
+        results = service.plan_paths(chunk, algorithm='jps', workers=1)
+        elapsed = time.perf_counter() - t0
+        found = [r['cost'] for r in results if r['cost'] is not None]
+        samples.append((elapsed, sum(r['expansions'] for r in results), sum(found) if found else None))
+    return samples
+
+
+def _charger(service, robot_id, queries):
+    samples = []
+    for start, _ in queries:
+        t0 = time.perf_counter()
+        route = service.route_to_nearest_charger(start, robot_id)
+        elapsed = time.perf_counter() - t0
+        samples.append((elapsed, service.last_search.expansions, route['distance']))
+    return samples
+
+
+def _coordinated(service, robot_id, queries):
+    samples = []
+    for i in range(0, len(queries), BATCH_SIZE):
+        chunk = [
+            {'robot_id': f'{robot_id}_{j}', 'start': s, 'goal': g}
+            for j, (s, g) in enumerate(queries[i:i + BATCH_SIZE])
+        ]
+        t0 = time.perf_counter()
+        routes = service.plan_coordinated(chunk, start_time=0.0)
+        elapsed = time.perf_counter() - t0
+        for request in chunk:
+            try:
+                service.release_reservations(request['robot_id'])
+            except KeyError:
+                pass
+        lengths = [path_length(route['path']) for route in routes if route['path']]
+        samples.append((elapsed, None, sum(lengths) if lengths else None))
+    return samples
+
+
+def _cached(service, robot_id, queries):
+    for start, goal in queries:
+        service.plan_path(start, goal, robot_id)
+    # Hits run no search, so there are no expansions to report
+    return [(elapsed, None, cost) for elapsed, _, cost in _single('astar')(service, robot_id, queries)]
+
+
+# mode -> (runner, uses the path cache, query limit)
+MODES = {
+    'astar': (_single('astar'), False, None),
+    'jps': (_single('jps'), False, None),
+    'hpa': (_single('hpa'), False, None),
+    'theta': (_single('theta'), False, None),
+    'jps_any_angle': (_single('jps', any_angle=True), False, None),
+    'hybrid_astar': (_single('hybrid_astar'), False, HYBRID_MAX_QUERIES),
+    'batch_jps': (_batch, False, None),
+    'charger': (_charger, False, None),
+    'coordinated': (_coordinated, False, None),
+    'cached_astar': (_cached, True, None),
+}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else math.nan
+
+
+def run_mode(service: PathPlanningService, mode: str, robot_id: str, queries: List[Tuple[Dict, Dict]]) -> Dict:
+    """Latency percentiles, expansions, peak memory and cost of one mode
+
+    Latency comes from an untraced pass; peak memory is the tracemalloc
+    peak of a second pass over the first query (or batch), after a warm-up
+    pass has built every per-map structure the mode uses.
+    """
+    runner, cached, limit = MODES[mode]
+    queries = queries[:limit] if limit else queries
+    service.path_cache = PathQueryCache(max_entries=1024 if cached else 0)
+    runner(service, robot_id, queries[:1])
+
+    samples = runner(service, robot_id, queries)
+    latencies = [elapsed * 1000 for elapsed, _, _ in samples]
+    expansions = [e for _, e, _ in samples if e is not None]
+    costs = [c for _, _, c in samples if c is not None]
+
+    first = queries[:BATCH_SIZE] if mode in ('batch_jps', 'coordinated') else queries[:1]
+    tracemalloc.start()
+    runner(service, robot_id, first)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'samples': len(samples),
+        'p50_ms': round(_percentile(latencies, 50), 3),
+        'p99_ms': round(_percentile(latencies, 99), 3),
+        'expansions': int(sum(expansions)) if expansions else None,
+        'peak_kb': round(peak / 1024, 1),
+        'cost': round(sum(costs), 3) if costs else None,
+        'found': len(costs)
+    }
+
+
+def run_scenario(
+    name: str,
+    modes: List[str],
+    robot_id: str = 'robot1',
+    seed: int = 0,
+    scenario: Optional[Tuple[float, float, float, int]] = None
+) -> Dict:
+    """Build the scenario's map and service, then run every requested mode"""
+    size, resolution, density, count = scenario or SCENARIOS[name]
+    map_data = synthetic_map(size, resolution, density, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        map_path = os.path.join(tmp, 'map_data.json')
+        with open(map_path, 'w') as f:
+            json.dump(map_data, f)
+        t0 = time.perf_counter()
+        service = PathPlanningService(map_path=map_path, robot_config_path=os.path.join(tmp, 'robot_config.json'))
+        queries = query_set(service, robot_id, count, seed + 1)
+        setup_ms = (time.perf_counter() - t0) * 1000
+        service.batch_workers = 1
+        results = {'setup_ms': round(setup_ms, 1), 'obstacles': len(map_data['obstacles']), 'modes': {}}
+        for mode in modes:
+            results['modes'][mode] = run_mode(service, mode, robot_id, queries)
+    return results
+
+
+def compare(results: Dict, baseline: Dict) -> List[str]:
+    """Regressions of a scenario's results against its baseline"""
+    problems = []
+    for mode, current in results['modes'].items():
+        base = baseline.get('modes', {}).get(mode)
+        if base is None:
+            continue
+        if current['p50_ms'] > base['p50_ms'] * LATENCY_TOLERANCE:
+            problems.append(f"{mode}: p50 {current['p50_ms']:.2f} ms vs baseline {base['p50_ms']:.2f} ms")
+        if current['peak_kb'] > base['peak_kb'] * MEMORY_TOLERANCE:
+            problems.append(f"{mode}: peak memory {current['peak_kb']:.0f} KB vs baseline {base['peak_kb']:.0f} KB")
+        for field in ('expansions', 'cost'):
+            if base.get(field) is not None and current[field] is not None and current[field] > base[field] * 1.001:
+                problems.append(f"{mode}: {field} {current[field]} vs baseline {base[field]}")
+        if current['found'] < base['found']:
+            problems.append(f"{mode}: {current['found']} paths found vs baseline {base['found']}")
+    return problems
+
+
+def print_results(name: str, results: Dict) -> None:
+    print(f"scenario {name}: {results['obstacles']} obstacles, setup {results['setup_ms']:.0f} ms")
+    print(f"{'mode':<16}{'n':>4}{'p50 ms':>10}{'p99 ms':>10}{'expansions':>12}{'peak KB':>10}{'cost m':>12}{'found':>7}")
+    for mode, r in results['modes'].items():
+        expansions = '-' if r['expansions'] is None else r['expansions']
+        cost = '-' if r['cost'] is None else f"{r['cost']:.1f}"
+        print(
+            f"{mode:<16}{r['samples']:>4}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{expansions:>12}"
+            f"{r['peak_kb']:>10.0f}{cost:>12}{r['found']:>7}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append')
+    parser.add_argument('--mode', choices=list(MODES), action='append', help='default: all modes')
+    parser.add_argument('--robot', default='robot1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    problems = []
+    for name in args.scenario or ['small']:
+        results = run_scenario(name, args.mode or list(MODES), args.robot, args.seed)
+        print_results(name, results)
+        if args.save_baseline:
+            baselines[name] = results
+        elif name in baselines:
+            problems.extend(f"{name}/{problem}" for problem in compare(results, baselines[name]))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"baseline written to {args.baseline}")
+    elif problems:
+        print("regressions against baseline:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,7 +8,8 @@ from api.v1.endpoints import (
     irrigation,
     analytics,
     robotics,
-    path_planning
+    path_planning,
+    ai_predictions
 )
 
 app = FastAPI(
@@ -35,6 +36,7 @@ app.include_router(irrigation.router, prefix="/api/v1", tags=["Irrigation"])
 app.include_router(analytics.router, prefix="/api/v1", tags=["Analytics"])
 app.include_router(robotics.router, prefix="/api/v1", tags=["Robotics"])
 app.include_router(path_planning.router, prefix="/api/v1", tags=["Path Planning"])
+app.include_router(ai_predictions.router, prefix="/api/v1", tags=["AI Predictions"])
 
 @app.get("/")
 async def root():
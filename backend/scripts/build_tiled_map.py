@@ -0,0 +1,27 @@
+import argparse
+import json
+import logging
+
+from api.v1.services.tiled_map import DEFAULT_TILE_SIZE, write_tiled_map
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert map_data.json into a tiled on-disk map")
+    parser.add_argument('map', help="path to a map_data.json file")
+    parser.add_argument('output', help="directory to write the tiled map to")
+    parser.add_argument('--tile-size', type=int, default=DEFAULT_TILE_SIZE)
+    args = parser.parse_args()
+
+    with open(args.map) as f:
+        map_data = json.load(f)
+    logger.info("Writing tiled map to %s", args.output)
+    meta = write_tiled_map(args.output, map_data, args.tile_size)
+    logger.info(
+        "Wrote %d stored tiles for a %dx%d grid (version %s)",
+        meta['stored_tiles'], meta['shape'][0], meta['shape'][1], meta['version']
+    )
+
+if __name__ == "__main__":
+    main()
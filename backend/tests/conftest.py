@@ -0,0 +1,19 @@
+import json
+import pytest
+
+@pytest.fixture
+def map_data():
+    # 60 x 40 m map with one wall; modules override this for other layouts
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [{'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30}],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+@pytest.fixture
+def map_file(tmp_path, map_data):
+    path = tmp_path / 'map_data.json'
+    path.write_text(json.dumps(map_data))
+    return path
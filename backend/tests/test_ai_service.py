@@ -0,0 +1,155 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from api.v1.endpoints import ai_predictions
+from api.v1.schemas.ai import BatchPredictionRequest
+from api.v1.services.ai_service import GROWTH_FEATURES, WATER_FEATURES, AIService, parse_quanta
+from api.v1.services.model_registry import ModelRegistry
+
+@pytest.fixture
+def service():
+    # Small forests fitted on random rows stand in for the trained models
+    rng = np.random.default_rng(0)
+    service = AIService(registry=ModelRegistry(None))
+    growth = rng.random((200, len(GROWTH_FEATURES)))
+    water = rng.random((200, len(WATER_FEATURES)))
+    service.growth_scaler = StandardScaler().fit(growth)
+    service.growth_model = RandomForestRegressor(n_estimators=5, random_state=0).fit(growth, growth.sum(axis=1))
+    service.water_model = RandomForestRegressor(n_estimators=5, random_state=0).fit(water, water[:, 0] * 0.8)
+    service.water_scaler = StandardScaler().fit(water)
+    return service
+
+def _growth_rows(count):
+    rng = np.random.default_rng(1)
+    return [dict(zip(GROWTH_FEATURES, values)) for values in rng.random((count, len(GROWTH_FEATURES))).tolist()]
+
+def test_growth_batch_matches_single_predictions(service):
+    # Test that one batched pass agrees with per-row calls for every input form
+    rows = _growth_rows(20)
+    single = [
+        service.predict_vegetation_growth(
+            "acacia",
+            {k: row[k] for k in ("ph", "moisture_content", "organic_matter")},
+            {k: row[k] for k in ("average_temperature", "average_rainfall")},
+            row["duration_days"]
+        )["predicted_growth_rate"]
+        for row in rows
+    ]
+    columns = {name: [row[name] for row in rows] for name in GROWTH_FEATURES}
+    values = [[row[name] for name in GROWTH_FEATURES] for row in rows]
+    for data in (rows, columns, values, np.array(values)):
+        result = service.predict_vegetation_growth_batch(data)
+        assert np.allclose(result["predicted_growth_rate"], single)
+        assert np.allclose(result["confidence_high"], np.array(single) * 1.1)
+
+    assert len(service.predict_vegetation_growth_batch([])["predicted_growth_rate"]) == 0
+    with pytest.raises(ValueError):
+        service.predict_vegetation_growth_batch({"ph": [7.0]})
+    with pytest.raises(ValueError):
+        service.predict_vegetation_growth_batch(dict(columns, ph=[7.0]))
+
+def test_stream_batch_predictions_in_chunks(service):
+    # Test that chunked streaming yields every row, in order, with its index
+    rows = _growth_rows(25)
+    batch = service.predict_vegetation_growth_batch(rows)
+    streamed = list(service.stream_batch_predictions("growth", rows, chunk_rows=7))
+    assert [row["index"] for row in streamed] == list(range(25))
+    assert np.allclose([row["predicted_growth_rate"] for row in streamed], batch["predicted_growth_rate"])
+
+    water = {name: [0.5, 0.25] for name in WATER_FEATURES}
+    streamed = list(service.stream_batch_predictions("water", water))
+    assert [row["savings_potential"] for row in streamed] == pytest.approx(
+        [usage - row["recommended_daily_usage"] for usage, row in zip(water["daily_usage"], streamed)]
+    )
+    with pytest.raises(ValueError):
+        service.stream_batch_predictions("yield", rows)
+
+def test_batch_endpoint_streams_ndjson(service, monkeypatch):
+    # Test the NDJSON response and the payload checks of the batch endpoint
+    monkeypatch.setattr(ai_predictions, "ai_service", service)
+    rows = _growth_rows(10)
+
+    async def collect(response):
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    response = asyncio.run(ai_predictions.predict_growth_batch(BatchPredictionRequest(rows=rows), chunk_rows=4))
+    assert response.media_type == "application/x-ndjson"
+    lines = asyncio.run(collect(response)).decode().splitlines()
+    assert [json.loads(line)["index"] for line in lines] == list(range(10))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(ai_predictions.optimize_water_batch(BatchPredictionRequest(rows=rows, values=[[1.0] * 5])))
+    assert error.value.status_code == 400
+
+def test_pipeline_matches_sklearn_and_follows_artifacts(service):
+    # Test the fused scale + predict against sklearn, recompiling on a new scaler
+    rows = np.random.default_rng(2).random((30, len(GROWTH_FEATURES))) * 10
+    expected = service.growth_model.predict(service.growth_scaler.transform(rows))
+    pipeline = service.pipeline("growth")
+    assert np.allclose(pipeline.predict(rows), expected)
+    assert service.pipeline("growth") is pipeline
+
+    service.growth_scaler = StandardScaler(with_mean=False).fit(rows)
+    assert service.pipeline("growth") is not pipeline
+    expected = service.growth_model.predict(service.growth_scaler.transform(rows))
+    assert np.allclose(service.predict_vegetation_growth_batch(rows)["predicted_growth_rate"], expected)
+
+    # A scaler fitted to the other model's inputs is rejected, not misapplied
+    service.water_scaler = service.growth_scaler
+    with pytest.raises(ValueError):
+        service.optimize_water_usage_batch({name: [0.5] for name in WATER_FEATURES})
+
+SOIL = {"ph": 7.013, "moisture_content": 0.2, "organic_matter": 0.05}
+CLIMATE = {"average_temperature": 30.0, "average_rainfall": 12.0}
+
+def test_single_predictions_are_memoized(service, monkeypatch):
+    # Test quantized hits, exact savings, metrics and invalidation when a model is replaced
+    first = service.predict_vegetation_growth("acacia", SOIL, CLIMATE, 90)
+    near = service.predict_vegetation_growth("acacia", dict(SOIL, ph=7.017), CLIMATE, 90)
+    service.predict_vegetation_growth("acacia", dict(SOIL, ph=7.5), CLIMATE, 90)
+    assert near == first
+    metrics = service.prediction_cache_metrics()["growth"]
+    assert (metrics["hits"], metrics["misses"], metrics["size"]) == (1, 2, 2)
+
+    usage = {"daily_usage": 0.55, "soil_moisture": 0.3}
+    forecast = {"temperature": 0.4, "humidity": 0.6, "precipitation_probability": 0.1}
+    water = service.optimize_water_usage(1, usage, forecast)
+    again = service.optimize_water_usage(1, dict(usage, daily_usage=0.53), forecast)
+    assert again["recommended_daily_usage"] == water["recommended_daily_usage"]
+    assert again["savings_potential"] == pytest.approx(0.53 - water["recommended_daily_usage"])
+
+    service.growth_model = RandomForestRegressor(n_estimators=2, random_state=0).fit(
+        np.random.default_rng(3).random((50, len(GROWTH_FEATURES))), np.full(50, 0.125)
+    )
+    assert service.predict_vegetation_growth("acacia", SOIL, CLIMATE, 90)["predicted_growth_rate"] == 0.125
+    metrics = service.prediction_cache_metrics()["growth"]
+    assert metrics["invalidations"] == 1 and metrics["size"] == 1
+
+    monkeypatch.setattr(ai_predictions, "ai_service", service)
+    cleared = asyncio.run(ai_predictions.clear_prediction_cache())
+    assert cleared["growth"]["size"] == 0 and cleared["water"]["size"] == 0
+
+def test_climate_impact_exact_and_configurable_quanta(service):
+    # Test that climate impacts are computed per project and per-feature quantum overrides
+    project = {"water_requirements": 1.0, "maintenance_costs": 1.2, "carbon_sequestration": 3.0}
+    first = service.predict_climate_impact(project, "severe")
+    second = service.predict_climate_impact(dict(project, maintenance_costs=1.2004), "severe")
+    assert first["impacts"]["maintenance_costs"] == pytest.approx(1.2 * 1.3)
+    assert second["impacts"]["maintenance_costs"] == pytest.approx(1.2004 * 1.3)
+    assert "climate" not in service.prediction_cache_metrics()
+    with pytest.raises(KeyError):
+        service.predict_climate_impact(project, "extreme")
+
+    exact = AIService(registry=ModelRegistry(None), prediction_quanta={"ph": 0})
+    exact.growth_model, exact.growth_scaler = service.growth_model, service.growth_scaler
+    exact.predict_vegetation_growth("acacia", SOIL, CLIMATE, 90)
+    exact.predict_vegetation_growth("acacia", dict(SOIL, ph=7.017), CLIMATE, 90)
+    assert exact.prediction_cache_metrics()["growth"]["misses"] == 2
+
+    assert parse_quanta("ph=0.05, humidity=0.02") == {"ph": 0.05, "humidity": 0.02}
+    with pytest.raises(ValueError):
+        parse_quanta("ph=fine")
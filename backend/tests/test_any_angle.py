@@ -0,0 +1,134 @@
+import math
+import numpy as np
+import pytest
+from api.v1.services import grid_search
+from api.v1.services.grid_search import astar, flat_cells, line_of_sight, prune_path, theta_star
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'rectangle', 'x1': 38, 'y1': 10, 'x2': 40, 'y2': 40}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def segment_cells(a, b, samples=400):
+    # Cells under densely sampled points of the segment between cell centers
+    t = np.linspace(0, 1, samples)[:, None]
+    points = np.asarray(a) + 0.5 + t * (np.asarray(b) - np.asarray(a))
+    return {tuple(cell) for cell in np.floor(points).astype(int)}
+
+def test_line_of_sight_matches_sampling():
+    # Test exact line-of-sight against dense sampling of the segment
+    rng = np.random.default_rng(3)
+    grid = (rng.random((30, 30)) < 0.2).astype(np.uint8)
+    cells = flat_cells(grid)
+    for _ in range(300):
+        a, b = (tuple(cell) for cell in rng.integers(30, size=(2, 2)))
+        crossed = segment_cells(a, b) - {a}
+        if line_of_sight(cells, 30, a, b):
+            assert not any(grid[cell] for cell in crossed)
+
+def test_line_of_sight_through_corners():
+    # Test that a segment through a corner is only blocked by a diagonal wall
+    grid = np.zeros((3, 3), dtype=np.uint8)
+    grid[0, 1] = 1
+    cells = flat_cells(grid)
+
+    assert line_of_sight(cells, 3, (0, 0), (2, 2))
+    grid[1, 0] = 1
+    assert not line_of_sight(flat_cells(grid), 3, (0, 0), (2, 2))
+    assert not line_of_sight(flat_cells(grid), 3, (0, 0), (0, 2))
+
+def test_theta_star_shorter_than_grid_paths():
+    # Test that any-angle paths are clear, short and only a few waypoints
+    rng = np.random.default_rng(5)
+    grid = (rng.random((60, 60)) < 0.2).astype(np.uint8)
+    free = np.argwhere(grid == 0)
+    for _ in range(10):
+        start, goal = (tuple(free[i]) for i in rng.integers(len(free), size=2))
+        expected = astar(grid, start, goal)
+        result = theta_star(grid, start, goal)
+        assert result.status == expected.status
+        if not expected.found:
+            continue
+        assert result.cost <= expected.cost + 1e-9
+        assert result.cost >= math.hypot(start[0] - goal[0], start[1] - goal[1]) - 1e-9
+        assert result.path[0] == start and result.path[-1] == goal
+        assert len(result.path) <= len(expected.path)
+        for a, b in zip(result.path, result.path[1:]):
+            if max(abs(a[0] - b[0]), abs(a[1] - b[1])) > 1:
+                assert not any(grid[cell] for cell in segment_cells(a, b))
+
+def test_prune_path_keeps_line_of_sight():
+    # Test that pruning an A* path keeps its ends and needs few waypoints
+    grid = np.zeros((50, 50), dtype=np.uint8)
+    grid[10:50, 20:24] = 1
+    path = astar(grid, (45, 5), (45, 45)).path
+
+    pruned = prune_path(grid, path)
+
+    assert pruned[0] == path[0] and pruned[-1] == path[-1]
+    assert len(pruned) <= 6 < len(path)
+    cells = flat_cells(grid)
+    assert all(line_of_sight(cells, 50, a, b) for a, b in zip(pruned, pruned[1:]))
+
+def test_service_any_angle_paths(map_file):
+    # Test that any-angle planning returns a few clear waypoints
+    service = PathPlanningService(map_path=str(map_file))
+    start, goal = {'x': 5, 'y': 5}, {'x': 55, 'y': 5}
+    smoothed = service.plan_path(start, goal, 'robot1')
+
+    for path in (
+        service.plan_path(start, goal, 'robot1', algorithm='theta'),
+        service.plan_path(start, goal, 'robot1', algorithm='jps', any_angle=True)
+    ):
+        assert path[0] == {'x': 5.0, 'y': 5.0} and path[-1] == {'x': 55.0, 'y': 5.0}
+        assert len(path) < 10 < len(smoothed)
+        points = np.array([[p['x'], p['y']] for p in path])
+        t = np.linspace(0, 1, 200)[:, None]
+        dense = np.concatenate([a + t * (b - a) for a, b in zip(points, points[1:])])
+        assert not any(service.check_collisions([{'x': x, 'y': y} for x, y in dense], 'robot1'))
+
+    batch = service.plan_paths(
+        [{'robot_id': 'robot1', 'start': start, 'goal': goal}],
+        algorithm='astar',
+        workers=1,
+        any_angle=True
+    )
+    assert len(batch[0]['path']) < 10
+    assert batch[0]['cost'] < service.plan_paths(
+        [{'robot_id': 'robot1', 'start': start, 'goal': goal}], workers=1
+    )[0]['cost']
+
+def test_long_line_of_sight_matches_cell_walk(monkeypatch):
+    # Test the NumPy line-of-sight used for long segments against the cell-by-cell walk
+    rng = np.random.default_rng(7)
+    for density in (0.002, 0.05):
+        grid = (rng.random((200, 200)) < density).astype(np.uint8)
+        cells = flat_cells(grid)
+        pairs = [tuple(map(tuple, rng.integers(200, size=(2, 2)))) for _ in range(300)]
+        pairs += [((a, 10), (a, 190)) for a in range(0, 200, 20)] + [((5, 5), (5 + d, 5 + d)) for d in (150, 194)]
+        monkeypatch.setattr(grid_search, 'LOS_VECTOR_CELLS', 0)
+        vectorized = [line_of_sight(cells, 200, a, b) for a, b in pairs]
+        monkeypatch.setattr(grid_search, 'LOS_VECTOR_CELLS', 10 ** 9)
+        assert vectorized == [line_of_sight(cells, 200, a, b) for a, b in pairs]
+
+def test_theta_star_heads_for_the_goal():
+    # Test that the octile heuristic keeps Theta* close to the straight line on open ground
+    grid = np.zeros((300, 300), dtype=np.uint8)
+    result = theta_star(grid, (10, 10), (280, 200))
+    assert result.path == [(10, 10), (280, 200)]
+    assert result.expansions <= 2 * 270
+
+    grid[20:280, 150] = 1
+    expected = astar(grid, (10, 10), (280, 290))
+    result = theta_star(grid, (10, 10), (280, 290))
+    assert result.expansions < expected.expansions
+    assert result.cost < expected.cost
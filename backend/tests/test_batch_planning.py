@@ -0,0 +1,128 @@
+import json
+import numpy as np
+import pytest
+from api.v1.services.distance_field import DistanceField, compute_distance_field
+from api.v1.services.grid_search import astar
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'point', 'x': 40, 'y': 20, 'radius': 4}
+        ],
+        'zones': [],
+        'charging_stations': [{'id': 'station_1', 'position': {'x': 55, 'y': 35}}],
+        'paths': []
+    }
+
+@pytest.fixture
+def service(map_file):
+    return PathPlanningService(map_path=str(map_file))
+
+def make_requests(goal, count=6):
+    return [
+        {'robot_id': f'robot{i}', 'start': {'x': 2 + 3 * i, 'y': 2 + i}, 'goal': goal}
+        for i in range(count)
+    ]
+
+def test_distance_field_matches_astar():
+    # Test that the swept field equals A* costs and descent retraces them
+    rng = np.random.default_rng(11)
+    grid = (rng.random((30, 40)) < 0.25).astype(np.uint8)
+    goal = (15, 20)
+    grid[goal] = 0
+    field = DistanceField(compute_distance_field(grid, [goal]), [goal])
+
+    for _ in range(30):
+        start = (int(rng.integers(30)), int(rng.integers(40)))
+        expected = astar(grid, start, goal)
+        result = field.descend(start)
+
+        assert result.found == expected.found
+        if expected.found:
+            assert result.cost == pytest.approx(expected.cost)
+            assert result.path[0] == start and result.path[-1] == goal
+
+def test_plan_paths_shared_goal(service):
+    # Test that a shared-goal batch matches individual A* searches
+    requests = make_requests({'x': 55, 'y': 35})
+
+    planned = service.plan_paths(requests, workers=1)
+
+    assert [p['robot_id'] for p in planned] == [r['robot_id'] for r in requests]
+    assert len(service._goal_fields) == 1
+    for request, result in zip(requests, planned):
+        start = service._world_to_grid(request['start'])
+        goal = service._world_to_grid(request['goal'])
+        expected = astar(service._get_configuration_space(request['robot_id']).cells, start, goal)
+        assert result['status'] == 'found'
+        assert result['cost'] == pytest.approx(expected.cost * 0.5)
+        assert result['path'][0] == {'x': request['start']['x'], 'y': request['start']['y']}
+
+def test_plan_paths_process_pool(service):
+    # Test that pooled searches give the same results as in-process ones
+    requests = [
+        {'robot_id': f'robot{i}', 'start': {'x': 2, 'y': 2 + i}, 'goal': {'x': 50 - i, 'y': 10 + i}}
+        for i in range(4)
+    ]
+
+    serial = service.plan_paths(requests, workers=1)
+    pooled = service.plan_paths(requests, workers=2)
+    service._planner_pool.shutdown()
+
+    assert [p['cost'] for p in pooled] == pytest.approx([p['cost'] for p in serial])
+
+def test_process_pool_serves_every_footprint(map_file, tmp_path):
+    # Test that batches mixing footprints reuse one pool and match in-process searches
+    config = tmp_path / 'robot_config.json'
+    config.write_text(json.dumps({'robots': {'big_001': {'specifications': {'width': 2.0, 'length': 3.0}}}}))
+    service = PathPlanningService(map_path=str(map_file), robot_config_path=str(config))
+    requests = [
+        {'robot_id': robot_id, 'start': {'x': 5, 'y': 5 + i}, 'goal': {'x': 50 - i, 'y': 10 + i}}
+        for i, robot_id in enumerate(['robot1', 'big_001'] * 3)
+    ]
+
+    serial = service.plan_paths(requests, workers=1)
+    pooled = service.plan_paths(requests, workers=2)
+    pool = service._planner_pool
+    service.plan_paths(requests[1::2], workers=2)
+    service.optimize_visit_order(
+        [request['goal'] for request in requests],
+        [{'robot_id': 'robot1', 'start': {'x': 5, 'y': 5}}, {'robot_id': 'big_001', 'start': {'x': 5, 'y': 6}}],
+        time_budget=0.1,
+        workers=2
+    )
+    assert service._planner_pool is pool
+    pool.shutdown()
+
+    assert [p['status'] for p in pooled] == [p['status'] for p in serial]
+    assert [p['cost'] for p in pooled] == pytest.approx([p['cost'] for p in serial])
+
+def test_plan_paths_unknown_algorithm(service):
+    # Test that batch planning validates the algorithm
+    with pytest.raises(ValueError):
+        service.plan_paths(make_requests({'x': 55, 'y': 35}), algorithm='rrt')
+
+def test_route_to_nearest_charger(service):
+    # Test that the charger route ends at the station with A* cost
+    route = service.route_to_nearest_charger({'x': 5, 'y': 5}, 'robot1')
+
+    expected = astar(service._get_configuration_space('robot1').cells, (10, 10), (70, 110))
+    assert route['station_id'] == 'station_1'
+    assert route['distance'] == pytest.approx(expected.cost * 0.5)
+    assert route['path'][-1] == {'x': 55.0, 'y': 35.0}
+
+def test_charger_field_memory_mapped(map_file, tmp_path):
+    # Test that the charger field is persisted and memory-mapped on reload
+    cache_dir = str(tmp_path / 'cache')
+    PathPlanningService(map_path=str(map_file), cache_dir=cache_dir)._get_charger_field()
+
+    service = PathPlanningService(map_path=str(map_file), cache_dir=cache_dir)
+    field = service._get_charger_field()
+
+    assert isinstance(field.dist, np.memmap)
+    assert field.dist.dtype == np.float32
+    assert service.route_to_nearest_charger({'x': 5, 'y': 5}, 'robot1')['station_id'] == 'station_1'
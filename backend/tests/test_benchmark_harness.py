@@ -0,0 +1,34 @@
+import copy
+from benchmarks.bench_path_planning import compare, run_scenario, synthetic_map
+
+def test_synthetic_map_is_reproducible():
+    # Test that a seed fixes the obstacles and the density target is met
+    first = synthetic_map(50, 0.5, 0.2, seed=3)
+    assert synthetic_map(50, 0.5, 0.2, seed=3) == first
+    assert synthetic_map(50, 0.5, 0.2, seed=4) != first
+    assert len(first['charging_stations']) == 4
+    area = sum(
+        (o['x2'] - o['x1']) * (o['y2'] - o['y1']) if o['type'] == 'rectangle' else 3.14159 * o['radius'] ** 2
+        for o in first['obstacles']
+    )
+    assert area >= 0.2 * 50 * 50
+
+def test_scenario_run_and_regression_check():
+    # Test a tiny scenario end to end and that worse results are flagged
+    results = run_scenario('tiny', ['astar', 'jps', 'cached_astar'], scenario=(30, 0.5, 0.1, 3))
+
+    for mode in ('astar', 'jps', 'cached_astar'):
+        metrics = results['modes'][mode]
+        assert metrics['samples'] == 3 and metrics['found'] == 3
+        assert metrics['p50_ms'] <= metrics['p99_ms']
+        assert metrics['peak_kb'] > 0
+    assert results['modes']['jps']['expansions'] <= results['modes']['astar']['expansions']
+    assert results['modes']['cached_astar']['expansions'] is None
+    assert compare(results, results) == []
+
+    baseline = copy.deepcopy(results)
+    baseline['modes']['astar']['expansions'] //= 2
+    baseline['modes']['jps']['found'] = 4
+    problems = compare(results, baseline)
+    assert len(problems) == 2
+    assert problems[0].startswith('astar: expansions')
@@ -0,0 +1,97 @@
+import json
+import numpy as np
+import pytest
+from api.v1.services.configuration_space import inflate, inflate_window, inflation_cells
+from api.v1.services.occupancy_grid import rasterize_map, rasterize_obstacle
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'point', 'x': 40, 'y': 20, 'radius': 4}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+@pytest.fixture
+def robot_config_file(tmp_path):
+    path = tmp_path / 'robot_config.json'
+    path.write_text(json.dumps({
+        'robots': {
+            'big_001': {'type': 'planter', 'specifications': {'max_speed': 2.0, 'width': 2.0, 'length': 3.0}},
+            'small_001': {'type': 'monitor', 'specifications': {'max_speed': 3.0}}
+        }
+    }))
+    return path
+
+@pytest.fixture
+def service(map_file, robot_config_file):
+    return PathPlanningService(map_path=str(map_file), robot_config_path=str(robot_config_file))
+
+def test_inflate_matches_brute_force():
+    # Test that the distance transform marks exactly the cells within the radius
+    rng = np.random.default_rng(2)
+    cells = (rng.random((25, 30)) < 0.03).astype(np.uint8)
+    occupied = np.argwhere(cells)
+
+    inflated = inflate(cells, 3)
+
+    rr, cc = np.indices(cells.shape)
+    d2 = ((rr[..., None] - occupied[:, 0]) ** 2 + (cc[..., None] - occupied[:, 1]) ** 2).min(axis=-1)
+    assert np.array_equal(inflated, (d2 <= 9).astype(np.uint8))
+    assert np.array_equal(inflate(cells, 0), cells)
+
+def test_inflate_window_matches_full_inflation():
+    # Test the incremental update after adding an obstacle
+    rng = np.random.default_rng(4)
+    cells = (rng.random((40, 50)) < 0.02).astype(np.uint8)
+    inflated = inflate(cells, 2)
+
+    window = rasterize_obstacle(cells, {'type': 'rectangle', 'x1': 10, 'y1': 5, 'x2': 13, 'y2': 9}, 0.5)
+    updated, _ = inflate_window(inflated, cells, window, 2)
+
+    assert np.array_equal(updated, inflate(cells, 2))
+
+def test_robot_footprint_from_config(service):
+    # Test that configured dimensions override the defaults per robot
+    assert service.robot_footprint('big_001')['width'] == 2.0
+    assert service.robot_footprint('big_001')['max_speed'] == 2.0
+    assert service.robot_footprint('small_001')['width'] == service.robot_specs['width']
+    assert service.robot_footprint('unknown') == service.robot_specs
+    assert inflation_cells(1.8, 0.5) == 4
+
+def test_planned_path_clears_footprint(service):
+    # Test that planned paths never fail the collision check for the same robot
+    for robot_id in ('big_001', 'small_001'):
+        path = service.plan_path({'x': 5, 'y': 5}, {'x': 50, 'y': 5}, robot_id, algorithm='jps')
+        cells = service.last_search.path
+        assert service.last_search.found
+        positions = np.array([[c * 0.5, r * 0.5] for r, c in cells[1:]])
+        assert not any(service.check_collisions(positions, robot_id))
+
+    big = service._get_configuration_space('big_001')
+    small = service._get_configuration_space('small_001')
+    assert big is service._get_configuration_space('big_001')
+    assert big.cells.sum() > small.cells.sum() > service.occupancy_grid.cells.sum()
+    assert service.check_collision({'x': 18.5, 'y': 10}, 'big_001') is True
+    assert service.check_collision({'x': 18.5, 'y': 10}, 'small_001') is False
+
+def test_add_obstacle_updates_configuration_space(service, map_file):
+    # Test that existing inflated grids are updated incrementally
+    service.plan_path({'x': 5, 'y': 5}, {'x': 50, 'y': 5}, 'big_001', algorithm='hpa')
+    obstacle = {'type': 'point', 'x': 30, 'y': 30, 'radius': 2}
+
+    service.add_obstacle(obstacle)
+
+    map_data = json.loads(map_file.read_text())
+    map_data['obstacles'].append(obstacle)
+    expected = inflate(rasterize_map(map_data), 4)
+    space = service.occupancy_grid.peek_derived('cspace_4')
+    assert space is not None
+    assert np.array_equal(space.cells, expected)
+    assert space.peek_derived('cluster_abstraction') is not None
@@ -0,0 +1,134 @@
+import math
+import numpy as np
+import pytest
+from api.v1.services.cooperative_planning import ReservationTable, plan_cooperative
+from api.v1.services.grid_search import astar
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 30, 'height': 20, 'resolution': 0.5},
+        'obstacles': [{'type': 'rectangle', 'x1': 14, 'y1': 0, 'x2': 16, 'y2': 14}],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def wall_grid():
+    grid = np.zeros((60, 60), dtype=np.uint8)
+    grid[10:50, 30] = 1
+    return grid
+
+def plan_robots(grid, pairs):
+    robots = []
+    for i, (start, goal) in enumerate(pairs):
+        robots.append({'robot_id': f'r{i}', 'path': astar(grid, start, goal, 200000).path, 'radius': 0.5})
+    return robots
+
+def assert_conflict_free(results, cols):
+    # Each route advances one step at a time by at most one cell
+    positions = {}
+    for i, result in enumerate(results):
+        timed = result['timed']
+        for (a, ta), (b, tb) in zip(timed, timed[1:]):
+            assert tb == ta + 1
+            ra, ca = divmod(a, cols)
+            rb, cb = divmod(b, cols)
+            assert max(abs(ra - rb), abs(ca - cb)) <= 1
+        last_idx, last_step = timed[-1]
+        positions[i] = ({step: divmod(idx, cols) for idx, step in timed}, divmod(last_idx, cols), last_step)
+    horizon = max(end for _, _, end in positions.values())
+    for step in range(horizon + 1):
+        cells = []
+        for route, parked, end in positions.values():
+            cells.append(route.get(step, parked if step >= end else route[min(route)]))
+        for i in range(len(cells)):
+            for j in range(i + 1, len(cells)):
+                assert math.dist(cells[i], cells[j]) > 1.0
+
+def test_cooperative_routes_keep_separation():
+    # Test that robots crossing through one gap never come within a cell
+    grid = wall_grid()
+    pairs = [((5 + 2 * i, 5), (50 - 2 * i, 55)) for i in range(10)]
+    pairs += [((5 + 2 * i, 55), (50 - 2 * i, 5)) for i in range(10)]
+    table = ReservationTable(grid.shape)
+
+    results = plan_cooperative({f'r{i}': grid for i in range(len(pairs))}, table, plan_robots(grid, pairs), 0)
+
+    assert all(result['status'] == 'found' for result in results)
+    for (start, goal), result in zip(pairs, results):
+        assert divmod(result['timed'][0][0], 60) == start
+        assert divmod(result['timed'][-1][0], 60) == goal
+    assert_conflict_free(results, 60)
+
+def test_reservations_persist_across_batches():
+    # Test that a later batch routes around robots parked by an earlier one
+    grid = wall_grid()
+    table = ReservationTable(grid.shape)
+    first = plan_robots(grid, [((30, 20), (30, 40))])
+    plan_cooperative({'r0': grid}, table, first, 0)
+
+    crossing = [{'robot_id': 'late', 'path': astar(grid, (5, 40), (55, 40), 200000).path, 'radius': 0.5}]
+    timed = plan_cooperative({'late': grid}, table, crossing, 0)[0]['timed']
+    assert all(math.dist(divmod(idx, 60), (30, 40)) > 1.0 for idx, step in timed if step >= 30)
+
+    assert table.release('r0')
+    assert table.robots == ['late']
+    assert not table.release('r0')
+
+def test_crowded_starts_leave_in_sequence():
+    # Test that robots starting closer than their footprints allow wait for each other
+    grid = wall_grid()
+    table = ReservationTable(grid.shape)
+    robots = plan_robots(grid, [((5, 5), (5, 25)), ((5, 6), (25, 5)), ((6, 5), (25, 25))])
+    results = plan_cooperative({robot['robot_id']: grid for robot in robots}, table, robots, 0)
+    assert all(result['status'] == 'found' for result in results)
+    # Once every robot has left its start, they keep their distance
+    departed = max(next(step for idx, step in result['timed'] if idx != result['timed'][0][0]) for result in results)
+    assert departed > 1
+    later = [{'timed': [(idx, step - departed) for idx, step in result['timed'] if step >= departed]} for result in results]
+    assert_conflict_free(later, 60)
+
+    with pytest.raises(ValueError):
+        plan_cooperative({'r0': grid}, table, robots[:1] * 2, 0)
+
+def test_expire_keeps_parked_robots_reserved_once():
+    # Test that expiring a finished route parks the robot without re-reserving it on every call
+    grid = wall_grid()
+    table = ReservationTable(grid.shape)
+    plan_cooperative({'r0': grid}, table, plan_robots(grid, [((5, 5), (5, 15))]), 0)
+    assert table.expire(100) == ['r0']
+    parked = len(table)
+    assert table.expire(200) == []
+    assert len(table) == parked and table.robots == ['r0']
+
+def test_service_plans_coordinated_routes(map_file):
+    # Test timed service routes for two robots passing in opposite directions
+    service = PathPlanningService(map_path=str(map_file))
+    routes = service.plan_coordinated([
+        {'robot_id': 'robot1', 'start': {'x': 2, 'y': 2}, 'goal': {'x': 28, 'y': 2}},
+        {'robot_id': 'robot2', 'start': {'x': 28, 'y': 3}, 'goal': {'x': 2, 'y': 3}}
+    ], start_time=0)
+
+    step = service.coordination_step
+    for route, start, goal in zip(routes, ((2, 2), (28, 3)), ((28, 2), (2, 3))):
+        assert route['status'] == 'found'
+        assert (route['path'][0]['x'], route['path'][0]['y']) == start
+        assert (route['path'][-1]['x'], route['path'][-1]['y']) == goal
+        times = [point['t'] for point in route['path']]
+        assert np.allclose(np.diff(times), step)
+        assert route['arrival'] == times[-1]
+    for a, b in zip(routes[0]['path'], routes[1]['path']):
+        assert math.hypot(a['x'] - b['x'], a['y'] - b['y']) > 0.5
+
+    service.release_reservations('robot1')
+    with pytest.raises(KeyError):
+        service.release_reservations('robot1')
+    with pytest.raises(ValueError):
+        service.plan_coordinated([], algorithm='theta')
+    with pytest.raises(ValueError):
+        service.plan_coordinated([
+            {'robot_id': 'robot1', 'start': {'x': 2, 'y': 2}, 'goal': {'x': 28, 'y': 2}},
+            {'robot_id': 'robot1', 'start': {'x': 2, 'y': 5}, 'goal': {'x': 28, 'y': 5}}
+        ], start_time=0)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from api.v1.services.coverage_planning import decompose, plan_coverage, sweep_segments
+from api.v1.services.grid_search import flat_cells, line_of_sight
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [{'type': 'rectangle', 'x1': 20, 'y1': 15, 'x2': 26, 'y2': 22}],
+        'zones': [{'id': 'field', 'type': 'planting', 'area': {'x1': 10, 'y1': 5, 'x2': 50, 'y2': 35}}],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def test_decompose_splits_around_obstacle():
+    # Test that an obstacle in the middle yields cells above, beside and below it
+    free = np.ones((12, 20), dtype=bool)
+    free[4:8, 8:12] = False
+    lane, first, end = sweep_segments(free, np.arange(12))
+
+    cells = decompose(lane, first, end)
+
+    assert len(lane) == 16
+    assert sorted(len(cell) for cell in cells) == [4, 4, 4, 4]
+    for cell in cells:
+        assert list(lane[cell]) == list(range(lane[cell[0]], lane[cell[0]] + len(cell)))
+
+@pytest.mark.parametrize('transpose', [False, True])
+def test_coverage_sweeps_free_cells(transpose):
+    # Test that the sweep stays in free space and passes over every free cell
+    free = np.ones((40, 50), dtype=bool)
+    free[10:25, 15:22] = False
+    free[30:40, 35:37] = False
+
+    plan = plan_coverage(free, 3, offset=(5, 7), transpose=transpose)
+
+    local = [(r - 5, c - 7) for r, c in plan.waypoints]
+    blocked = (~free).astype(np.uint8)
+    assert all(free[cell] for cell in local)
+    assert all(line_of_sight(flat_cells(blocked), 50, a, b) for a, b in zip(local, local[1:]))
+    assert plan.coverage > 0.99
+    assert plan.skipped == 0
+
+def test_service_zone_coverage_is_cached(map_file):
+    # Test the service plan, its cache key and the unknown zone error
+    service = PathPlanningService(map_path=str(map_file))
+    plan = service.plan_zone_coverage('field', 'robot1', tool_width=1.0)
+
+    assert plan['coverage'] > 0.9
+    assert plan['cells'] >= 4
+    assert not any(service.check_collisions(plan['path'], 'robot1'))
+    assert all(10 <= p['x'] <= 50 and 5 <= p['y'] <= 35 for p in plan['path'])
+    assert len(service._coverage_plans) == 1
+
+    assert service.plan_zone_coverage('field', 'robot1', tool_width=1.0) == plan
+    assert len(service._coverage_plans) == 1
+    narrow = service.plan_zone_coverage('field', 'robot1', tool_width=0.5)
+    assert narrow['lanes'] > plan['lanes']
+    assert len(service._coverage_plans) == 2
+
+    with pytest.raises(KeyError):
+        service.plan_zone_coverage('missing', 'robot1')
+    with pytest.raises(ValueError):
+        service.plan_zone_coverage('field', 'robot1', tool_width=0)
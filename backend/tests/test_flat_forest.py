@@ -0,0 +1,129 @@
+import importlib.util
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+from api.v1.services.ai_service import GROWTH_FEATURES, GROWTH_SCHEMA, AIService
+from api.v1.services.feature_pipeline import FeaturePipeline
+from api.v1.services.flat_forest import FlatForest, export_flat_forest, flatten_forest, is_flattenable
+from api.v1.services.model_registry import ModelRegistry
+
+TRAIN_MODELS = os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'train_models.py')
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.random((400, len(GROWTH_FEATURES)))
+    return X, X @ rng.random(len(GROWTH_FEATURES)) + 0.1 * rng.standard_normal(len(X))
+
+class CountingModel:
+    """Wraps a model and counts the rows it is asked to score"""
+
+    def __init__(self, model):
+        self.model = model
+        self.rows = 0
+
+    def predict(self, X):
+        self.rows += len(X)
+        return self.model.predict(X)
+
+def test_flat_forest_matches_sklearn(data):
+    # Test parity for both forest kinds, unlimited depth, values on split thresholds and chunking
+    X, y = data
+    rng = np.random.default_rng(1)
+    queries = rng.random((300, X.shape[1])) * 1.2 - 0.1
+    for model in (
+        RandomForestRegressor(n_estimators=20, random_state=0).fit(X, y),
+        ExtraTreesRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    ):
+        assert is_flattenable(model)
+        flat = FlatForest.from_model(model)
+        tree = model.estimators_[0].tree_
+        split = tree.children_left >= 0
+        ties = np.tile(queries[:1], (int(split.sum()), 1))
+        ties[np.arange(len(ties)), tree.feature[split]] = tree.threshold[split]
+        for rows in (queries, ties, queries[:1]):
+            assert np.allclose(flat.predict(rows, chunk_rows=64), model.predict(rows), rtol=0, atol=1e-12)
+    assert not is_flattenable(StandardScaler())
+    with pytest.raises(ValueError):
+        flat.predict(queries[:, :3])
+
+def test_flat_arrays_survive_memory_mapping(data, tmp_path):
+    # Test scoring straight from read-only memory-mapped export arrays
+    X, y = data
+    model = RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(X, y)
+    path = str(tmp_path / 'growth_model_flat.joblib')
+    joblib.dump(flatten_forest(model), path)
+    arrays = joblib.load(path, mmap_mode='r')
+    assert isinstance(arrays['threshold'], np.memmap)
+    assert np.allclose(FlatForest(arrays).predict(X), model.predict(X))
+
+def test_pipeline_routes_batches_by_size(data, tmp_path):
+    # Test that small batches use the flat engine and large ones scikit-learn
+    X, y = data
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(scaler.transform(X), y)
+    model = CountingModel(forest)
+    pipeline = FeaturePipeline(GROWTH_SCHEMA, model, scaler, flat=FlatForest.from_model(forest), flat_max_rows=50)
+    expected = forest.predict(scaler.transform(X))
+    assert np.allclose(pipeline.predict(X[:50]), expected[:50])
+    assert model.rows == 0
+    assert np.allclose(pipeline.predict(X), expected)
+    assert model.rows == len(X)
+
+    # With only a flat export on disk the sklearn model is never loaded
+    joblib.dump(flatten_forest(forest), str(tmp_path / 'growth_model_flat.joblib'))
+    joblib.dump(scaler, str(tmp_path / 'growth_scaler.joblib'))
+    registry = ModelRegistry(str(tmp_path))
+    service = AIService(registry=registry)
+    assert np.allclose(service.predict_vegetation_growth_batch(X)['predicted_growth_rate'], expected)
+    assert set(registry.metrics()['models']) == {'growth_model_flat', 'growth_scaler'}
+
+def test_stale_flat_export_is_ignored(data, tmp_path):
+    # Test that an export not made from the current model file is never served
+    X, y = data
+    scaler = StandardScaler().fit(X)
+    first = RandomForestRegressor(n_estimators=5, max_depth=5, random_state=0).fit(scaler.transform(X), y)
+    model_path = str(tmp_path / 'growth_model.joblib')
+    joblib.dump(first, model_path)
+    joblib.dump(export_flat_forest(first, model_path), str(tmp_path / 'growth_model_flat.joblib'))
+    joblib.dump(scaler, str(tmp_path / 'growth_scaler.joblib'))
+    registry = ModelRegistry(str(tmp_path))
+    service = AIService(registry=registry)
+    soil = {'ph': 0.5, 'moisture_content': 0.5, 'organic_matter': 0.5}
+    climate = {'average_temperature': 0.5, 'average_rainfall': 0.5}
+    rate = service.predict_vegetation_growth('acacia', soil, climate, 1)['predicted_growth_rate']
+    assert rate == pytest.approx(first.predict(scaler.transform([[0.5, 0.5, 0.5, 0.5, 0.5, 1]]))[0])
+    assert 'growth_model' not in registry.metrics()['models']
+
+    # Retrained without a new export: the old one no longer matches the model file
+    second = RandomForestRegressor(n_estimators=5, max_depth=5, random_state=0).fit(scaler.transform(X), -y)
+    joblib.dump(second, model_path)
+    mtime = os.path.getmtime(model_path) + 10
+    os.utime(model_path, (mtime, mtime))
+    rate = service.predict_vegetation_growth('acacia', soil, climate, 1)['predicted_growth_rate']
+    assert rate == pytest.approx(second.predict(scaler.transform([[0.5, 0.5, 0.5, 0.5, 0.5, 1]]))[0])
+    assert service.prediction_cache_metrics()['growth']['invalidations'] == 1
+
+    # Exports without a recorded digest cannot be checked and are ignored too
+    joblib.dump(flatten_forest(first), str(tmp_path / 'growth_model_flat.joblib'))
+    assert np.allclose(service.predict_vegetation_growth_batch(X)['predicted_growth_rate'], second.predict(scaler.transform(X)))
+
+def test_train_models_export_matches_backend_layout(data, tmp_path):
+    # Test that the training script writes the layout the backend reads
+    pytest.importorskip('pandas')
+    spec = importlib.util.spec_from_file_location('train_models', TRAIN_MODELS)
+    train_models = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(train_models)
+    X, y = data
+    models = {kind: RandomForestRegressor(n_estimators=5, max_depth=5, random_state=0).fit(X, y) for kind in ('growth', 'water')}
+    scalers = {kind: StandardScaler().fit(X) for kind in ('growth', 'water')}
+    train_models.save_models(models, scalers, str(tmp_path), export_flat=True)
+    exported = joblib.load(tmp_path / 'growth_model_flat.joblib', mmap_mode='r')
+    assert np.allclose(FlatForest(exported).predict(X), models['growth'].predict(X))
+
+    # Saving again without exports removes the now stale ones
+    train_models.save_models(models, scalers, str(tmp_path))
+    assert not any(name.endswith('_flat.joblib') for name in os.listdir(tmp_path))
@@ -0,0 +1,117 @@
+import math
+import numpy as np
+import pytest
+from api.v1.services.grid_search import (
+    SQRT2,
+    SearchWorkspace,
+    astar,
+    jps,
+    octile,
+    path_cost
+)
+
+@pytest.fixture
+def wall_grid():
+    # 30x30 grid with a vertical wall that has a gap at the bottom
+    grid = np.zeros((30, 30), dtype=np.uint8)
+    grid[0:25, 15] = 1
+    return grid
+
+def dijkstra_cost(grid, start, goal):
+    # Reference single-pair Dijkstra over the same 8-connected move set
+    from heapq import heappush, heappop
+    dist = {start: 0.0}
+    heap = [(0.0, start)]
+    while heap:
+        d, (r, c) = heappop(heap)
+        if (r, c) == goal:
+            return d
+        if d > dist[(r, c)]:
+            continue
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if dr == 0 and dc == 0:
+                    continue
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < grid.shape[0] and 0 <= nc < grid.shape[1] and not grid[nr, nc]:
+                    nd = d + (SQRT2 if dr and dc else 1.0)
+                    if nd < dist.get((nr, nc), math.inf):
+                        dist[(nr, nc)] = nd
+                        heappush(heap, (nd, (nr, nc)))
+    return math.inf
+
+def test_octile_heuristic():
+    # Test octile distance on straight and diagonal offsets
+    assert octile(0, 5) == 5
+    assert octile(3, 3) == pytest.approx(3 * SQRT2)
+    assert octile(-2, 5) == pytest.approx(2 * SQRT2 + 3)
+
+def test_astar_open_grid():
+    # Test that A* returns an optimal path including both endpoints
+    grid = np.zeros((20, 20), dtype=np.uint8)
+    result = astar(grid, (0, 0), (10, 15))
+
+    assert result.found
+    assert result.path[0] == (0, 0)
+    assert result.path[-1] == (10, 15)
+    assert result.cost == pytest.approx(octile(10, 15))
+    assert path_cost(result.path) == pytest.approx(result.cost)
+
+def test_astar_matches_dijkstra(wall_grid):
+    # Test optimality around an obstacle
+    result = astar(wall_grid, (5, 5), (5, 25))
+
+    assert result.found
+    assert result.cost == pytest.approx(dijkstra_cost(wall_grid, (5, 5), (5, 25)))
+    assert all(wall_grid[r, c] == 0 for r, c in result.path)
+
+def test_astar_blocked_goal(wall_grid):
+    # Test that an occupied goal fails immediately
+    result = astar(wall_grid, (5, 5), (5, 15))
+
+    assert not result.found
+    assert result.path == []
+    assert result.expansions == 0
+
+def test_astar_expansion_budget(wall_grid):
+    # Test that the expansion budget stops the search
+    result = astar(wall_grid, (5, 5), (5, 25), max_expansions=10)
+
+    assert result.status == 'budget_exhausted'
+    assert result.expansions == 10
+
+def test_workspace_reuse(wall_grid):
+    # Test that a shared workspace is reset between searches
+    workspace = SearchWorkspace(wall_grid.shape)
+    first = astar(wall_grid, (5, 5), (5, 25), workspace=workspace)
+    second = astar(wall_grid, (29, 0), (0, 29), workspace=workspace)
+
+    assert first.found and second.found
+    assert second.cost == pytest.approx(dijkstra_cost(wall_grid, (29, 0), (0, 29)))
+
+def test_jps_matches_astar_cost():
+    # Test that JPS returns paths of identical cost on random grids
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        grid = (rng.random((25, 25)) < 0.25).astype(np.uint8)
+        start = (int(rng.integers(25)), int(rng.integers(25)))
+        goal = (int(rng.integers(25)), int(rng.integers(25)))
+        grid[start] = 0
+
+        expected = astar(grid, start, goal)
+        result = jps(grid, start, goal)
+
+        assert result.status == expected.status
+        if expected.found:
+            assert result.cost == pytest.approx(expected.cost)
+            assert path_cost(result.path) == pytest.approx(result.cost)
+            assert result.path[0] == start and result.path[-1] == goal
+            assert all(grid[r, c] == 0 for r, c in result.path)
+
+def test_jps_prunes_expansions(wall_grid):
+    # Test that JPS expands fewer nodes than A* in open space
+    expected = astar(wall_grid, (5, 5), (5, 25))
+    result = jps(wall_grid, (5, 5), (5, 25))
+
+    assert result.cost == pytest.approx(expected.cost)
+    assert result.expansions < expected.expansions
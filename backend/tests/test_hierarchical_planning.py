@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from api.v1.services.grid_search import astar
+from api.v1.services.hierarchical_planning import ClusterAbstraction
+from api.v1.services.occupancy_grid import rasterize_obstacle
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def random_grid():
+    rng = np.random.default_rng(3)
+    return (rng.random((70, 90)) < 0.2).astype(np.uint8)
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 100, 'height': 60, 'resolution': 0.5},
+        'obstacles': [{'type': 'rectangle', 'x1': 40, 'y1': 0, 'x2': 45, 'y2': 50}],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def test_hpa_finds_valid_paths(random_grid):
+    # Test that HPA* paths are connected, collision free and near-optimal
+    abstraction = ClusterAbstraction(random_grid, cluster_size=16)
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        start = (int(rng.integers(70)), int(rng.integers(90)))
+        goal = (int(rng.integers(70)), int(rng.integers(90)))
+
+        expected = astar(random_grid, start, goal)
+        result = abstraction.find_path(start, goal)
+
+        assert result.found == expected.found
+        if result.found:
+            assert result.path[0] == start and result.path[-1] == goal
+            assert all(random_grid[p] == 0 for p in result.path[1:])
+            assert all(
+                max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+                for a, b in zip(result.path, result.path[1:])
+            )
+            assert result.cost <= expected.cost * 1.25
+
+def test_hpa_repair_matches_rebuild(random_grid):
+    # Test that incremental repair gives the same abstraction as a rebuild
+    abstraction = ClusterAbstraction(random_grid, cluster_size=16)
+
+    grid = random_grid.copy()
+    window = rasterize_obstacle(grid, {'type': 'rectangle', 'x1': 10, 'y1': 5, 'x2': 14, 'y2': 12}, 0.5)
+    repaired = abstraction.repaired(grid, window)
+    rebuilt = ClusterAbstraction(grid, cluster_size=16)
+
+    assert repaired.borders == rebuilt.borders
+    assert repaired.inter == rebuilt.inter
+    assert repaired.intra == rebuilt.intra
+
+def test_plan_path_hpa(map_file):
+    # Test the hierarchical strategy through the service
+    service = PathPlanningService(map_path=str(map_file))
+    service.hpa_cluster_size = 16
+
+    path = service.plan_path({'x': 5, 'y': 5}, {'x': 90, 'y': 10}, 'robot1', algorithm='hpa')
+
+    assert path[0]['x'] == 5 and path[0]['y'] == 5
+    assert path[-1]['x'] == 90 and path[-1]['y'] == 10
+
+def test_add_obstacle_repairs_abstraction(map_file):
+    # Test that a runtime obstacle reaches the grid and the HPA* abstraction
+    service = PathPlanningService(map_path=str(map_file))
+    service.hpa_cluster_size = 16
+    service.plan_path({'x': 5, 'y': 5}, {'x': 90, 'y': 10}, 'robot1', algorithm='hpa')
+    old_version = service.map_version
+
+    version = service.add_obstacle({'type': 'rectangle', 'x1': 60, 'y1': 0, 'x2': 62, 'y2': 58})
+
+    assert version != old_version
+    assert service.grid_cache.stats['builds'] == 1
+    abstraction = service._get_configuration_space('robot1').peek_derived('cluster_abstraction')
+    assert abstraction is not None
+    assert abstraction.cells[10, 121] == 1
+
+    service.plan_path({'x': 5, 'y': 5}, {'x': 90, 'y': 10}, 'robot1', algorithm='hpa')
+    assert all(service.occupancy_grid.cells[p] == 0 for p in service.last_search.path[1:])
+    assert any(r >= 116 for r, c in service.last_search.path)
+
+def test_add_obstacle_rejects_unknown_type(map_file):
+    # Test validation of runtime obstacles
+    service = PathPlanningService(map_path=str(map_file))
+
+    with pytest.raises(ValueError):
+        service.add_obstacle({'type': 'polygon'})
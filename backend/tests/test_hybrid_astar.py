@@ -0,0 +1,116 @@
+import json
+import math
+import numpy as np
+import pytest
+from api.v1.services.hybrid_astar import (
+    DUBINS_WORDS,
+    DubinsHeuristic,
+    _normal_form,
+    dubins_length,
+    dubins_path,
+    dubins_segments,
+    sample_arc
+)
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'rectangle', 'x1': 38, 'y1': 10, 'x2': 40, 'y2': 40}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+@pytest.fixture
+def robot_config_file(tmp_path):
+    path = tmp_path / 'robot_config.json'
+    path.write_text(json.dumps({'robots': {
+        'planter_001': {'type': 'planter', 'specifications': {
+            'width': 0.8, 'length': 1.2, 'turning_radius': 1.5, 'max_speed': 2.0
+        }}
+    }}))
+    return path
+
+def heading_error(a, b):
+    return abs((a - b + math.pi) % (2 * math.pi) - math.pi)
+
+def test_dubins_words_reach_goal():
+    # Test that every feasible Dubins word drives exactly to the goal pose
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        start = (*rng.uniform(-10, 10, 2), rng.uniform(0, 2 * math.pi))
+        goal = (*rng.uniform(-10, 10, 2), rng.uniform(0, 2 * math.pi))
+        radius = rng.uniform(0.5, 3.0)
+        segments = dubins_segments(*_normal_form(goal[0] - start[0], goal[1] - start[1], start[2], goal[2], radius))
+        for (_, steers), lengths in zip(DUBINS_WORDS, segments):
+            if np.isnan(lengths).any():
+                continue
+            pose = start
+            for steer, length in zip(steers, lengths):
+                pose = tuple(sample_arc(pose, steer, length * radius, radius, 0.1)[-1])
+            assert math.hypot(pose[0] - goal[0], pose[1] - goal[1]) < 1e-6
+            assert heading_error(pose[2], goal[2]) < 1e-6
+
+        poses = dubins_path(start, goal, radius, 0.05)
+        driven = np.hypot(*np.diff(np.vstack([start, poses])[:, :2], axis=0).T).sum()
+        assert driven == pytest.approx(dubins_length(start, goal, radius), rel=1e-2)
+        assert dubins_length(start, goal, radius) >= math.hypot(goal[0] - start[0], goal[1] - start[1]) - 1e-9
+
+def test_heuristic_table_matches_dubins_length():
+    # Test the precomputed table against direct Dubins lengths
+    heuristic = DubinsHeuristic.build(1.5, 0.5, headings=36)
+    rng = np.random.default_rng(4)
+    for _ in range(50):
+        x, y = rng.uniform(-5, 5, 2)
+        h = int(rng.integers(36))
+        goal_bin = int(rng.integers(36))
+        goal = (round(x / 0.5) * 0.5, round(y / 0.5) * 0.5)
+        expected = dubins_length((0.0, 0.0, h * 2 * math.pi / 36), (*goal, goal_bin * 2 * math.pi / 36), 1.5)
+        # The table is indexed in the robot frame, so allow for the rotation
+        assert heuristic.distance(0.0, 0.0, h, goal, goal_bin) == pytest.approx(expected, abs=1.5)
+    assert heuristic.distance(0.0, 0.0, 0, (100.0, 0.0), 0) == pytest.approx(100.0)
+
+def test_hybrid_path_is_drivable(map_file, robot_config_file):
+    # Test that hybrid A* paths respect the turning radius and stay clear
+    service = PathPlanningService(map_path=str(map_file), robot_config_path=str(robot_config_file))
+    path = service.plan_path(
+        {'x': 5, 'y': 5, 'heading': math.pi / 2},
+        {'x': 55, 'y': 5, 'heading': -math.pi / 2},
+        'planter_001',
+        algorithm='hybrid_astar'
+    )
+
+    assert service.last_search.found
+    assert path[0]['x'] == 5 and path[0]['y'] == 5
+    assert heading_error(path[0]['heading'], math.pi / 2) < 1e-9
+    assert (path[-1]['x'], path[-1]['y']) == (55, 5)
+    assert heading_error(path[-1]['heading'], -math.pi / 2) < 1e-9
+    assert not any(service.check_collisions(path, 'planter_001'))
+
+    poses = np.array([[p['x'], p['y'], p['heading']] for p in path])
+    step = np.hypot(*np.diff(poses[:, :2], axis=0).T)
+    turn = np.array([heading_error(a, b) for a, b in zip(poses[1:, 2], poses[:-1, 2])])
+    assert step.max() < 0.5
+    # A chord c of an arc with radius r turns by 2 * asin(c / 2r)
+    assert (turn <= 2 * np.arcsin(np.minimum(step / 3.0, 1.0)) + 1e-6).all()
+
+def test_hybrid_heuristic_cached_on_disk(map_file, robot_config_file, tmp_path):
+    # Test that the Dubins table is written once and memory-mapped after
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        service = PathPlanningService(
+            map_path=str(map_file),
+            cache_dir=str(cache_dir),
+            robot_config_path=str(robot_config_file)
+        )
+        path = service.plan_path({'x': 5, 'y': 35}, {'x': 15, 'y': 35}, 'planter_001', algorithm='hybrid_astar')
+        assert path[-1]['x'] == 15
+    assert len(list(cache_dir.glob('dubins_*.npy'))) == 1
+    assert isinstance(service._get_dubins_heuristic(1.5, 0.5).table, np.memmap)
+    with pytest.raises(ValueError):
+        service.plan_path({'x': 5, 'y': 35}, {'x': 15, 'y': 35}, 'planter_001', algorithm='dubins')
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import numpy as np
+import pytest
+from api.v1.endpoints import path_planning as endpoints
+from api.v1.schemas.robotics import RouteRequest
+from api.v1.services import path_planning
+from api.v1.services.configuration_space import inflate
+from api.v1.services.grid_search import astar
+from api.v1.services.incremental_planning import DStarLite, RouteSession
+from api.v1.services.path_planning import PathPlanningService
+
+def test_dstar_lite_matches_astar_after_changes():
+    # Test that repaired paths stay optimal as cells appear and clear
+    rng = np.random.default_rng(21)
+    cells = (rng.random((40, 50)) < 0.2).astype(np.uint8)
+    start, goal = (0, 0), (39, 49)
+    cells[start] = cells[goal] = 0
+    planner = DStarLite(cells, start, goal)
+    current = cells.copy()
+
+    result = planner.plan()
+    first_expansions = result.expansions
+    assert result.cost == pytest.approx(astar(current, start, goal).cost)
+
+    for _ in range(8):
+        r, c = (int(v) for v in rng.integers((40, 50)))
+        if (r, c) in (start, goal):
+            continue
+        occupied = not current[r, c]
+        current[r, c] = occupied
+        planner.set_blocked([((r, c), occupied)])
+        result = planner.plan()
+        expected = astar(current, start, goal)
+        assert result.status == expected.status
+        if expected.found:
+            assert result.cost == pytest.approx(expected.cost)
+            assert all(current[p] == 0 for p in result.path)
+            assert result.expansions < first_expansions
+
+def test_dstar_lite_moving_start():
+    # Test replanning after the robot advances along its route
+    cells = np.zeros((30, 30), dtype=np.uint8)
+    planner = DStarLite(cells, (0, 0), (29, 29))
+    planner.plan()
+
+    planner.move_start((10, 10))
+    planner.set_blocked([((15, c), True) for c in range(0, 28)])
+    cells[15, :28] = 1
+    result = planner.plan()
+
+    assert result.path[0] == (10, 10)
+    assert result.cost == pytest.approx(astar(cells, (10, 10), (29, 29)).cost)
+
+def test_dstar_lite_breaks_ties_towards_start():
+    # Test that a first plan on open ground only expands cells along one of the equally short paths
+    cells = np.zeros((200, 200), dtype=np.uint8)
+    planner = DStarLite(cells, (0, 0), (150, 199))
+    result = planner.plan()
+
+    assert result.cost == pytest.approx(astar(cells, (0, 0), (150, 199)).cost)
+    assert result.expansions <= 2 * len(result.path)
+    assert planner.nbytes == 2 * 8 * 200 * 200
+
+def test_dstar_lite_start_jumps():
+    # Test repairs after the robot reports positions off its previous path
+    rng = np.random.default_rng(4)
+    for _ in range(40):
+        cells = (rng.random((15, 20)) < 0.25).astype(np.uint8)
+        start, goal = (0, 0), (14, 19)
+        cells[goal] = 0
+        planner = DStarLite(cells, start, goal)
+        current = cells.copy()
+        for _ in range(6):
+            result = planner.plan()
+            expected = astar(current, start, goal)
+            assert result.status == expected.status
+            if expected.found:
+                assert result.cost == pytest.approx(expected.cost)
+            cell = (int(rng.integers(15)), int(rng.integers(20)))
+            if cell != goal:
+                current[cell] = not current[cell]
+                planner.set_blocked([(cell, bool(current[cell]))])
+            start = (int(rng.integers(15)), int(rng.integers(20)))
+            planner.move_start(start)
+
+def test_dstar_lite_keys_tied_by_rounding():
+    # Test that keys one ulp apart do not end the repair before the start is reached
+    cells = np.zeros((7, 14), dtype=np.uint8)
+    planner = DStarLite(cells, (0, 7), (3, 11))
+    planner.plan()
+    planner.set_blocked([((3, 10), True)])
+    cells[3, 10] = 1
+    result = planner.plan()
+    assert result.status == 'found'
+    assert result.cost == pytest.approx(astar(cells, (0, 7), (3, 11)).cost)
+
+    space = inflate(np.zeros((7, 14), dtype=np.uint8), 1)
+    session = RouteSession('route', 'robot1', np.zeros((7, 14), dtype=np.uint8), space, 1, (3, 13), (6, 0))
+    result = session.update([((5, 2), True)])
+    raw = np.zeros((7, 14), dtype=np.uint8)
+    raw[5, 2] = 1
+    expected = astar(inflate(raw, 1), (3, 13), (6, 0))
+    assert result.status == 'found'
+    assert result.cost == pytest.approx(expected.cost)
+
+def test_route_session_through_service(map_file):
+    # Test that a reported obstacle reroutes an active route
+    service = PathPlanningService(map_path=str(map_file))
+    route = service.start_route({'x': 5, 'y': 35}, {'x': 50, 'y': 35}, 'robot1')
+    assert route['status'] == 'found'
+    assert route['path'][0] == {'x': 5.0, 'y': 35.0}
+
+    # Close the gap above the wall
+    wall = [{'x': 21, 'y': 30 + 0.5 * i, 'occupied': True} for i in range(20)]
+    blocked = service.update_route(route['route_id'], wall)
+    assert blocked['status'] == 'no_path'
+
+    cleared = service.update_route(
+        route['route_id'],
+        [dict(change, occupied=False) for change in wall[:6]],
+        position={'x': 10, 'y': 35}
+    )
+    assert cleared['status'] == 'found'
+    assert cleared['path'][0] == {'x': 10.0, 'y': 35.0}
+    raw = service._create_occupancy_grid().copy()
+    raw[66:80, 42] = 1
+    expected = astar(inflate(raw, 1), (70, 20), (70, 100))
+    assert cleared['cost'] == pytest.approx(expected.cost * 0.5)
+
+    service.end_route(route['route_id'])
+    with pytest.raises(KeyError):
+        service.update_route(route['route_id'], [])
+
+def test_route_memory_budget(map_file, monkeypatch):
+    # Test that routes beyond the memory budget are dropped, oldest first
+    monkeypatch.setattr(path_planning, 'ROUTE_MEMORY_MB', 0.1)
+    service = PathPlanningService(map_path=str(map_file))
+    first = service.start_route({'x': 5, 'y': 35}, {'x': 50, 'y': 35}, 'robot1')
+    second = service.start_route({'x': 5, 'y': 5}, {'x': 50, 'y': 5}, 'robot1')
+
+    assert list(service._routes) == [second['route_id']]
+    with pytest.raises(KeyError):
+        service.update_route(first['route_id'], [])
+
+def test_start_route_endpoint_plans_off_the_event_loop(map_file, monkeypatch):
+    # Test that the endpoint plans in a worker thread and keeps the route
+    service = PathPlanningService(map_path=str(map_file))
+    monkeypatch.setattr(endpoints, 'path_planning_service', service)
+    loop_thread = threading.get_ident()
+    plan_threads = []
+    plan = RouteSession.plan
+
+    def recording_plan(session):
+        plan_threads.append(threading.get_ident())
+        return plan(session)
+
+    monkeypatch.setattr(RouteSession, 'plan', recording_plan)
+    request = RouteRequest(start={'x': 5, 'y': 35, 'z': 0}, goal={'x': 50, 'y': 35, 'z': 0})
+    route = asyncio.run(endpoints.start_route('robot1', request))
+
+    assert route['status'] == 'found'
+    assert plan_threads and loop_thread not in plan_threads
+    assert route['route_id'] in service._routes
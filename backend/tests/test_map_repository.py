@@ -0,0 +1,85 @@
+import json
+import os
+import pytest
+import asyncio
+from fastapi import HTTPException
+from api.v1.endpoints import path_planning as endpoints
+from api.v1.services.map_repository import MapRepository, etag_matches
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 40, 'height': 40, 'resolution': 0.5},
+        'obstacles': [{'type': 'rectangle', 'x1': 10, 'y1': 10, 'x2': 12, 'y2': 20}],
+        'zones': [{'id': 'zone_1', 'type': 'planting', 'area': {'x1': 0, 'y1': 0, 'x2': 5, 'y2': 5}}],
+        'charging_stations': [{'id': 'station_1', 'position': {'x': 30, 'y': 30}}],
+        'paths': []
+    }
+
+@pytest.fixture
+def service(map_file, monkeypatch):
+    service = PathPlanningService(map_path=str(map_file))
+    monkeypatch.setattr(endpoints, 'path_planning_service', service)
+    return service
+
+def get_obstacles(etag=None):
+    return asyncio.run(endpoints.get_obstacles(None, None, None, None, if_none_match=etag))
+
+def test_repository_reloads_only_on_change(map_file, map_data):
+    # Test that sections are parsed and serialized once per map version
+    repository = MapRepository(str(map_file))
+    body, etag = repository.section('zones')
+    assert json.loads(body) == map_data['zones']
+    assert repository.section('zones') == (body, etag)
+    assert repository.stats == {'reloads': 1, 'serializations': 1}
+
+    os.utime(map_file, (0, repository.mtime + 1))
+    assert repository.section('zones')[1] == etag
+    assert repository.stats == {'reloads': 2, 'serializations': 1}
+
+    map_data['zones'] = []
+    map_file.write_text(json.dumps(map_data))
+    os.utime(map_file, (0, repository.mtime + 1))
+    body, new_etag = repository.section('zones')
+    assert body == b'[]' and new_etag != etag
+    with pytest.raises(KeyError):
+        repository.section('map')
+
+def test_etag_matching():
+    # Test list, weak and wildcard If-None-Match values
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+def test_map_endpoints_use_etags(service, map_data):
+    # Test conditional GETs and that live edits show up in the map endpoints
+    response = get_obstacles()
+    assert response.status_code == 200
+    assert json.loads(response.body) == map_data['obstacles']
+    etag = response.headers['etag']
+
+    cached = get_obstacles(etag)
+    assert cached.status_code == 304
+    assert cached.body == b''
+    stations = asyncio.run(endpoints.get_charging_stations(if_none_match=None))
+    assert json.loads(stations.body) == map_data['charging_stations']
+
+    obstacle = {'type': 'point', 'x': 2, 'y': 2, 'radius': 1}
+    asyncio.run(endpoints.add_obstacle(obstacle))
+    response = get_obstacles(etag)
+    assert response.status_code == 200
+    assert json.loads(response.body) == map_data['obstacles'] + [obstacle]
+    assert service.map_repository.map_data is service.map_data
+
+def test_partial_radius_query_is_rejected(service):
+    # Test that a center without a radius, or the reverse, is a 400 rather than the full list
+    for query in ((1.0, 1.0, None), (None, None, 5.0), (1.0, None, 5.0)):
+        for endpoint in (endpoints.get_zones, endpoints.get_obstacles):
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(endpoint(None, *query, if_none_match=None))
+            assert error.value.status_code == 400
+
+    near = asyncio.run(endpoints.get_zones(None, 1.0, 1.0, 5.0, if_none_match=None))
+    assert [zone['id'] for zone in near] == ['zone_1']
@@ -0,0 +1,83 @@
+import os
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+from api.v1.services.ai_service import GROWTH_FEATURES, AIService
+from api.v1.services.model_registry import ModelRegistry, shared_registry
+
+class ConstantModel:
+    """Picklable stand-in model predicting one value for every row"""
+
+    def __init__(self, value, size=0):
+        self.value = value
+        self.weights = np.zeros(size)
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+def _write_version(directory, value):
+    os.makedirs(directory, exist_ok=True)
+    scaler = StandardScaler().fit(np.random.default_rng(0).random((10, len(GROWTH_FEATURES))))
+    joblib.dump(scaler, os.path.join(directory, 'scaler.joblib'))
+    joblib.dump(ConstantModel(value, size=100000), os.path.join(directory, 'growth_model.joblib'))
+
+def test_registry_loads_lazily_and_memory_maps(tmp_path):
+    # Test that nothing loads before first use and large arrays are mapped from the file
+    _write_version(str(tmp_path), 0.5)
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.versions() == ['']
+    assert registry.metrics()['models'] == {}
+
+    model = registry.get('growth_model')
+    assert isinstance(model.weights, np.memmap)
+    assert registry.get('growth_model') is model
+    metrics = registry.metrics()['models']['growth_model']
+    assert metrics['mapped_bytes'] == model.weights.nbytes
+    assert metrics['file_bytes'] > metrics['mapped_bytes']
+    assert metrics['load_seconds'] > 0
+    assert registry.stats['loads'] == 1
+
+    with pytest.raises(OSError):
+        registry.get('water_model')
+    assert shared_registry(str(tmp_path)) is shared_registry(str(tmp_path))
+
+def test_registry_reloads_changed_files_and_swaps_versions(tmp_path):
+    # Test reloading a rewritten artifact and hot-swapping between versions
+    _write_version(str(tmp_path / 'v1'), 0.25)
+    _write_version(str(tmp_path / 'v2'), 0.75)
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.version == 'v2'
+    first = registry.artifact('growth_model')
+    assert first.model.value == 0.75
+
+    path = str(tmp_path / 'v2' / 'growth_model.joblib')
+    joblib.dump(ConstantModel(0.8), path)
+    os.utime(path, (first.mtime + 10, first.mtime + 10))
+    second = registry.artifact('growth_model')
+    assert second.model.value == 0.8 and second.tag != first.tag
+    assert registry.stats['reloads'] == 1
+
+    service = AIService(registry=registry)
+    row = [dict(zip(GROWTH_FEATURES, [7.0, 0.2, 0.1, 30.0, 10.0, 90]))]
+    assert service.predict_vegetation_growth_batch(row)['predicted_growth_rate'][0] == 0.8
+    registry.activate('v1')
+    assert service.predict_vegetation_growth_batch(row)['predicted_growth_rate'][0] == 0.25
+    assert registry.stats['swaps'] == 1
+    with pytest.raises(KeyError):
+        registry.activate('v3')
+
+def test_activation_reaches_every_worker(tmp_path):
+    # Test that a version activated by one process is followed by the others and sorts naturally
+    for version, value in (('v9', 0.25), ('v10', 0.75), ('v2', 0.5)):
+        _write_version(str(tmp_path / version), value)
+    worker, other = ModelRegistry(str(tmp_path)), ModelRegistry(str(tmp_path))
+    assert worker.versions() == ['v2', 'v9', 'v10']
+    assert other.get('growth_model').value == 0.75
+
+    worker.activate('v9')
+    assert (tmp_path / 'CURRENT').read_text().strip() == 'v9'
+    assert other.get('growth_model').value == 0.25
+    assert other.version == 'v9' and other.stats['swaps'] == 1
+    assert ModelRegistry(str(tmp_path)).version == 'v9'
+    assert other.versions() == worker.versions()
@@ -0,0 +1,126 @@
+import copy
+import json
+import os
+import numpy as np
+import pytest
+from api.v1.services.occupancy_grid import (
+    OccupancyGrid,
+    OccupancyGridCache,
+    map_version,
+    rasterize_map
+)
+from api.v1.services.path_planning import PathPlanningService
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 20, 'height': 10, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 2, 'y1': 2, 'x2': 4, 'y2': 4},
+            {'type': 'point', 'x': 12, 'y': 5, 'radius': 1}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def test_rasterize_map(map_data):
+    # Test rasterization into a compact uint8 grid
+    grid = rasterize_map(map_data)
+
+    assert grid.dtype == np.uint8
+    assert grid.shape == (20, 40)
+    assert grid[5, 5] == 1
+    assert grid[10, 24] == 1
+    assert grid[0, 0] == 0
+
+def test_map_version_is_content_hash(map_data):
+    # Test that key order does not change the version but content does
+    reordered = dict(reversed(list(copy.deepcopy(map_data).items())))
+
+    assert map_version(map_data) == map_version(reordered)
+
+    map_data['obstacles'].append({'type': 'point', 'x': 1, 'y': 1, 'radius': 1})
+    assert map_version(map_data) != map_version(reordered)
+
+def test_occupancy_grid_pack_roundtrip(tmp_path, map_data):
+    # Test bit-packed storage and disk persistence
+    cells = rasterize_map(map_data)
+    grid = OccupancyGrid.from_array(cells, 0.5, 'v1')
+
+    assert grid.nbytes == cells.size // 8
+    assert np.array_equal(grid.cells, cells)
+
+    path = str(tmp_path / 'grid.npz')
+    grid.save(path)
+    loaded = OccupancyGrid.load(path)
+
+    assert loaded.version == 'v1'
+    assert loaded.resolution == 0.5
+    assert np.array_equal(loaded.cells, cells)
+
+def test_grid_cache_builds_once(tmp_path, map_data):
+    # Test that repeated lookups reuse the cached grid
+    cache = OccupancyGridCache(cache_dir=str(tmp_path))
+
+    first = cache.get(map_data)
+    second = cache.get(map_data)
+
+    assert first is second
+    assert cache.stats['builds'] == 1
+    assert cache.stats['hits'] == 1
+
+    # A fresh cache picks the grid up from disk instead of rasterizing
+    other = OccupancyGridCache(cache_dir=str(tmp_path))
+    other.get(map_data)
+
+    assert other.stats['builds'] == 0
+    assert other.stats['disk_hits'] == 1
+
+def test_service_reuses_grid_between_plans(map_file):
+    # Test that plan_path does not rebuild the grid
+    service = PathPlanningService(map_path=str(map_file))
+
+    service.plan_path({'x': 0, 'y': 0}, {'x': 5, 'y': 0}, 'robot1')
+    service.plan_path({'x': 0, 'y': 0}, {'x': 5, 'y': 0}, 'robot1')
+
+    assert service.grid_cache.stats['builds'] == 1
+
+def test_service_invalidates_grid_on_map_change(map_file, map_data):
+    # Test that editing map_data.json swaps in a new grid version
+    service = PathPlanningService(map_path=str(map_file))
+    old_version = service.map_version
+
+    map_data['obstacles'].append({'type': 'rectangle', 'x1': 0, 'y1': 0, 'x2': 1, 'y2': 1})
+    map_file.write_text(json.dumps(map_data))
+    os.utime(map_file, (0, service.map_repository.mtime + 1))
+
+    grid = service._create_occupancy_grid()
+
+    assert service.map_version != old_version
+    assert grid[0, 0] == 1
+    assert service.grid_cache.stats['builds'] == 2
+
+def test_rasterize_point_clipped_at_edge(map_data):
+    # Test that discs overlapping the map edge are clipped, not wrapped
+    map_data['obstacles'] = [{'type': 'point', 'x': 0, 'y': 0, 'radius': 1}]
+    grid = rasterize_map(map_data)
+
+    assert grid[0, 0] == 1
+    assert grid[2, 0] == 1
+    assert grid[-1, -1] == 0
+    assert grid.sum() == 6
+
+def test_check_collisions_vectorized(map_file):
+    # Test bulk collision checks against the cached grid
+    service = PathPlanningService(map_path=str(map_file))
+    positions = [
+        {'x': 3, 'y': 3},
+        {'x': 8, 'y': 8},
+        {'x': 12, 'y': 5},
+        {'x': 30, 'y': 3}
+    ]
+
+    assert service.check_collisions(positions, 'robot1') == [True, False, True, True]
+    assert service.check_collisions(np.array([[8.0, 8.0], [3.0, 3.0]]), 'robot1') == [False, True]
+    assert service.check_collision({'x': 8, 'y': 8}, 'robot1') is False
@@ -0,0 +1,105 @@
+import json
+import os
+import numpy as np
+from api.v1.services import path_planning
+from api.v1.services.path_cache import PathQueryCache
+from api.v1.services.path_planning import PathPlanningService
+from api.v1.services.trajectory import segment_clear
+
+def test_cache_lru_and_ttl():
+    # Test eviction order, expiry and version binding with a fake clock
+    now = [0.0]
+    cache = PathQueryCache(max_entries=2, ttl=10.0, clock=lambda: now[0])
+    cache.bind('v1')
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    now[0] = 11.0
+    assert cache.get('c') is None
+    cache.put('d', 4)
+    cache.bind('v2')
+    assert len(cache) == 0
+
+    metrics = cache.metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['expired']) == (2, 2, 1)
+    assert (metrics['evictions'], metrics['invalidations']) == (1, 1)
+    assert metrics['hit_rate'] == 0.5
+
+def test_repeated_queries_hit_cache(map_file):
+    # Test that queries from the same cells share a path with exact ends
+    service = PathPlanningService(map_path=str(map_file))
+    first = service.plan_path({'x': 5.1, 'y': 5.1}, {'x': 40.1, 'y': 5.1}, 'robot1')
+    expansions = service.last_search.expansions
+
+    second = service.plan_path({'x': 5.3, 'y': 5.2}, {'x': 40.2, 'y': 5.4}, 'robot1')
+    assert service.last_search.expansions == expansions
+    assert second[0] == {'x': 5.3, 'y': 5.2}
+    assert second[-1] == {'x': 40.2, 'y': 5.4}
+    assert second[1:-1] == first[1:-1]
+    assert first[0] == {'x': 5.1, 'y': 5.1}
+
+    service.plan_path({'x': 5.1, 'y': 5.1}, {'x': 40.1, 'y': 5.1}, 'robot1', algorithm='jps')
+    metrics = service.path_cache_metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['size']) == (1, 2, 2)
+
+def test_only_found_paths_are_cached_and_returned_as_copies(map_file):
+    # Test that failures are searched again and callers cannot modify cached points
+    service = PathPlanningService(map_path=str(map_file))
+    assert service.plan_path({'x': 5, 'y': 5}, {'x': 21, 'y': 5}, 'robot1') == []
+    assert service.plan_path({'x': 5, 'y': 5}, {'x': 21, 'y': 5}, 'robot1') == []
+    metrics = service.path_cache_metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['size']) == (0, 2, 0)
+
+    first = service.plan_path({'x': 5, 'y': 5}, {'x': 40, 'y': 5}, 'robot1')
+    expected = [dict(point) for point in first]
+    for point in first:
+        point['x'] = -1.0
+    assert service.plan_path({'x': 5, 'y': 5}, {'x': 40, 'y': 5}, 'robot1') == expected
+
+def test_any_angle_hit_rechecks_end_segments(map_file, monkeypatch):
+    # Test that a start in the same bucket but behind the wall gets a clear path
+    monkeypatch.setattr(path_planning, 'PATH_CACHE_QUANTUM', 4.0)
+    service = PathPlanningService(map_path=str(map_file))
+    goal = {'x': 40, 'y': 5}
+    service.plan_path({'x': 17, 'y': 31}, goal, 'robot1', any_angle=True)
+    path = service.plan_path({'x': 16.5, 'y': 28.5}, goal, 'robot1', any_angle=True)
+
+    blocked = service._blocked_fn('robot1')
+    points = [np.array([point['x'], point['y']]) for point in path]
+    assert points[0].tolist() == [16.5, 28.5]
+    assert all(segment_clear(blocked, a, b, 0.125) for a, b in zip(points, points[1:]))
+    assert service.path_cache_metrics()['size'] == 1
+
+def test_map_changes_invalidate_cache(map_file, map_data):
+    # Test that edits through the API and on disk both drop cached paths
+    service = PathPlanningService(map_path=str(map_file))
+    start, goal = {'x': 5, 'y': 5}, {'x': 40, 'y': 5}
+    before = service.plan_path(start, goal, 'robot1')
+
+    service.add_obstacle({'type': 'rectangle', 'x1': 25, 'y1': 0, 'x2': 27, 'y2': 38})
+    blocked = service.plan_path(start, goal, 'robot1')
+    assert blocked != before
+    assert service.path_cache_metrics()['invalidations'] == 1
+
+    data = dict(map_data, obstacles=[])
+    map_file.write_text(json.dumps(data))
+    os.utime(map_file, (1, 1))
+    open_path = service.plan_path(start, goal, 'robot1')
+    assert len(open_path) < len(before)
+    assert service.path_cache_metrics()['invalidations'] == 2
+
+def test_grid_hit_rechecks_end_segments(map_file, monkeypatch):
+    # Test that a grid path hit is replanned when its moved start is cut off by the wall
+    monkeypatch.setattr(path_planning, 'PATH_CACHE_QUANTUM', 4.0)
+    service = PathPlanningService(map_path=str(map_file))
+    goal = {'x': 40, 'y': 5}
+    service.plan_path({'x': 17, 'y': 31}, goal, 'robot1')
+    start = {'x': 19.5, 'y': 29.5}
+    path = service.plan_path(start, goal, 'robot1')
+
+    service.clear_path_cache()
+    assert path == service.plan_path(start, goal, 'robot1')
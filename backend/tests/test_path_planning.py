@@ -133,4 +133,21 @@ def test_circle_collision(path_planning_service):
         position, radius, obstacle
     )
     
-    assert isinstance(has_collision, bool) 
\ No newline at end of file
+    assert isinstance(has_collision, bool) 
+
+def test_plan_path_jps(path_planning_service):
+    # Test that JPS mode returns a path with the same endpoints as A*
+    start = {'x': 0, 'y': 0}
+    goal = {'x': 20, 'y': 35}
+
+    path = path_planning_service.plan_path(start, goal, 'robot1', algorithm='jps')
+
+    assert path[0]['x'] == start['x']
+    assert path[0]['y'] == start['y']
+    assert path[-1]['x'] == goal['x']
+    assert path[-1]['y'] == goal['y']
+
+def test_plan_path_unknown_algorithm(path_planning_service):
+    # Test that an unknown planning mode is rejected
+    with pytest.raises(ValueError):
+        path_planning_service.plan_path({'x': 0, 'y': 0}, {'x': 1, 'y': 1}, 'robot1', algorithm='rrt')
@@ -0,0 +1,89 @@
+import itertools
+import numpy as np
+import pytest
+from api.v1.services.path_planning import PathPlanningService
+from api.v1.services.route_optimization import improve_route, or_opt, plan_routes, route_cost, two_opt
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'rectangle', 'x1': 40, 'y1': 35, 'x2': 60, 'y2': 40}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def euclidean_matrix(points):
+    return np.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))
+
+def test_local_search_moves_improve_routes():
+    # Test that 2-opt and Or-opt never lengthen a route and keep its start
+    rng = np.random.default_rng(3)
+    cost = euclidean_matrix(rng.uniform(0, 100, (40, 2)))
+    route = list(range(40))
+    for closed in (False, True):
+        for move in (two_opt, or_opt, improve_route):
+            improved = move(cost, route, closed)
+            assert improved[0] == 0
+            assert sorted(improved) == route
+            assert route_cost(cost, improved, closed) < route_cost(cost, route, closed)
+
+@pytest.mark.parametrize('closed', [False, True])
+def test_plan_routes_near_optimal(closed):
+    # Test small instances against brute force
+    rng = np.random.default_rng(5)
+    for _ in range(5):
+        cost = euclidean_matrix(rng.uniform(0, 100, (8, 2)))
+        route = plan_routes({'a': cost}, {'a': 0}, range(1, 8), closed=closed, time_budget=0.5)['routes']['a']
+        best = min(route_cost(cost, (0,) + order, closed) for order in itertools.permutations(range(1, 8)))
+        assert route_cost(cost, route, closed) == pytest.approx(best)
+
+def test_plan_routes_respects_capacity():
+    # Test that targets are split by capacity and the rest left unassigned
+    rng = np.random.default_rng(7)
+    cost = euclidean_matrix(rng.uniform(0, 100, (12, 2)))
+    cost[11, :10] = cost[:10, 11] = np.inf
+    solution = plan_routes({'a': cost, 'b': cost}, {'a': 10, 'b': 11}, range(10), capacities={'a': 4})
+
+    assert len(solution['routes']['a']) == 5
+    assert solution['routes']['b'] == [11]
+    assert solution['load'] == {'a': 4.0, 'b': 0.0}
+    assert sorted(solution['routes']['a'][1:] + solution['unassigned']) == list(range(10))
+
+def test_service_orders_targets_around_walls(map_file):
+    # Test the grid cost matrix and the chosen order on a map with a wall
+    service = PathPlanningService(map_path=str(map_file))
+    targets = [{'x': 45, 'y': 5}, {'x': 5, 'y': 5}, {'x': 50, 'y': 20}, {'x': 10, 'y': 20}, {'x': 55, 'y': 38}]
+    result = service.optimize_visit_order(
+        targets,
+        [{'robot_id': 'robot1', 'start': {'x': 2, 'y': 2}}],
+        time_budget=0.5,
+        workers=1
+    )
+
+    route = result['routes'][0]
+    assert route['order'][:2] == [1, 3]
+    assert result['unassigned'] == [4]
+    assert result['searches'] == 15
+    legs = service.plan_paths(
+        [{'robot_id': 'robot1', 'start': a, 'goal': b} for a, b in zip([{'x': 2, 'y': 2}] + route['positions'], route['positions'])],
+        workers=1
+    )
+    assert route['cost'] == pytest.approx(sum(leg['cost'] for leg in legs))
+
+    with pytest.raises(ValueError):
+        service.optimize_visit_order(targets, [], workers=1)
+
+def test_service_routes_robot_starting_inside_inflated_obstacle(map_file):
+    # Test that targets whose cells sort before the start stay reachable from inside the C-space
+    service = PathPlanningService(map_path=str(map_file))
+    start = {'x': 22.0, 'y': 10}
+    assert service._get_configuration_space('robot1').cells[service._world_to_grid(start)]
+    targets = [{'x': 30, 'y': 2}, {'x': 30, 'y': 15}]
+    result = service.optimize_visit_order(targets, [{'robot_id': 'robot1', 'start': start}], time_budget=0.1, workers=1)
+    assert result['unassigned'] == []
+    assert sorted(result['routes'][0]['order']) == [0, 1]
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+import pytest
+from api.v1.services.path_planning import PathPlanningService
+from api.v1.services.spatial_index import SpatialIndex, obstacle_geometry
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 100, 'height': 100, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 10, 'y1': 10, 'x2': 20, 'y2': 20, 'description': 'Shed'},
+            {'type': 'point', 'x': 60, 'y': 60, 'radius': 5, 'description': 'Tree'}
+        ],
+        'zones': [
+            {'id': 'zone_a', 'area': {'x1': 0, 'y1': 0, 'x2': 50, 'y2': 50}},
+            {'id': 'zone_b', 'area': {'x1': 40, 'y1': 40, 'x2': 90, 'y2': 90}}
+        ],
+        'charging_stations': [
+            {'id': 'station_1', 'position': {'x': 5, 'y': 95}},
+            {'id': 'station_2', 'position': {'x': 95, 'y': 5}}
+        ],
+        'paths': []
+    }
+
+@pytest.fixture
+def service(map_file):
+    return PathPlanningService(map_path=str(map_file))
+
+def random_obstacles(rng, count):
+    obstacles = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            x, y = rng.uniform(0, 500, 2)
+            w, h = rng.uniform(1, 40, 2)
+            obstacles.append({'type': 'rectangle', 'x1': x, 'y1': y, 'x2': x + w, 'y2': y + h})
+        else:
+            x, y = rng.uniform(0, 500, 2)
+            obstacles.append({'type': 'point', 'x': x, 'y': y, 'radius': rng.uniform(0.5, 20)})
+    return obstacles
+
+def test_index_queries_match_brute_force():
+    # Test bbox, radius and nearest queries against a linear scan
+    rng = np.random.default_rng(5)
+    obstacles = random_obstacles(rng, 300)
+    index = SpatialIndex(obstacles, obstacle_geometry, bucket_size=25.0)
+
+    for _ in range(50):
+        x, y = rng.uniform(-50, 550, 2)
+        radius = rng.uniform(0, 60)
+        distances = [index.distance(i, x, y) for i in range(len(obstacles))]
+        expected = sorted(i for i, d in enumerate(distances) if d <= radius)
+        found = sorted(obstacles.index(o) for o in index.query_radius(x, y, radius))
+        assert found == expected
+
+        nearest = index.nearest(x, y, k=3)
+        assert [d for d, _ in nearest] == pytest.approx(sorted(distances)[:3])
+
+        bbox = (x, y, x + radius, y + radius)
+        expected = sorted(
+            i for i, o in enumerate(obstacles)
+            if _intersects(o, bbox)
+        )
+        assert sorted(obstacles.index(o) for o in index.query_bbox(bbox)) == expected
+
+def _intersects(obstacle, bbox):
+    x1, y1, x2, y2 = bbox
+    if obstacle['type'] == 'point':
+        cx = min(max(obstacle['x'], x1), x2)
+        cy = min(max(obstacle['y'], y1), y2)
+        return math.hypot(obstacle['x'] - cx, obstacle['y'] - cy) <= obstacle['radius']
+    return not (obstacle['x1'] > x2 or obstacle['x2'] < x1 or obstacle['y1'] > y2 or obstacle['y2'] < y1)
+
+def test_find_obstacles_by_bbox_and_radius(service):
+    # Test filtered obstacle queries through the service
+    assert [o['description'] for o in service.find_obstacles(bbox=(0, 0, 30, 30))] == ['Shed']
+    assert service.find_obstacles(bbox=(30, 30, 40, 40)) == []
+    near = service.find_obstacles(center={'x': 40, 'y': 40}, radius=30)
+    assert [o['description'] for o in near] == ['Tree', 'Shed']
+    assert len(service.find_obstacles()) == 2
+    with pytest.raises(ValueError):
+        service.find_obstacles(bbox=(10, 10, 0, 0))
+
+def test_zones_at_position(service):
+    # Test zone lookup for a robot position, including overlapping zones
+    assert [z['id'] for z in service.zones_at({'x': 10, 'y': 10})] == ['zone_a']
+    assert sorted(z['id'] for z in service.zones_at({'x': 45, 'y': 45})) == ['zone_a', 'zone_b']
+    assert service.zones_at({'x': 95, 'y': 10}) == []
+
+def test_nearest_charging_stations(service):
+    # Test nearest station lookup and index refresh after a map edit
+    nearest = service.nearest_charging_stations({'x': 10, 'y': 80})
+    assert nearest[0]['id'] == 'station_1'
+    assert nearest[0]['distance'] == pytest.approx(math.hypot(5, 15))
+    assert [s['id'] for s in service.nearest_charging_stations({'x': 90, 'y': 20}, k=2)] == ['station_2', 'station_1']
+
+    service.add_obstacle({'type': 'point', 'x': 30, 'y': 80, 'radius': 2})
+    assert len(service.colliding_obstacles({'x': 31, 'y': 80}, 'robot1')) == 1
+    assert service.colliding_obstacles({'x': 80, 'y': 20}, 'robot1') == []
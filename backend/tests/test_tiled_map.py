@@ -0,0 +1,90 @@
+import json
+import numpy as np
+import pytest
+from api.v1.services.configuration_space import inflate
+from api.v1.services.grid_search import astar, astar_sparse
+from api.v1.services.occupancy_grid import rasterize_map
+from api.v1.services.path_planning import PathPlanningService
+from api.v1.services.tiled_map import FULL_TILE, TiledOccupancyMap, write_tiled_map
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 75, 'height': 50, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 40},
+            {'type': 'rectangle', 'x1': 48, 'y1': 16, 'x2': 64, 'y2': 32},
+            {'type': 'point', 'x': 40, 'y': 30, 'radius': 4},
+            {'type': 'point', 'x': 74, 'y': 49, 'radius': 3}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+@pytest.fixture
+def tiled_dir(tmp_path, map_data):
+    path = str(tmp_path / 'tiled')
+    write_tiled_map(path, map_data, tile_size=32)
+    return path
+
+@pytest.fixture
+def map_file_factory(tmp_path, map_data):
+    def make():
+        path = tmp_path / 'map_data.json'
+        path.write_text(json.dumps(map_data))
+        return str(path)
+    return make
+
+def test_tiles_match_dense_raster(tiled_dir, map_data):
+    # Test that the tiled map reproduces the dense grid and skips empty tiles
+    tiled = TiledOccupancyMap(tiled_dir, max_resident_tiles=4)
+    dense = rasterize_map(map_data)
+    rows, cols = dense.shape
+
+    assert np.array_equal(tiled.window(0, rows, 0, cols), dense)
+    assert (tiled.offsets == FULL_TILE).any()
+    assert tiled.meta['stored_tiles'] < tiled.offsets.size
+    assert tiled.resident_tiles <= 4
+    assert tiled.stats['evictions'] > 0
+
+def test_inflated_tiles_match_dense_inflation(tiled_dir, map_data):
+    # Test that halo-based tile inflation matches inflating the full grid
+    tiled = TiledOccupancyMap(tiled_dir)
+    dense = rasterize_map(map_data)
+    rows, cols = dense.shape
+
+    assert np.array_equal(tiled.window(0, rows, 0, cols, radius_cells=3), inflate(dense, 3))
+
+def test_sparse_astar_matches_astar(tiled_dir, map_data):
+    # Test that search over lazily loaded tiles finds optimal paths
+    tiled = TiledOccupancyMap(tiled_dir, max_resident_tiles=6)
+    dense = rasterize_map(map_data)
+    rng = np.random.default_rng(8)
+    free = np.argwhere(dense == 0)
+
+    for _ in range(10):
+        start, goal = (tuple(free[i]) for i in rng.integers(len(free), size=2))
+        expected = astar(dense, start, goal)
+        result = astar_sparse(tiled.lookup(), tiled.shape, start, goal)
+        assert result.status == expected.status
+        if expected.found:
+            assert result.cost == pytest.approx(expected.cost)
+    assert tiled.resident_tiles <= 6
+
+def test_service_plans_on_tiled_map(tiled_dir, map_file_factory):
+    # Test that the service plans and checks collisions without a dense grid
+    tiled_service = PathPlanningService(map_path=tiled_dir)
+    dense_service = PathPlanningService(map_path=map_file_factory())
+
+    path = tiled_service.plan_path({'x': 5, 'y': 5}, {'x': 70, 'y': 10}, 'robot1')
+    dense_service.plan_path({'x': 5, 'y': 5}, {'x': 70, 'y': 10}, 'robot1')
+
+    assert tiled_service.occupancy_grid is None
+    assert len(path) > 0
+    assert tiled_service.last_search.cost == pytest.approx(dense_service.last_search.cost)
+    positions = [{'x': 21, 'y': 10}, {'x': 5, 'y': 5}, {'x': 80, 'y': 5}]
+    assert tiled_service.check_collisions(positions, 'robot1') == dense_service.check_collisions(positions, 'robot1')
+    assert len(tiled_service.find_obstacles(bbox=(0, 0, 30, 30))) == 1
+    with pytest.raises(ValueError):
+        tiled_service.plan_path({'x': 5, 'y': 5}, {'x': 70, 'y': 10}, 'robot1', algorithm='jps')
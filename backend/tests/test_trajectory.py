@@ -0,0 +1,102 @@
+import math
+import numpy as np
+import pytest
+from api.v1.services.path_planning import PathPlanningService
+from api.v1.services.trajectory import (
+    arc_lengths,
+    curvature,
+    shortcut,
+    smooth_trajectory,
+    velocity_profile
+)
+
+@pytest.fixture
+def map_data():
+    return {
+        'map': {'width': 60, 'height': 40, 'resolution': 0.5},
+        'obstacles': [
+            {'type': 'rectangle', 'x1': 20, 'y1': 0, 'x2': 22, 'y2': 30},
+            {'type': 'rectangle', 'x1': 38, 'y1': 10, 'x2': 40, 'y2': 40}
+        ],
+        'zones': [],
+        'charging_stations': [],
+        'paths': []
+    }
+
+def wall_blocked(xy):
+    # Wall at 4 <= x < 5 for y < 8
+    return (xy[:, 0] >= 4) & (xy[:, 0] < 5) & (xy[:, 1] < 8)
+
+def test_velocity_profile_matches_recursion():
+    # Test the closed-form passes against the textbook forward/backward loops
+    rng = np.random.default_rng(1)
+    points = np.cumsum(rng.uniform(0.1, 1.0, (60, 2)) * [1, 0.3], axis=0)
+    points[20:30, 1] += np.sin(np.linspace(0, math.pi, 10)) * 2
+    speeds = velocity_profile(points, 2.0, 0.5, turning_radius=0.2)
+
+    s = arc_lengths(points)
+    kappa = curvature(points)
+    cap = np.minimum(2.0, np.where(kappa > 0, np.sqrt(0.5 / np.maximum(kappa, 1e-12)), np.inf))
+    cap[kappa * 0.2 > 1.0 + 1e-9] = 0.0
+    cap[0] = cap[-1] = 0.0
+    expected = cap.copy()
+    for i in range(1, len(points)):
+        expected[i] = min(expected[i], math.sqrt(expected[i - 1] ** 2 + 1.0 * (s[i] - s[i - 1])))
+    for i in range(len(points) - 2, -1, -1):
+        expected[i] = min(expected[i], math.sqrt(expected[i + 1] ** 2 + 1.0 * (s[i + 1] - s[i])))
+
+    assert speeds == pytest.approx(expected)
+    assert speeds[0] == 0.0 and speeds[-1] == 0.0
+    assert speeds.max() <= 2.0
+
+def test_velocity_profile_slows_for_curvature():
+    # Test that tight turns are taken slower than straights
+    t = np.linspace(0, math.pi, 200)
+    arc = np.column_stack([np.cos(t), np.sin(t)]) * 2.0
+    straight = np.column_stack([np.linspace(0, 2 * math.pi, 200), np.zeros(200)])
+
+    on_arc = velocity_profile(arc, 5.0, 0.5)
+    on_straight = velocity_profile(straight, 5.0, 0.5)
+
+    assert on_arc.max() == pytest.approx(1.0, rel=1e-3)
+    assert on_straight.max() > on_arc.max()
+    assert not velocity_profile(arc, 5.0, 0.5, turning_radius=3.0)[1:-1].any()
+
+def test_shortcut_keeps_line_of_sight():
+    # Test that shortcutting drops waypoints without crossing blocked space
+    path = np.array([[x, 0.5] for x in np.arange(0, 4, 0.5)] +
+                    [[3.5, y] for y in np.arange(1, 9, 0.5)] +
+                    [[x, 8.5] for x in np.arange(4, 9, 0.5)])
+
+    kept = shortcut(path, wall_blocked, 0.1)
+
+    assert len(kept) < len(path) / 4
+    assert (kept[0] == path[0]).all() and (kept[-1] == path[-1]).all()
+    for a, b in zip(kept, kept[1:]):
+        t = np.linspace(0, 1, 200)[:, None]
+        assert not wall_blocked(a + t * (b - a)).any()
+
+def test_smooth_trajectory_avoids_obstacles():
+    # Test that the smoothed path never enters blocked space
+    path = np.array([[0.5, 0.5], [3.5, 0.5], [3.5, 8.5], [8.5, 8.5], [8.5, 0.5]])
+    dense = np.concatenate([np.linspace(a, b, 20, endpoint=False) for a, b in zip(path, path[1:])] + [path[-1:]])
+
+    smoothed = smooth_trajectory(dense, wall_blocked, 0.25, turning_radius=0.5)
+
+    assert not wall_blocked(smoothed).any()
+    assert (smoothed[0] == dense[0]).all() and (smoothed[-1] == dense[-1]).all()
+    assert arc_lengths(smoothed)[-1] < arc_lengths(dense)[-1]
+
+def test_planned_trajectory_is_clear(map_file):
+    # Test that service paths stay clear of the robot's configuration space
+    service = PathPlanningService(map_path=str(map_file))
+    path = service.plan_path({'x': 5, 'y': 5}, {'x': 55, 'y': 5}, 'robot1')
+
+    assert path[0] == {'x': 5.0, 'y': 5.0}
+    assert path[-1] == {'x': 55.0, 'y': 5.0}
+    assert not any(service.check_collisions(path, 'robot1'))
+
+    optimized = service.optimize_path(path, 'robot1')
+    assert optimized[0]['velocity'] == 0.0 and optimized[-1]['velocity'] == 0.0
+    assert max(p['velocity'] for p in optimized) <= service.robot_specs['max_speed']
+    assert not any(service.check_collisions(optimized, 'robot1'))